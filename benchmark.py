@@ -0,0 +1,538 @@
+"""
+Church Community Bot - Handler Benchmark
+Created by: PINLON-YOUTH
+
+Drives the real bot.py handlers with synthetic Telegram updates. Bot API
+calls are answered in-process by a stub request class, so nothing touches
+the network. Each dataset size runs in its own process inside a temporary
+directory, so no real bot_data.json is read or written.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --sizes 10,1000,100000 --updates 2000
+    python benchmark.py --backend sqlite
+    python benchmark.py --webhook
+    python benchmark.py --metrics
+    python benchmark.py --parsers --sizes 1000,10000
+
+Reported per handler: updates/sec (wall time, including periodic flushes),
+p50/p99 handler latency and bytes written to storage per 1k updates.
+With --webhook, a mix of updates is also POSTed to the bot's webhook
+listener on localhost the way Telegram would deliver them, reporting
+end-to-end updates/sec and p50/p99 HTTP response time. With --metrics,
+handlers and Bot API calls run with the /metrics instrumentation on, to
+compare against a run without it. --parsers instead times the admin
+input parsers (parsers.py) against the line-by-line regex code they
+replaced, on pasted batches of each size.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import socket
+import re
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ADMIN_ID = 1
+USER_BASE = 100000000
+NEW_USER_BASE = 900000000
+GROUP_BASE = -1001000000000
+QUIZ_COUNT = 50
+HANDLERS = ('start', 'track_messages', 'quiz_callback', 'pray', 'tops', 'receive_broadcast')
+WEBHOOK_HANDLERS = ('start', 'track_messages', 'quiz_callback', 'pray', 'tops')
+WEBHOOK_SECRET = 'benchmark-secret'
+
+
+def make_stub_request():
+    """Build a BaseRequest that answers Bot API calls locally"""
+    from telegram.request import BaseRequest
+
+    class StubRequest(BaseRequest):
+        """Canned Bot API responses: sent messages echo back, everything else is True"""
+
+        def __init__(self):
+            self.calls = 0
+            self.message_id = 0
+
+        async def initialize(self):
+            pass
+
+        async def shutdown(self):
+            pass
+
+        async def do_request(self, url, method, request_data=None, read_timeout=None,
+                             write_timeout=None, connect_timeout=None, pool_timeout=None):
+            self.calls += 1
+            api_method = url.rsplit('/', 1)[-1]
+            params = request_data.parameters if request_data else {}
+            if api_method == 'getMe':
+                result = {'id': 1000, 'is_bot': True, 'first_name': 'Bench', 'username': 'bench_bot'}
+            elif api_method in ('sendMessage', 'sendPhoto', 'editMessageText'):
+                self.message_id += 1
+                chat_id = int(params.get('chat_id', 0))
+                result = {
+                    'message_id': self.message_id,
+                    'date': int(time.time()),
+                    'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+                    'text': params.get('text', params.get('caption', '')),
+                }
+            else:
+                result = True
+            return 200, json.dumps({'ok': True, 'result': result}).encode('utf-8')
+
+    return StubRequest()
+
+
+def message_update(update_id, user_id, chat_id, text):
+    chat = {'id': chat_id, 'type': 'private'} if chat_id > 0 else {'id': chat_id, 'type': 'group', 'title': 'Bench'}
+    message = {
+        'message_id': update_id,
+        'date': int(time.time()),
+        'chat': chat,
+        'from': {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}", 'username': f"user{user_id}"},
+        'text': text,
+    }
+    if text.startswith('/'):
+        message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+    return {'update_id': update_id, 'message': message}
+
+
+def callback_update(update_id, user_id, chat_id, data):
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'from': {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}", 'username': f"user{user_id}"},
+            'chat_instance': str(chat_id),
+            'data': data,
+            'message': {
+                'message_id': update_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'group', 'title': 'Bench'},
+                'text': 'quiz',
+            },
+        },
+    }
+
+
+def seed(bot, size, groups):
+    """Fill bot_data with `size` users, scores and prayers"""
+    data = bot.bot_data
+    data.add_quizzes([
+        {
+            'question': f"Question {i}?",
+            'choices': {'A': 'one', 'B': 'two', 'C': 'three', 'D': 'four'},
+            'answer': 'ABCD'[i % 4],
+        }
+        for i in range(QUIZ_COUNT)
+    ])
+    for g in range(groups):
+        data.add_group(GROUP_BASE - g)
+    for i in range(size):
+        user_id = USER_BASE + i
+        data.add_user(user_id)
+        data.add_score(str(user_id), f"user{i}", random.randint(0, 500), str(GROUP_BASE - i % groups))
+        data.add_prayer({
+            'user_id': user_id,
+            'username': f"user{i}",
+            'prayer': f"prayer request {i}",
+            'date': f"2024-01-01 00:00:{i % 60:02d}",
+        })
+
+
+def build_updates(name, count, size, groups):
+    """Synthetic updates plus the context.args / user_data each one needs"""
+    updates = []
+    for i in range(count):
+        user_id = USER_BASE + random.randrange(size)
+        group_id = GROUP_BASE - random.randrange(groups)
+        if name == 'start':
+            updates.append((message_update(i, NEW_USER_BASE + i, NEW_USER_BASE + i, '/start'), [], {}))
+        elif name == 'track_messages':
+            updates.append((message_update(i, user_id, group_id, f"hello {i}"), [], {}))
+        elif name == 'quiz_callback':
+            data = f"quiz_{random.randrange(QUIZ_COUNT)}_{random.choice('ABCD')}"
+            updates.append((callback_update(i, user_id, group_id, data), [], {}))
+        elif name == 'pray':
+            args = ['please', 'pray', 'for', f"#{i}"]
+            updates.append((message_update(i, user_id, user_id, '/pray ' + ' '.join(args)), args, {}))
+        elif name == 'tops':
+            args = ['group'] if i % 2 else []
+            chat_id = group_id if i % 2 else user_id
+            updates.append((message_update(i, user_id, chat_id, '/tops ' + ' '.join(args)), args, {}))
+        elif name == 'receive_broadcast':
+            updates.append((message_update(i, ADMIN_ID, ADMIN_ID, f"announcement {i}"), [],
+                            {'broadcast_target': 'all'}))
+    return updates
+
+
+async def post_update(reader, writer, port, body, secret):
+    """POST one update over a keep-alive connection, return the HTTP status"""
+    writer.write(
+        b"POST /telegram HTTP/1.1\r\n"
+        b"Host: 127.0.0.1:%d\r\n"
+        b"Content-Type: application/json\r\n"
+        b"X-Telegram-Bot-Api-Secret-Token: %s\r\n"
+        b"Content-Length: %d\r\n\r\n" % (port, secret.encode('ascii'), len(body)) + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def run_webhook(bot, count, size, groups):
+    """Deliver a mix of updates through the webhook listener"""
+    application = bot.build_application('1000:BENCHMARK', request=make_stub_request())
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    await application.initialize()
+    await application.updater.start_webhook(
+        listen='127.0.0.1', port=port, url_path='telegram',
+        webhook_url='https://bench.invalid/telegram', secret_token=WEBHOOK_SECRET,
+        allowed_updates=bot.allowed_updates(application),
+    )
+    await application.start()
+
+    payloads = []
+    for name in WEBHOOK_HANDLERS:
+        payloads.extend(data for data, _, _ in build_updates(name, count // len(WEBHOOK_HANDLERS), size, groups))
+    random.shuffle(payloads)
+    bodies = []
+    for update_id, data in enumerate(payloads, 1):
+        data['update_id'] = update_id
+        bodies.append(json.dumps(data).encode('utf-8'))
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    status = await post_update(reader, writer, port, bodies[0], 'wrong-secret')
+    writer.close()
+    if status != 403:
+        raise RuntimeError(f"webhook accepted a wrong secret token (HTTP {status})")
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    latencies = []
+    started = time.perf_counter()
+    for body in bodies:
+        t0 = time.perf_counter()
+        status = await post_update(reader, writer, port, body, WEBHOOK_SECRET)
+        latencies.append(time.perf_counter() - t0)
+        if status != 200:
+            raise RuntimeError(f"webhook returned HTTP {status}")
+    # every update is marked done once its handlers have finished
+    await application.update_queue.join()
+    elapsed = time.perf_counter() - started
+    writer.close()
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    latencies.sort()
+    return {
+        'updates': len(bodies),
+        'per_sec': len(bodies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'allowed_updates': [str(update_type) for update_type in bot.allowed_updates(application)],
+        'max_queued': bot.update_processor.max_queued,
+    }
+
+
+def legacy_parse_birthdays(text):
+    """receive_birthday before parsers.py: two patterns looked up per line"""
+    new_birthdays = []
+    for line in [l.strip() for l in text.strip().split('\n') if l.strip()]:
+        m = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s*-\s*(.+)$", line)
+        if not m:
+            m = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s+[-:]?\s*(.+)$", line)
+        if m:
+            month, day = int(m.group(1)), int(m.group(2))
+            if 1 <= month <= 12 and 1 <= day <= 31:
+                new_birthdays.append({'month': month, 'day': day, 'name': m.group(3).strip()})
+    return new_birthdays
+
+
+def legacy_parse_quizzes(text):
+    """receive_quiz before parsers.py: split into blocks, a regex per choice line"""
+    new_quizzes = []
+    for block in text.strip().split('\n\n'):
+        lines = [l.strip() for l in block.strip().split('\n') if l.strip()]
+        if len(lines) >= 6:
+            choices = {}
+            for ch_line in lines[1:5]:
+                m = re.match(r"^([A-Da-d])\)\s*(.+)$", ch_line)
+                if m:
+                    choices[m.group(1).upper()] = m.group(2).strip()
+            ans_m = re.search(r"([A-Da-d])", lines[5])
+            if ans_m and len(choices) == 4:
+                new_quizzes.append({'question': lines[0], 'choices': choices, 'answer': ans_m.group(1).upper()})
+    return new_quizzes
+
+
+LEGACY_EVENT_LINE = re.compile(
+    r'^(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:[ T]+(\d{1,2}):(\d{2}))?\s*(?:[-–—:|]\s*)?(.*)$'
+)
+
+
+def legacy_parse_event(line):
+    line = line.strip()
+    match = LEGACY_EVENT_LINE.match(line)
+    if match:
+        year, month, day, hour, minute, title = match.groups()
+        try:
+            when = datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0))
+        except ValueError:
+            when = None
+        if when is not None and title.strip():
+            return {
+                'date': when.strftime('%Y-%m-%d'),
+                'time': when.strftime('%H:%M') if hour is not None else None,
+                'title': title.strip(),
+            }
+    return {'date': None, 'time': None, 'title': line}
+
+
+def legacy_parse_events(text):
+    """receive_events before parsers.py: parse_event per line"""
+    return [legacy_parse_event(line) for line in text.strip().split('\n') if line.strip()]
+
+
+def parser_batches(size):
+    """Pasted text of `size` entries per format, with about 1% bad lines"""
+    rng = random.Random(size)
+    birthdays, quizzes, events, verses = [], [], [], []
+    for i in range(size):
+        bad = rng.random() < 0.01
+        birthdays.append(f"{13 if bad else rng.randint(1, 12)}-{rng.randint(1, 28)} - Member {i}")
+        quizzes.append(f"Question {i}?\nA) one {i}\nB) two\nC) three\n" + ("" if bad else "D) four\n")
+                       + f"Answer: {'ABCD'[i % 4]}")
+        events.append(f"2030-{rng.randint(1, 12):02d}-{31 if bad else rng.randint(1, 28):02d} 18:00 - Event {i}")
+        verses.append(f"Verse number {i} - Psalm {i % 150 + 1}:{i % 20 + 1}")
+    return {
+        'birthday': '\n'.join(birthdays),
+        'quiz': '\n\n'.join(quizzes),
+        'event': '\n'.join(events),
+        'verse': '\n'.join(verses),
+    }
+
+
+def run_parsers(sizes):
+    """Time parsers.py against the code it replaced"""
+    sys.path.insert(0, BASE_DIR)
+    import parsers
+    legacy = {
+        'birthday': legacy_parse_birthdays,
+        'quiz': legacy_parse_quizzes,
+        'event': legacy_parse_events,
+        'verse': lambda text: [v.strip() for v in text.strip().split('\n') if v.strip()],
+    }
+    current = {
+        'birthday': parsers.parse_birthdays,
+        'quiz': parsers.parse_quizzes,
+        'event': parsers.parse_events,
+        'verse': parsers.parse_verses,
+    }
+    results = []
+    for size in sizes:
+        for kind, text in parser_batches(size).items():
+            row = {'size': size, 'format': kind}
+            for name, parse in (('legacy', legacy[kind]), ('parsers', current[kind])):
+                runs = []
+                for _ in range(5):
+                    started = time.perf_counter()
+                    parsed = parse(text)
+                    runs.append(time.perf_counter() - started)
+                items, errors = parsed if isinstance(parsed, tuple) else (parsed, None)
+                row[name] = {'ms': min(runs) * 1000, 'accepted': len(items),
+                             'errors': None if errors is None else len(errors)}
+            results.append(row)
+    return results
+
+
+def print_parser_report(results):
+    print(f"  {'format':<10} {'lines':>8} {'legacy ms':>10} {'parsers ms':>11} {'speedup':>8} "
+          f"{'accepted (legacy/new)':>22} {'errors':>7}")
+    for row in results:
+        old, new = row['legacy'], row['parsers']
+        print(f"  {row['format']:<10} {row['size']:>8,} {old['ms']:>10.2f} {new['ms']:>11.2f} "
+              f"{old['ms'] / new['ms']:>7.2f}x {old['accepted']:>10,} / {new['accepted']:<9,} {new['errors']:>7,}")
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_size(size, updates, broadcasts, flush_every, webhook=False, metrics=False):
+    """Benchmark every handler against one dataset size (child process)"""
+    sys.path.insert(0, BASE_DIR)
+    import bot
+    from telegram import Update
+    from telegram.ext import Application, CallbackContext, ExtBot
+
+    logging.disable(logging.WARNING)
+    random.seed(size)
+    groups = max(1, size // 100)
+
+    bot.metrics.enabled = metrics
+    ext_bot = ExtBot(token='1000:BENCHMARK', request=make_stub_request())
+    if metrics:
+        bot.metrics.timed_request(ext_bot.request)
+    application = Application.builder().bot(ext_bot).build()
+    await application.initialize()
+
+    bot.load_data()
+    started = time.perf_counter()
+    seed(bot, size, groups)
+    bot.persister.mark_dirty()
+    await bot.persister.flush()
+    result = {
+        'size': size,
+        'seed_seconds': time.perf_counter() - started,
+        'seed_bytes': bot.persister.bytes_written,
+        'handlers': {},
+    }
+
+    for name in HANDLERS:
+        count = broadcasts if name == 'receive_broadcast' else updates
+        prepared = []
+        for data, args, user_data in build_updates(name, count, size, groups):
+            update = Update.de_json(data, ext_bot)
+            context = CallbackContext.from_update(update, application)
+            context.args = args
+            context.user_data.update(user_data)
+            prepared.append((update, context))
+
+        handler = getattr(bot, name)
+        if metrics:
+            handler = bot.metrics.timed(handler)
+        if name == 'receive_broadcast':
+            await bot.broadcaster.start(application)
+        latencies = []
+        bytes_before = bot.persister.bytes_written
+        started = time.perf_counter()
+        for i, (update, context) in enumerate(prepared, 1):
+            t0 = time.perf_counter()
+            await handler(update, context)
+            latencies.append(time.perf_counter() - t0)
+            if i % flush_every == 0:
+                bot.checkpoint_message_counts()
+                await bot.persister.flush()
+        bot.checkpoint_message_counts()
+        await bot.persister.flush()
+        elapsed = time.perf_counter() - started
+        if name == 'receive_broadcast':
+            await bot.broadcaster.stop(application)
+
+        latencies.sort()
+        result['handlers'][name] = {
+            'updates': count,
+            'per_sec': count / elapsed,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'bytes_per_1k': (bot.persister.bytes_written - bytes_before) * 1000 / count,
+        }
+
+    # startup cost of the data this run wrote (snapshot + journal / database)
+    started = time.perf_counter()
+    bot.storage.load()
+    result['load_seconds'] = time.perf_counter() - started
+    result['codec'] = 'orjson' if bot.orjson is not None else 'json'
+
+    await application.shutdown()
+    if webhook:
+        result['webhook'] = await run_webhook(bot, updates, size, groups)
+    bot.storage.close()
+    return result
+
+
+def run_child(size, args) -> dict:
+    """Run one dataset size in a fresh process and temporary directory"""
+    env = dict(os.environ, STORAGE_BACKEND=args.backend, ADMIN_IDS=str(ADMIN_ID))
+    with tempfile.TemporaryDirectory(prefix='bot-bench-') as workdir:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', str(size),
+             '--updates', str(args.updates), '--broadcasts', str(args.broadcasts),
+             '--flush-every', str(args.flush_every)] + (['--webhook'] if args.webhook else [])
+            + (['--metrics'] if args.metrics else []),
+            cwd=workdir, env=env, stdout=subprocess.PIPE, check=True,
+        )
+    return json.loads(proc.stdout.decode('utf-8').strip().splitlines()[-1])
+
+
+def print_report(results, backend, metrics=False):
+    print(f"Storage backend: {backend}{', metrics on' if metrics else ''}")
+    for result in results:
+        print()
+        print(f"Dataset size {result['size']:,} "
+              f"(seeded in {result['seed_seconds']:.2f}s, snapshot {result['seed_bytes']:,} bytes, "
+              f"reload {result['load_seconds']:.2f}s with {result['codec']})")
+        print(f"  {'handler':<18} {'updates':>8} {'updates/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'bytes/1k':>12}")
+        for name, row in result['handlers'].items():
+            # the SQLite backend does not count the bytes it writes
+            written = '-' if backend == 'sqlite' else f"{row['bytes_per_1k']:,.0f}"
+            print(f"  {name:<18} {row['updates']:>8} {row['per_sec']:>11,.0f} {row['p50_ms']:>8.3f} "
+                  f"{row['p99_ms']:>8.3f} {written:>12}")
+        if 'webhook' in result:
+            row = result['webhook']
+            print(f"  {'webhook (HTTP)':<18} {row['updates']:>8} {row['per_sec']:>11,.0f} {row['p50_ms']:>8.3f} "
+                  f"{row['p99_ms']:>8.3f} {'-':>12}")
+            print(f"  allowed_updates: {', '.join(row['allowed_updates'])}; "
+                  f"max queued updates: {row['max_queued']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bot.py handlers offline")
+    parser.add_argument('--sizes', default='10,1000,10000,100000',
+                        help="comma-separated dataset sizes (users, scores and prayers each)")
+    parser.add_argument('--updates', type=int, default=1000, help="updates per handler")
+    parser.add_argument('--broadcasts', type=int, default=10, help="broadcasts submitted per size")
+    parser.add_argument('--flush-every', type=int, default=100, help="flush storage every N updates")
+    parser.add_argument('--backend', choices=('json', 'sqlite'), default=os.getenv('STORAGE_BACKEND', 'json'))
+    parser.add_argument('--webhook', action='store_true', help="also deliver updates through the webhook listener")
+    parser.add_argument('--parsers', action='store_true', help="benchmark the admin input parsers instead")
+    parser.add_argument('--metrics', action='store_true', help="run with the /metrics instrumentation enabled")
+    parser.add_argument('--json', action='store_true', help="print raw results as JSON")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        result = asyncio.run(run_size(args.child, args.updates, args.broadcasts, args.flush_every,
+                                     args.webhook, args.metrics))
+        print(json.dumps(result))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    if args.parsers:
+        results = run_parsers(sizes)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_parser_report(results)
+        return
+    results = [run_child(size, args) for size in sizes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, args.backend, args.metrics)
+
+
+if __name__ == '__main__':
+    main()
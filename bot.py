@@ -8,26 +8,74 @@ Fixed & improved by: ChatGPT
 
 import os
 import json
+import time
 import random
+import asyncio
+import bisect
+import cProfile
+import csv
+import gzip
+import hashlib
+import io
+import itertools
 import logging
-import re
-from datetime import datetime
-from typing import Optional
+import marshal
+import pstats
+import sqlite3
+import threading
+import secrets
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, time as dtime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application,
+    BaseUpdateProcessor,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
     ConversationHandler,
     ContextTypes,
+    ApplicationHandlerStop,
+    TypeHandler,
     filters,
 )
-from telegram.constants import ParseMode
+from telegram.constants import MessageLimit, ParseMode
+from telegram.request import BaseRequest
+from telegram.error import BadRequest, ChatMigrated, NetworkError, RetryAfter, TelegramError
 import pytz
 
+from parsers import (
+    make_birthday,
+    make_entry,
+    make_quiz,
+    normalize_text,
+    parse_birthdays,
+    parse_contacts,
+    parse_event,
+    parse_events,
+    parse_quizzes,
+    parse_verses,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Optional fast JSON codec for bot_data.json and the journal
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Process start, for the startup time logged by post_init
+STARTED_AT = time.perf_counter()
+
 # Load environment variables
 load_dotenv()
 
@@ -43,91 +91,1569 @@ BOT_TOKEN = os.getenv('BOT_TOKEN')
 ADMIN_IDS = [int(id.strip()) for id in os.getenv('ADMIN_IDS', '').split(',') if id.strip()]
 DATA_FILE = 'bot_data.json'
 TIMEZONE = pytz.timezone('Asia/Yangon')
+# Seconds between write-behind flushes of bot_data.json
+SAVE_INTERVAL = float(os.getenv('SAVE_INTERVAL', '5'))
+# Seconds between batched checkpoints of the auto-quiz message counters
+MESSAGE_CHECKPOINT_INTERVAL = float(os.getenv('MESSAGE_CHECKPOINT_INTERVAL', '60'))
+# Append-only mutation journal, compacted into DATA_FILE every N records
+JOURNAL_FILE = 'bot_data.journal'
+JOURNAL_COMPACT_EVERY = int(os.getenv('JOURNAL_COMPACT_EVERY', '500'))
+# Storage backend: 'json' (snapshot + journal) or 'sqlite'
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+SQLITE_FILE = 'bot_data.db'
+# Broadcast engine: queued jobs survive restarts in BROADCAST_FILE
+BROADCAST_FILE = 'broadcast_jobs.json'
+BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', '8'))
+BROADCAST_RATE = float(os.getenv('BROADCAST_RATE', '25'))
+BROADCAST_PROGRESS_INTERVAL = 3.0
+BROADCAST_MAX_ATTEMPTS = 3
+# Updates processed at the same time (updates of one chat always run in order)
+UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', '8'))
+# Webhook mode: set WEBHOOK_URL (public https base URL) to receive updates
+# through a local HTTP listener instead of long polling
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '').rstrip('/')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram').strip('/')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))
+# Default minimum minutes between auto quizzes in a chat (per chat: /autoquiz)
+AUTO_QUIZ_COOLDOWN = float(os.getenv('AUTO_QUIZ_COOLDOWN', '0'))
+# "prayers" broadcast segment: users who sent a prayer within this many days
+PRAYER_SEGMENT_DAYS = int(os.getenv('PRAYER_SEGMENT_DAYS', '30'))
+# Prayers older than this many days move to PRAYER_ARCHIVE_FILE (0 keeps all)
+PRAYER_RETENTION_DAYS = int(os.getenv('PRAYER_RETENTION_DAYS', '180'))
+PRAYER_ARCHIVE_FILE = 'prayers_archive.jsonl.gz'
+PRAYER_STATUSES = ('open', 'answered')
+# Items per page of /contact, /events and /praylist
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', '20'))
+# Rendered replies kept in memory (least recently used ones are dropped)
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '256'))
+# Flood protection, "updates/seconds" (0 turns a limit off; admins are exempt):
+# everything one user sends, messages in one group, and each command per user
+RATE_LIMIT_USER = os.getenv('RATE_LIMIT_USER', '30/60')
+RATE_LIMIT_CHAT = os.getenv('RATE_LIMIT_CHAT', '120/60')
+RATE_LIMIT_COMMAND = os.getenv('RATE_LIMIT_COMMAND', '5/30')
+# /profile window: default and maximum seconds, and rows in the summary
+PROFILE_SECONDS = int(os.getenv('PROFILE_SECONDS', '30'))
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '600'))
+PROFILE_TOP = int(os.getenv('PROFILE_TOP', '15'))
+# Prometheus metrics endpoint (http://METRICS_LISTEN:METRICS_PORT/metrics); off when 0
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_LISTEN = os.getenv('METRICS_LISTEN', '127.0.0.1')
+# Local time (HH:MM, TIMEZONE) of the daily birthday post to subscribed groups
+BIRTHDAY_ANNOUNCE_TIME = os.getenv('BIRTHDAY_ANNOUNCE_TIME', '07:00')
+# Hours before an event that subscribed groups get a reminder (0 disables)
+EVENT_REMINDER_HOURS = float(os.getenv('EVENT_REMINDER_HOURS', '24'))
+# Start time assumed for events given without one (ordering and reminders)
+ALL_DAY_EVENT_TIME = '09:00'
+# Largest file /import accepts (Telegram lets bots download up to 20 MB)
+IMPORT_MAX_BYTES = 20 * 1024 * 1024
 
 # Conversation states
 EDIT_ABOUT, EDIT_CONTACT, EDIT_VERSE, EDIT_EVENTS, EDIT_BIRTHDAY, EDIT_QUIZ = range(6)
 BROADCAST_TEXT, BROADCAST_PHOTO = range(6, 8)
+IMPORT_FILE = 8
 
 # Data structure
+_MISSING = object()
+
+
+class Record:
+    """A fixed set of fields in __slots__, stored in place of a small dict"""
+
+    __slots__ = ('extra',)
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, data: dict):
+        self.extra = None
+        for key, value in data.items():
+            self[key] = value
+
+    def _get(self, key: str, default=_MISSING):
+        if key in self.FIELDS:
+            return getattr(self, key, default)
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str):
+        value = self._get(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self._get(key) is not _MISSING
+
+    def get(self, key: str, default=None):
+        return self._get(key, default)
+
+    def setdefault(self, key: str, default=None):
+        value = self._get(key)
+        if value is _MISSING:
+            self[key] = value = default
+        return value
+
+    def to_dict(self) -> dict:
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Prayer(Record):
+    __slots__ = FIELDS = ('id', 'user_id', 'username', 'prayer', 'date', 'status')
+
+
+class Birthday(Record):
+    FIELDS = ('month', 'day', 'name')
+    # row_id is the SqliteStorage row; it is not part of the JSON entry
+    __slots__ = FIELDS + ('row_id',)
+
+
+class Quiz(Record):
+    __slots__ = FIELDS = ('id', 'question', 'choices', 'answer')
+
+
+class ScoreEntry(Record):
+    __slots__ = FIELDS = ('name', 'score')
+
+
+def json_default(obj):
+    """json.dumps hook: records are written as the dicts they replace"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj) -> bytes:
+    """Compact UTF-8 JSON (orjson when installed, else the json module)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+
+
+def json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def write_json_stream(f, data: dict, chunk: int = 1000) -> int:
+    """Write a dict as one compact JSON object; returns bytes written.
+
+    Values are encoded one top-level key at a time, and long lists and
+    dicts `chunk` entries at a time, so only a slice of the output is ever
+    held in memory instead of the whole document.
+    """
+    written = 0
+
+    def put(payload: bytes):
+        nonlocal written
+        f.write(payload)
+        written += len(payload)
+
+    put(b'{')
+    for n, (key, value) in enumerate(data.items()):
+        put((b',' if n else b'') + json_dumps(str(key)) + b':')
+        if isinstance(value, list) and len(value) > chunk:
+            put(b'[')
+            for start in range(0, len(value), chunk):
+                # encode a slice as a list and drop its brackets
+                put((b',' if start else b'') + json_dumps(value[start:start + chunk])[1:-1])
+            put(b']')
+        elif isinstance(value, dict) and len(value) > chunk:
+            items = list(value.items())
+            put(b'{')
+            for start in range(0, len(items), chunk):
+                put((b',' if start else b'') + json_dumps(dict(items[start:start + chunk]))[1:-1])
+            put(b'}')
+        else:
+            put(json_dumps(value))
+    put(b'}')
+    return written
+
+
+def _drain(items: list):
+    """Yield list items, dropping each from the list so it can be freed once used"""
+    for idx, item in enumerate(items):
+        items[idx] = None
+        yield item
+
+
+class Leaderboard:
+    """Incrementally maintained ranking of quiz scores: O(log n) updates, O(k) top k"""
+
+    def __init__(self, top_size: int = 10):
+        self.top_size = top_size
+        self.scores: Dict[str, int] = {}
+        self.buckets: Dict[int, Dict[str, None]] = {}
+        self.distinct: List[int] = []
+        self.version = 0
+        self._tree = [0] * 65
+
+    def __len__(self):
+        return len(self.scores)
+
+    def _tree_add(self, score: int, delta: int):
+        i = score + 1
+        if i >= len(self._tree):
+            self._grow(i)
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _grow(self, index: int):
+        size = len(self._tree)
+        while size <= index:
+            size *= 2
+        self._tree = [0] * size
+        for score, bucket in self.buckets.items():
+            i = score + 1
+            while i < size:
+                self._tree[i] += len(bucket)
+                i += i & -i
+
+    def _count_upto(self, score: int) -> int:
+        """Number of users with a score <= `score`"""
+        i = min(score + 1, len(self._tree) - 1)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _detach(self, user_id: str, score: int):
+        bucket = self.buckets[score]
+        del bucket[user_id]
+        if not bucket:
+            del self.buckets[score]
+            del self.distinct[bisect.bisect_left(self.distinct, score)]
+        self._tree_add(score, -1)
+
+    def _attach(self, user_id: str, score: int):
+        # counted before joining its bucket: a tree that has to grow is
+        # rebuilt from the buckets, which must not include the user yet
+        self._tree_add(score, 1)
+        bucket = self.buckets.get(score)
+        if bucket is None:
+            bucket = self.buckets[score] = {}
+            bisect.insort(self.distinct, score)
+        bucket[user_id] = None
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank (users with equal scores share a rank)"""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return len(self.scores) - self._count_upto(score) + 1
+
+    def set(self, user_id: str, score: int):
+        score = max(score, 0)
+        old = self.scores.get(user_id)
+        if old == score:
+            return
+        was_top = old is not None and self.rank(user_id) <= self.top_size
+        if old is not None:
+            self._detach(user_id, old)
+        self.scores[user_id] = score
+        self._attach(user_id, score)
+        if was_top or self.rank(user_id) <= self.top_size:
+            self.version += 1
+
+    def remove(self, user_id: str):
+        old = self.scores.pop(user_id, None)
+        if old is not None:
+            self._detach(user_id, old)
+            self.version += 1
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """First k (user_id, score) pairs, highest score first"""
+        result = []
+        for score in reversed(self.distinct):
+            for user_id in self.buckets[score]:
+                result.append((user_id, score))
+                if len(result) >= k:
+                    return result
+        return result
+
+
+EVENT_KEY_FORMAT = '%Y-%m-%d %H:%M'
+# Sort key of events without a date: after every dated one, never archived
+UNDATED_EVENT_KEY = '~'
+
+
+def event_key(event: dict) -> str:
+    """Local start time as 'YYYY-MM-DD HH:MM', which sorts chronologically"""
+    if not event.get('date'):
+        return UNDATED_EVENT_KEY
+    return f"{event['date']} {event.get('time') or ALL_DAY_EVENT_TIME}"
+
+
+def format_event(event: dict) -> str:
+    if not event.get('date'):
+        return event['title']
+    when = event['date'] if not event.get('time') else f"{event['date']} {event['time']}"
+    return f"{when} - {event['title']}"
+
+
+# /import: BotData op, backup-file key and parser of the pasted format per kind
+IMPORT_KINDS = {
+    'verse': ('add_verses', 'verses', parse_verses),
+    'quiz': ('add_quizzes', 'quizzes', parse_quizzes),
+    'birthday': ('add_birthdays', 'birthdays', parse_birthdays),
+}
+# first CSV cells that mark a header row
+CSV_HEADERS = {'verse', 'text', 'question', 'month', 'ကျမ်းချက်', 'မေးခွန်း', 'လ'}
+
+
+def dedupe_key(kind: str, item) -> bytes:
+    """What makes two entries the same: a digest of their normalize_text()
+    parts, so an index holds 16 bytes per entry instead of a copy"""
+    if kind == 'quiz':
+        choices = item.get('choices') or {}
+        parts = [item.get('question')] + [choices.get(letter) for letter in 'ABCD']
+    elif kind == 'birthday':
+        parts = [item.get('month'), item.get('day'), item.get('name')]
+    else:
+        parts = [item]
+    text = '\0'.join(normalize_text(part) for part in parts)
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _import_row(kind: str, row) -> object:
+    """Validated entry from one CSV row (list) or JSON item"""
+    if isinstance(row, list):
+        if kind == 'verse':
+            # verse[,reference]
+            return make_entry(' - '.join(cell for cell in row[:2] if cell))
+        if kind == 'quiz':
+            # question,A,B,C,D,answer
+            if len(row) < 6:
+                raise ValueError("Column ၆ ခု (question,A,B,C,D,answer) မပြည့်ပါ")
+            return make_quiz(row[0], dict(zip('ABCD', row[1:5])), row[5])
+        # month,day,name
+        if len(row) < 3:
+            raise ValueError("Column ၃ ခု (month,day,name) မပြည့်ပါ")
+        return make_birthday(row[0], row[1], row[2])
+    if kind == 'verse':
+        if not isinstance(row, str):
+            raise ValueError("စာသား မဟုတ်ပါ")
+        return make_entry(row)
+    if not isinstance(row, dict):
+        raise ValueError("Object {...} မဟုတ်ပါ")
+    if kind == 'quiz':
+        choices = row.get('choices')
+        if not isinstance(choices, dict):
+            choices = {letter: row.get(letter, row.get(letter.lower())) for letter in 'ABCD'}
+        return make_quiz(row.get('question'), choices, row.get('answer'))
+    return make_birthday(row.get('month'), row.get('day'), row.get('name', ''))
+
+
+def _parse_rows(kind: str, rows) -> Tuple[list, List[Tuple[int, str]]]:
+    items, errors = [], []
+    for number, row in rows:
+        try:
+            items.append(_import_row(kind, row))
+        except (ValueError, TypeError) as e:
+            errors.append((number, str(e)))
+    return items, errors
+
+
+def _csv_rows(lines) -> Iterator[Tuple[int, list]]:
+    reader = csv.reader(lines)
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if reader.line_num == 1 and row[0].strip().lower() in CSV_HEADERS:
+            continue
+        yield reader.line_num, [cell.strip() for cell in row]
+
+
+def parse_import_file(kind: str, filename: str, data: bytes,
+                      existing) -> Tuple[list, int, List[Tuple[int, str]]]:
+    """Parse an /import upload: (new entries, duplicates skipped, [(line, reason)]).
+
+    Plain-text files use the /ed... paste format and CSV files are read
+    line by line; JSON may be a list of entries or a /backup file. Entries
+    whose dedupe_key() is in `existing` or earlier in the file are counted
+    as duplicates. Runs in a worker thread.
+    """
+    fmt = os.path.splitext(filename.lower())[1]
+    if fmt == '.json':
+        raw = json_loads(data.decode('utf-8-sig'))
+        if isinstance(raw, dict):
+            raw = raw.get(IMPORT_KINDS[kind][1], [])
+        if not isinstance(raw, list):
+            raise ValueError("JSON list expected")
+        parsed, errors = _parse_rows(kind, enumerate(raw, 1))
+    else:
+        lines = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig', newline='' if fmt == '.csv' else None)
+        if fmt == '.csv':
+            parsed, errors = _parse_rows(kind, _csv_rows(lines))
+        else:
+            parsed, errors = IMPORT_KINDS[kind][2](lines)
+
+    items = []
+    duplicates = 0
+    seen = set()
+    for item in parsed:
+        key = dedupe_key(kind, item)
+        if key in existing or key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        items.append(item)
+    return items, duplicates, errors
+
+
+def prayer_matches(prayer: dict, query: dict) -> bool:
+    """Whether a prayer passes the filters of a /praylist query"""
+    if query['status'] and prayer.get('status', 'open') != query['status']:
+        return False
+    if query['user'] and prayer.get('user_id') != query['user_id']:
+        # archived prayers of users no longer in memory match by name
+        if (prayer.get('username') or '').lower() != query['user'].lstrip('@').lower():
+            return False
+    date = prayer.get('date', '')
+    if query['since'] and date < query['since']:
+        return False
+    if query['until'] and date >= query['until'] + '~':
+        return False
+    return True
+
+
 class BotData:
+    # Collections whose rendered replies are cached (see cached_render)
+    GENERATION_FIELDS = ('about', 'contacts', 'verses', 'events', 'birthdays',
+                         'prayers', 'quizzes', 'users', 'groups')
+    # Process-wide, so a generation number is never reused, not even by a
+    # BotData that replaces this one (restore, /allclear)
+    _generation_counter = itertools.count(1)
+    # /delete kinds -> field
+    ITEM_FIELDS = {'verse': 'verses', 'quiz': 'quizzes', 'event': 'events', 'contact': 'contacts',
+                   'birthday': 'birthdays'}
+    # Collections kept free of duplicates: kind -> field
+    DEDUPE_FIELDS = {'verse': 'verses', 'contact': 'contacts', 'quiz': 'quizzes'}
+
     def __init__(self):
         self.about = ""
         self.contacts = []
         self.verses = []
+        # Upcoming events sorted by event_key(); _event_keys runs parallel to
+        # it for bisect. Events from before today move to past_events.
         self.events = []
+        self._event_keys = []
+        self.past_events = []
         self.birthdays = []
+        # Prayers in arrival order (so also by date); _prayer_dates runs
+        # parallel to it for bisect. Old ones move to PRAYER_ARCHIVE_FILE.
         self.prayers = []
+        self._prayer_dates = []
+        self.next_prayer_id = 0
         self.quizzes = []
+        self.next_quiz_id = 0
         self.quiz_scores = {}
+        self.group_scores = {}
+        # Hot-path counters: int chat id -> messages since the last auto quiz.
+        # Only checkpoint_message_counts() persists them, in batches.
         self.message_count = {}
+        self.counts_changed = set()
         self.quiz_threshold = 10
+        self.chat_thresholds = {}
+        # int chat id -> {'cooldown': minutes, 'every': minutes} for auto quizzes
+        self.quiz_schedules = {}
+        # Groups that get the daily birthday announcement
+        self.birthday_groups = set()
+        # Groups that get event reminders; events up to event_reminder_mark
+        # (an event_key) have already been reminded
+        self.event_groups = set()
+        self.event_reminder_mark = ''
         self.users = set()
         self.groups = set()
+        # Derived indexes, rebuilt on load and maintained by add_score()
+        self.leaderboard = Leaderboard()
+        self.group_leaderboards = {}
+        self.names_version = 0
+        # Quiz id -> quiz, plus a dense id array for dealing quiz decks
+        # (_quiz_pos maps an id to its slot so deletes can swap-remove)
+        self.quiz_by_id = {}
+        self.quiz_ids = []
+        self._quiz_pos = {}
+        # user_id -> date of their latest prayer, ordered oldest to newest
+        self.prayer_activity = OrderedDict()
+        # Prayer id -> prayer, user_id -> their prayers (oldest first) and
+        # lowercased username -> user_id, for /praylist filters
+        self.prayer_by_id = {}
+        self.prayers_by_user = {}
+        self.prayer_usernames = {}
+        # birthday_index[month - 1][day - 1] -> birthdays on that date
+        self.birthday_index = [[[] for _ in range(31)] for _ in range(12)]
+        # kind -> {dedupe_key: entries with that key}, for O(1) duplicate
+        # checks on insert; duplicates[kind] counts the entries beyond the
+        # first per key (left from before the index, see remove_duplicates)
+        self.dedupe_index = {kind: {} for kind in self.DEDUPE_FIELDS}
+        self.duplicates = dict.fromkeys(self.DEDUPE_FIELDS, 0)
+        # Collection name -> generation, bumped by every mutation of it
+        self.generations = {}
+        self.touch(*self.GENERATION_FIELDS)
 
     def to_dict(self):
+        """The bot_data.json object, with records as plain dicts"""
+        data = self._fields()
+        for key in ('birthdays', 'prayers', 'quizzes'):
+            data[key] = [item.to_dict() for item in data[key]]
+        data['quiz_scores'] = {user_id: entry.to_dict() for user_id, entry in self.quiz_scores.items()}
+        return data
+
+    def _fields(self):
         return {
             'about': self.about,
             'contacts': self.contacts,
             'verses': self.verses,
             'events': self.events,
+            'past_events': self.past_events,
             'birthdays': self.birthdays,
             'prayers': self.prayers,
+            'next_prayer_id': self.next_prayer_id,
             'quizzes': self.quizzes,
+            'next_quiz_id': self.next_quiz_id,
             'quiz_scores': self.quiz_scores,
-            'message_count': self.message_count,
+            'group_scores': self.group_scores,
+            'message_count': {str(chat_id): count for chat_id, count in self.message_count.items()},
             'quiz_threshold': self.quiz_threshold,
+            'chat_thresholds': {str(chat_id): value for chat_id, value in self.chat_thresholds.items()},
+            'quiz_schedules': {str(chat_id): value for chat_id, value in self.quiz_schedules.items()},
+            'birthday_groups': list(self.birthday_groups),
+            'event_groups': list(self.event_groups),
+            'event_reminder_mark': self.event_reminder_mark,
             'users': list(self.users),
             'groups': list(self.groups),
         }
 
     @classmethod
     def from_dict(cls, data):
+        """Build BotData from a bot_data.json object.
+
+        The prayer, birthday and quiz lists of `data` are emptied while
+        their records are built, so the parsed dicts are freed as loading
+        goes instead of all at the end.
+        """
         bot_data = cls()
         bot_data.about = data.get('about', '')
-        bot_data.contacts = data.get('contacts', [])
-        bot_data.verses = data.get('verses', [])
-        bot_data.events = data.get('events', [])
-        bot_data.birthdays = data.get('birthdays', [])
-        bot_data.prayers = data.get('prayers', [])
-        bot_data.quizzes = data.get('quizzes', [])
-        bot_data.quiz_scores = data.get('quiz_scores', {})
-        bot_data.message_count = data.get('message_count', {})
+        bot_data.add_contacts(data.get('contacts', []))
+        bot_data.add_verses(data.get('verses', []))
+        # Events saved as plain text lines are parsed into records here
+        bot_data.add_events(data.get('events', []))
+        bot_data.past_events = data.get('past_events', [])
+        bot_data.add_birthdays(_drain(data.get('birthdays', [])))
+        # prayers saved before ids existed are numbered in order here
+        bot_data.next_prayer_id = data.get('next_prayer_id', 0)
+        for prayer in _drain(data.get('prayers', [])):
+            bot_data.add_prayer(prayer)
+        bot_data.next_quiz_id = data.get('next_quiz_id', 0)
+        # Quizzes saved before ids existed get their list position as id,
+        # which keeps buttons sent under the old positional scheme working
+        quizzes = data.get('quizzes', [])
+        for idx, quiz in enumerate(quizzes):
+            quiz.setdefault('id', idx)
+        bot_data.add_quizzes(_drain(quizzes))
+        bot_data.quiz_scores = {user_id: ScoreEntry(entry) for user_id, entry in data.get('quiz_scores', {}).items()}
+        bot_data.group_scores = data.get('group_scores', {})
+        bot_data.message_count = {int(chat_id): count for chat_id, count in data.get('message_count', {}).items()}
         bot_data.quiz_threshold = data.get('quiz_threshold', 10)
+        bot_data.chat_thresholds = {int(chat_id): value for chat_id, value in data.get('chat_thresholds', {}).items()}
+        bot_data.quiz_schedules = {int(chat_id): value for chat_id, value in data.get('quiz_schedules', {}).items()}
+        bot_data.birthday_groups = set(data.get('birthday_groups', []))
+        bot_data.event_groups = set(data.get('event_groups', []))
+        bot_data.event_reminder_mark = data.get('event_reminder_mark', '')
         bot_data.users = set(data.get('users', []))
         bot_data.groups = set(data.get('groups', []))
+        for user_id, entry in bot_data.quiz_scores.items():
+            bot_data.leaderboard.set(user_id, entry.get('score', 0))
+        for chat_id, scores in bot_data.group_scores.items():
+            board = bot_data.group_leaderboards[chat_id] = Leaderboard()
+            for user_id, score in scores.items():
+                board.set(user_id, score)
         return bot_data
 
+    def touch(self, *fields):
+        """Start a new generation of the given collections"""
+        for field in fields:
+            self.generations[field] = next(self._generation_counter)
+
+    # Mutations. Handlers change data only through these methods (via
+    # record()) so every change can be journaled and replayed by name.
+    def add_user(self, user_id):
+        self.users.add(user_id)
+        self.touch('users')
+
+    def add_group(self, chat_id):
+        self.groups.add(chat_id)
+        self.touch('groups')
+
+    def set_about(self, text):
+        self.about = text
+        self.touch('about')
+
+    def add_contacts(self, contacts):
+        self.contacts.extend(contacts)
+        self._index_entries('contact', contacts)
+        self.touch('contacts')
+
+    def add_verses(self, verses):
+        self.verses.extend(verses)
+        self._index_entries('verse', verses)
+        self.touch('verses')
+
+    def _index_entries(self, kind, entries):
+        index = self.dedupe_index[kind]
+        for entry in entries:
+            key = dedupe_key(kind, entry)
+            count = index.get(key, 0)
+            index[key] = count + 1
+            if count:
+                self.duplicates[kind] += 1
+
+    def _unindex_entry(self, kind, entry):
+        index = self.dedupe_index[kind]
+        key = dedupe_key(kind, entry)
+        count = index.pop(key)
+        if count > 1:
+            index[key] = count - 1
+            self.duplicates[kind] -= 1
+
+    def new_entries(self, kind, entries) -> Tuple[list, int]:
+        """The entries that are neither stored yet nor repeated earlier in
+        `entries`, and how many were left out"""
+        index = self.dedupe_index[kind]
+        fresh, seen = [], set()
+        for entry in entries:
+            key = dedupe_key(kind, entry)
+            if key not in index and key not in seen:
+                seen.add(key)
+                fresh.append(entry)
+        return fresh, len(entries) - len(fresh)
+
+    def remove_duplicates(self, kind) -> int:
+        """Keep the first of every set of equal entries; returns how many went"""
+        field = self.DEDUPE_FIELDS[kind]
+        entries = getattr(self, field)
+        index = self.dedupe_index[kind] = {}
+        kept = []
+        for entry in entries:
+            key = dedupe_key(kind, entry)
+            if key in index:
+                if kind == 'quiz':
+                    self._unindex_quiz(entry['id'])
+                continue
+            index[key] = 1
+            kept.append(entry)
+        removed = len(entries) - len(kept)
+        self.duplicates[kind] = 0
+        if removed:
+            entries[:] = kept
+            self.touch(field)
+        return removed
+
+    def add_events(self, events):
+        for event in events:
+            if isinstance(event, str):
+                event = parse_event(event)
+            key = event_key(event)
+            pos = bisect.bisect_right(self._event_keys, key)
+            self._event_keys.insert(pos, key)
+            self.events.insert(pos, event)
+        self.touch('events')
+
+    def events_between(self, after: str, until: str) -> list:
+        """Events with after < event_key <= until"""
+        lo = bisect.bisect_right(self._event_keys, after)
+        hi = bisect.bisect_right(self._event_keys, until)
+        return self.events[lo:hi]
+
+    def next_event_after(self, key: str) -> Optional[dict]:
+        """First dated event whose event_key is later than key"""
+        pos = bisect.bisect_right(self._event_keys, key)
+        if pos < len(self.events) and self._event_keys[pos] != UNDATED_EVENT_KEY:
+            return self.events[pos]
+        return None
+
+    def archive_events(self, before):
+        """Move events with event_key < before to past_events"""
+        pos = bisect.bisect_left(self._event_keys, before)
+        if pos:
+            self.past_events.extend(self.events[:pos])
+            del self.events[:pos]
+            del self._event_keys[:pos]
+            self.touch('events')
+
+    def has_past_events(self, before) -> bool:
+        """Whether archive_events(before) would move anything"""
+        return bool(self._event_keys) and self._event_keys[0] < before
+
+    def set_event_group(self, chat_id, enabled):
+        if enabled:
+            self.event_groups.add(chat_id)
+        else:
+            self.event_groups.discard(chat_id)
+
+    def set_event_reminder_mark(self, key):
+        self.event_reminder_mark = key
+
+    def add_birthdays(self, birthdays):
+        for birthday in birthdays:
+            birthday = Birthday(birthday)
+            self.birthdays.append(birthday)
+            bucket = self._birthday_bucket(birthday)
+            if bucket is not None:
+                bucket.append(birthday)
+        self.touch('birthdays')
+
+    def _birthday_bucket(self, birthday) -> Optional[list]:
+        month, day = birthday.get('month'), birthday.get('day')
+        if isinstance(month, int) and isinstance(day, int) and 1 <= month <= 12 and 1 <= day <= 31:
+            return self.birthday_index[month - 1][day - 1]
+        return None
+
+    def birthdays_on(self, month, day) -> list:
+        return self.birthday_index[month - 1][day - 1]
+
+    def set_birthday_group(self, chat_id, enabled):
+        if enabled:
+            self.birthday_groups.add(chat_id)
+        else:
+            self.birthday_groups.discard(chat_id)
+
+    def add_quizzes(self, quizzes):
+        self.touch('quizzes')
+        for quiz in quizzes:
+            if 'id' not in quiz:
+                quiz['id'] = self.next_quiz_id
+            quiz = Quiz(quiz)
+            self.next_quiz_id = max(self.next_quiz_id, quiz['id'] + 1)
+            self.quizzes.append(quiz)
+            self._index_entries('quiz', (quiz,))
+            self.quiz_by_id[quiz['id']] = quiz
+            self._quiz_pos[quiz['id']] = len(self.quiz_ids)
+            self.quiz_ids.append(quiz['id'])
+
+    def _unindex_quiz(self, quiz_id):
+        pos = self._quiz_pos.pop(quiz_id)
+        last = self.quiz_ids.pop()
+        if last != quiz_id:
+            self.quiz_ids[pos] = last
+            self._quiz_pos[last] = pos
+        del self.quiz_by_id[quiz_id]
+
+    def add_prayer(self, prayer):
+        if 'id' not in prayer:
+            prayer['id'] = self.next_prayer_id
+        prayer.setdefault('status', 'open')
+        prayer = Prayer(prayer)
+        self.next_prayer_id = max(self.next_prayer_id, prayer['id'] + 1)
+        self.prayers.append(prayer)
+        self._prayer_dates.append(prayer.get('date', ''))
+        self.prayer_by_id[prayer['id']] = prayer
+        self.touch('prayers')
+        user_id = prayer.get('user_id')
+        if user_id is not None:
+            self.prayer_activity[user_id] = prayer.get('date', '')
+            self.prayer_activity.move_to_end(user_id)
+            self.prayers_by_user.setdefault(user_id, []).append(prayer)
+            if prayer.get('username'):
+                self.prayer_usernames[prayer['username'].lower()] = user_id
+
+    def prayers_before(self, date: str) -> list:
+        """The oldest prayers, up to the first one dated on or after `date`"""
+        return self.prayers[:bisect.bisect_left(self._prayer_dates, date)]
+
+    def set_prayer_status(self, prayer_id, status):
+        prayer = self.prayer_by_id.get(prayer_id)
+        if prayer is None:
+            return False
+        prayer['status'] = status
+        self.touch('prayers')
+        return True
+
+    def archive_prayers(self, upto_id):
+        """Drop the oldest prayers, up to and including id upto_id, from memory"""
+        count = 0
+        while count < len(self.prayers) and self.prayers[count]['id'] <= upto_id:
+            prayer = self.prayers[count]
+            del self.prayer_by_id[prayer['id']]
+            own = self.prayers_by_user.get(prayer.get('user_id'))
+            if own and own[0] is prayer:
+                del own[0]
+                if not own:
+                    del self.prayers_by_user[prayer['user_id']]
+            count += 1
+        if count:
+            del self.prayers[:count]
+            del self._prayer_dates[:count]
+            self.touch('prayers')
+
+    def find_prayers(self, query: dict) -> List[dict]:
+        """Prayers matching a /praylist query, oldest first"""
+        if query['user']:
+            candidates = self.prayers_by_user.get(query['user_id'], [])
+        else:
+            # dates sort as text, so a date range is two bisections
+            lo = bisect.bisect_left(self._prayer_dates, query['since']) if query['since'] else 0
+            hi = (bisect.bisect_left(self._prayer_dates, query['until'] + '~')
+                  if query['until'] else len(self.prayers))
+            candidates = self.prayers[lo:hi]
+        return [prayer for prayer in candidates if prayer_matches(prayer, query)]
+
+    def recent_prayer_users(self, since: str) -> List[int]:
+        """Users whose latest prayer is at or after `since`, newest first"""
+        users = []
+        for user_id in reversed(self.prayer_activity):
+            if self.prayer_activity[user_id] < since:
+                break
+            users.append(user_id)
+        return users
+
+    def add_score(self, user_id, name, points, chat_id=None):
+        entry = self.quiz_scores.get(user_id)
+        if entry is None:
+            entry = self.quiz_scores[user_id] = ScoreEntry({'name': name, 'score': 0})
+        entry['score'] += points
+        if entry['name'] != name:
+            entry['name'] = name
+            self.names_version += 1
+        self.leaderboard.set(user_id, entry['score'])
+        if chat_id is not None:
+            scores = self.group_scores.setdefault(chat_id, {})
+            scores[user_id] = scores.get(user_id, 0) + points
+            board = self.group_leaderboards.get(chat_id)
+            if board is None:
+                board = self.group_leaderboards[chat_id] = Leaderboard()
+            board.set(user_id, scores[user_id])
+        return entry['score']
+
+    def reset_message_count(self, chat_id):
+        # kept so journals written before set_message_counts still replay
+        self.message_count[int(chat_id)] = 0
+
+    def set_message_counts(self, counts):
+        for chat_id, count in counts.items():
+            self.message_count[int(chat_id)] = count
+
+    def set_quiz_threshold(self, threshold):
+        self.quiz_threshold = threshold
+
+    def set_chat_threshold(self, chat_id, threshold):
+        if threshold:
+            self.chat_thresholds[int(chat_id)] = threshold
+        else:
+            self.chat_thresholds.pop(int(chat_id), None)
+
+    def set_quiz_schedule(self, chat_id, cooldown, every):
+        if cooldown or every:
+            self.quiz_schedules[int(chat_id)] = {'cooldown': cooldown, 'every': every}
+        else:
+            self.quiz_schedules.pop(int(chat_id), None)
+
+    def has_item(self, kind, index) -> bool:
+        field = self.ITEM_FIELDS.get(kind)
+        return field is not None and 0 <= index < len(getattr(self, field))
+
+    def delete_item(self, kind, index):
+        """Remove one entry; returns it, or None for a bad index"""
+        if not self.has_item(kind, index):
+            return None
+        field = self.ITEM_FIELDS[kind]
+        removed = getattr(self, field).pop(index)
+        self.touch(field)
+        if kind in self.dedupe_index:
+            self._unindex_entry(kind, removed)
+        if kind == 'quiz':
+            self._unindex_quiz(removed['id'])
+        elif kind == 'event':
+            del self._event_keys[index]
+        elif kind == 'birthday':
+            bucket = self._birthday_bucket(removed) or []
+            for pos, birthday in enumerate(bucket):
+                if birthday is removed:
+                    del bucket[pos]
+                    break
+        return removed
+
+    def clear(self):
+        self.__init__()
+
+    def snapshot(self):
+        """Copy collections so the dict can be serialized off the event loop;
+        score entries are copied too, as add_score() changes them in place"""
+        data = self._fields()
+        for key, value in data.items():
+            if isinstance(value, list):
+                data[key] = list(value)
+            elif isinstance(value, dict):
+                data[key] = dict(value)
+        data['quiz_scores'] = {user_id: entry.to_dict() for user_id, entry in self.quiz_scores.items()}
+        data['group_scores'] = {chat_id: dict(scores) for chat_id, scores in self.group_scores.items()}
+        return data
+
+
+# BotData methods that may appear in the journal
+JOURNALED_OPS = frozenset({
+    'add_user', 'add_group', 'set_about', 'add_contacts', 'add_verses',
+    'add_events', 'add_birthdays', 'add_quizzes', 'add_prayer', 'set_prayer_status',
+    'archive_prayers', 'add_score',
+    'reset_message_count', 'set_message_counts', 'set_quiz_threshold',
+    'set_chat_threshold', 'set_quiz_schedule', 'set_birthday_group', 'archive_events',
+    'set_event_group', 'set_event_reminder_mark', 'delete_item', 'remove_duplicates', 'clear',
+})
+
 # Global data storage
 bot_data = BotData()
 
-# Utility functions
-def save_data() -> bool:
-    """Save bot data to JSON file"""
-    try:
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(bot_data.to_dict(), f, ensure_ascii=False, indent=2)
-        logger.info("Data saved successfully")
-        return True
-    except Exception as e:
-        logger.exception(f"Error saving data: {e}")
+
+class Storage(ABC):
+    """Persists BotData; the read queries are answered from the in-memory bot_data"""
+
+    @abstractmethod
+    def exists(self) -> bool:
+        """Whether there is stored data to load"""
+
+    @abstractmethod
+    def load(self) -> Tuple[BotData, int, int]:
+        """Return (data, last journal seq, number of replayed records)"""
+
+    @abstractmethod
+    def log(self, seq: int, op: str, args: tuple, data: BotData, result=None):
+        """Record for an applied mutation, queued for write(); `result` is what the BotData method returned"""
+
+    @abstractmethod
+    def write(self, records: list) -> int:
+        """Persist queued records from the flush thread; returns bytes written"""
+
+    @abstractmethod
+    def compact(self, data: dict, seq: int) -> int:
+        """Replace stored data with a full snapshot; returns bytes written"""
+
+    def should_compact(self, journal_records: int) -> bool:
         return False
 
+    def close(self):
+        pass
+
+    def size(self) -> int:
+        """Bytes the stored data takes on disk"""
+        return sum(os.path.getsize(path) for path in self.files() if os.path.exists(path))
+
+    def files(self) -> Tuple[str, ...]:
+        return ()
+
+    def top_scores(self, limit: int) -> List[Tuple[str, str, int]]:
+        """(user_id, name, score) ordered by score, highest first"""
+        return [
+            (uid, bot_data.quiz_scores[uid].get('name'), score)
+            for uid, score in bot_data.leaderboard.top(limit)
+        ]
+
+    def recent_prayers(self, limit: int, offset: int = 0) -> List[dict]:
+        """Last `limit` prayers before the newest `offset`, oldest first"""
+        end = len(bot_data.prayers) - offset
+        return bot_data.prayers[max(0, end - limit):max(0, end)]
+
+    def find_prayers(self, query: dict, limit: int, offset: int = 0) -> Tuple[List[dict], int]:
+        """One page of the prayers matching a /praylist query, newest
+        first, and the number of matches"""
+        matches = bot_data.find_prayers(query)
+        end = len(matches) - offset
+        return matches[max(0, end - limit):max(0, end)][::-1], len(matches)
+
+    def birthdays_in_month(self, month: int) -> List[dict]:
+        """Birthdays in `month` ordered by day"""
+        return [birthday for day in bot_data.birthday_index[month - 1] for birthday in day]
+
+    def birthdays_on(self, month: int, day: int) -> List[dict]:
+        """Birthdays on one date"""
+        return list(bot_data.birthdays_on(month, day))
+
+    def counts(self) -> Dict[str, int]:
+        """Collection sizes for /stats"""
+        return {
+            'users': len(bot_data.users),
+            'groups': len(bot_data.groups),
+            'verses': len(bot_data.verses),
+            'quizzes': len(bot_data.quizzes),
+            'prayers': len(bot_data.prayers),
+            'birthdays': len(bot_data.birthdays),
+            'events': len(bot_data.events),
+            'contacts': len(bot_data.contacts),
+        }
+
+
+class JournalStorage(Storage):
+    """Crash-safe storage: a bot_data.json snapshot plus an append-only journal of mutations"""
+
+    def __init__(self, path: str = DATA_FILE, journal_path: str = JOURNAL_FILE,
+                 compact_every: int = JOURNAL_COMPACT_EVERY):
+        self.path = path
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    def files(self) -> Tuple[str, ...]:
+        return self.path, self.journal_path
+
+    def load(self) -> Tuple[BotData, int, int]:
+        data = BotData()
+        seq = 0
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'rb') as f:
+                    raw = json_loads(f.read())
+                seq = raw.get('journal_seq', 0)
+                data = BotData.from_dict(raw)
+                del raw
+            except ValueError as e:
+                # Keep the damaged file for manual recovery instead of letting
+                # the next compaction overwrite it with whatever survived.
+                corrupt = f"{self.path}.corrupt-{datetime.now(TIMEZONE).strftime('%Y%m%d_%H%M%S')}"
+                os.replace(self.path, corrupt)
+                logger.error(f"Snapshot {self.path} is corrupt ({e}); moved to {corrupt}")
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for lineno, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        # A torn final line is expected after a crash mid-append
+                        logger.warning(f"Stopping journal replay at torn line {lineno}")
+                        break
+                    if entry['seq'] <= seq:
+                        continue
+                    if entry['op'] not in JOURNALED_OPS:
+                        logger.warning(f"Skipping unknown journal op {entry['op']!r} at line {lineno}")
+                        continue
+                    getattr(data, entry['op'])(*entry['args'])
+                    seq = entry['seq']
+                    replayed += 1
+        return data, seq, replayed
+
+    def log(self, seq: int, op: str, args: tuple, data: BotData, result=None) -> bytes:
+        return json_dumps({'seq': seq, 'op': op, 'args': args}) + b'\n'
+
+    def write(self, records: List[bytes]) -> int:
+        """Append encoded journal lines and fsync"""
+        payload = b''.join(records)
+        with open(self.journal_path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(payload)
+
+    def compact(self, data: dict, seq: int) -> int:
+        """Atomically replace the snapshot and truncate the journal"""
+        data['journal_seq'] = seq
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb', buffering=1 << 16) as f:
+            written = write_json_stream(f, data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # Records up to seq now live in the snapshot
+        with open(self.journal_path, 'wb') as f:
+            os.fsync(f.fileno())
+        return written
+
+    def should_compact(self, journal_records: int) -> bool:
+        return journal_records >= self.compact_every
+
+
+class SqliteStorage(Storage):
+    """SQLite backend (WAL mode): a table per record collection, the rest as JSON in `meta`"""
+
+    # BotData fields kept as JSON values in the meta table
+    META_FIELDS = ('about', 'contacts', 'verses', 'events', 'quizzes', 'next_quiz_id', 'next_prayer_id',
+                   'message_count', 'quiz_threshold', 'chat_thresholds', 'quiz_schedules',
+                   'birthday_groups', 'past_events', 'event_groups', 'event_reminder_mark')
+    META_OPS = {
+        'set_about': ('about',),
+        'add_contacts': ('contacts',),
+        'add_verses': ('verses',),
+        'add_events': ('events',),
+        'add_quizzes': ('quizzes', 'next_quiz_id'),
+        'reset_message_count': ('message_count',),
+        'set_message_counts': ('message_count',),
+        'set_quiz_threshold': ('quiz_threshold',),
+        'set_chat_threshold': ('chat_thresholds',),
+        'set_quiz_schedule': ('quiz_schedules',),
+        'set_birthday_group': ('birthday_groups',),
+        'archive_events': ('events', 'past_events'),
+        'set_event_group': ('event_groups',),
+        'set_event_reminder_mark': ('event_reminder_mark',),
+    }
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS prayers (
+            id INTEGER PRIMARY KEY, user_id INTEGER, date TEXT, data TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS prayers_date ON prayers (date);
+        CREATE INDEX IF NOT EXISTS prayers_user_date ON prayers (user_id, date);
+        CREATE TABLE IF NOT EXISTS quiz_scores (
+            user_id TEXT PRIMARY KEY, name TEXT, score INTEGER NOT NULL DEFAULT 0);
+        CREATE INDEX IF NOT EXISTS quiz_scores_score ON quiz_scores (score DESC);
+        CREATE TABLE IF NOT EXISTS group_scores (
+            chat_id TEXT, user_id TEXT, score INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (chat_id, user_id));
+        CREATE INDEX IF NOT EXISTS group_scores_chat_score ON group_scores (chat_id, score DESC);
+        CREATE TABLE IF NOT EXISTS birthdays (
+            id INTEGER PRIMARY KEY, month INTEGER, day INTEGER, data TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS birthdays_month_day ON birthdays (month, day);
+        CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY);
+        CREATE TABLE IF NOT EXISTS chat_groups (id INTEGER PRIMARY KEY);
+    """
+
+    def __init__(self, path: str = SQLITE_FILE, json_path: str = DATA_FILE):
+        self.path = path
+        self.json_path = json_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self._birthday_ids = itertools.count(1)
+
+    def files(self) -> Tuple[str, ...]:
+        return self.path, f"{self.path}-wal"
+
+    def exists(self) -> bool:
+        row = self._conn.execute("SELECT 1 FROM meta LIMIT 1").fetchone()
+        return row is not None or os.path.exists(self.json_path)
+
+    def load(self) -> Tuple[BotData, int, int]:
+        with self._lock:
+            meta = {row['key']: json_loads(row['value']) for row in self._conn.execute("SELECT key, value FROM meta")}
+        if not meta and os.path.exists(self.json_path):
+            # First start on SQLite: import the existing JSON snapshot + journal
+            data, seq, replayed = JournalStorage(self.json_path).load()
+            self.compact(data.snapshot(), seq)
+            logger.info(f"Imported {self.json_path} into {self.path}")
+            return data, seq, replayed
+
+        with self._lock:
+            raw = {key: meta[key] for key in self.META_FIELDS if key in meta}
+            raw['prayers'] = []
+            for r in self._conn.execute("SELECT id, data FROM prayers ORDER BY id"):
+                # rows written before prayers had ids use the row id
+                prayer = json.loads(r['data'])
+                prayer.setdefault('id', r['id'])
+                raw['prayers'].append(prayer)
+            raw['birthdays'] = []
+            birthday_ids = []
+            for r in self._conn.execute("SELECT id, data FROM birthdays ORDER BY id"):
+                raw['birthdays'].append(json.loads(r['data']))
+                birthday_ids.append(r['id'])
+            raw['quiz_scores'] = {
+                r['user_id']: {'name': r['name'], 'score': r['score']}
+                for r in self._conn.execute("SELECT user_id, name, score FROM quiz_scores ORDER BY rowid")
+            }
+            raw['group_scores'] = {}
+            for r in self._conn.execute("SELECT chat_id, user_id, score FROM group_scores"):
+                raw['group_scores'].setdefault(r['chat_id'], {})[r['user_id']] = r['score']
+            raw['users'] = [r['id'] for r in self._conn.execute("SELECT id FROM users")]
+            raw['groups'] = [r['id'] for r in self._conn.execute("SELECT id FROM chat_groups")]
+        data = BotData.from_dict(raw)
+        for birthday, row_id in zip(data.birthdays, birthday_ids):
+            birthday.row_id = row_id
+        self._birthday_ids = itertools.count(birthday_ids[-1] + 1 if birthday_ids else 1)
+        return data, meta.get('journal_seq', 0), 0
+
+    @staticmethod
+    def _encode_meta(value) -> str:
+        if isinstance(value, set):
+            value = list(value)
+        return json_dumps(value).decode('utf-8')
+
+    def _put_meta(self, key: str, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, self._encode_meta(value)))
+
+    @staticmethod
+    def _copy_meta(fields, data: BotData) -> dict:
+        """The current values of meta fields, copied so write() can encode them off the loop"""
+        values = {}
+        for field in fields:
+            value = getattr(data, field)
+            if isinstance(value, (list, set)):
+                value = list(value)
+            elif isinstance(value, dict):
+                value = dict(value)
+            values[field] = value
+        return values
+
+    def _insert_prayer(self, prayer: dict) -> int:
+        # the row id is the prayer id
+        encoded = json.dumps(prayer, ensure_ascii=False, default=json_default)
+        self._conn.execute(
+            "INSERT INTO prayers (id, user_id, date, data) VALUES (?, ?, ?, ?)",
+            (prayer.get('id'), prayer.get('user_id'), prayer.get('date'), encoded),
+        )
+        return len(encoded)
+
+    def _insert_birthdays(self, birthdays: List[Birthday]) -> int:
+        # the row id is kept on the record so delete_item can find the row
+        for birthday in birthdays:
+            if getattr(birthday, 'row_id', None) is None:
+                birthday.row_id = next(self._birthday_ids)
+        rows = [(b.row_id, b.get('month'), b.get('day'), json.dumps(b, ensure_ascii=False, default=json_default))
+                for b in birthdays]
+        self._conn.executemany("INSERT INTO birthdays (id, month, day, data) VALUES (?, ?, ?, ?)", rows)
+        return sum(len(row[3]) for row in rows)
+
+    def log(self, seq: int, op: str, args: tuple, data: BotData, result=None) -> list:
+        """The row changes of a mutation, as steps for write() to run"""
+        if op == 'add_user':
+            return [('exec', "INSERT OR IGNORE INTO users (id) VALUES (?)", args)]
+        if op == 'add_group':
+            return [('exec', "INSERT OR IGNORE INTO chat_groups (id) VALUES (?)", args)]
+        if op == 'add_prayer':
+            prayer = data.prayer_by_id[args[0]['id']].to_dict()
+            return [('prayer', prayer), ('meta', {'next_prayer_id': data.next_prayer_id})]
+        if op == 'set_prayer_status':
+            prayer = data.prayer_by_id.get(args[0])
+            return [('prayer_data', prayer.to_dict())] if prayer is not None else []
+        if op == 'archive_prayers':
+            return [('exec', "DELETE FROM prayers WHERE id <= ?", args)]
+        if op == 'add_birthdays':
+            if not args[0]:
+                return []
+            birthdays = data.birthdays[-len(args[0]):]
+            for birthday in birthdays:
+                birthday.row_id = next(self._birthday_ids)
+            return [('birthdays', birthdays)]
+        if op == 'add_score':
+            user_id, name, points = args[:3]
+            steps = [('exec', "INSERT INTO quiz_scores (user_id, name, score) VALUES (?, ?, ?) "
+                              "ON CONFLICT (user_id) DO UPDATE SET score = score + excluded.score, name = excluded.name",
+                      (user_id, name, points))]
+            if len(args) > 3 and args[3] is not None:
+                steps.append(('exec', "INSERT INTO group_scores (chat_id, user_id, score) VALUES (?, ?, ?) "
+                                      "ON CONFLICT (chat_id, user_id) DO UPDATE SET score = score + excluded.score",
+                              (args[3], user_id, points)))
+            return steps
+        if op == 'delete_item' and args[0] == 'birthday':
+            return [('exec', "DELETE FROM birthdays WHERE id = ?", (result.row_id,))] if result is not None else []
+        if op in ('delete_item', 'remove_duplicates'):
+            return [('meta', self._copy_meta((BotData.ITEM_FIELDS[args[0]],), data))]
+        if op == 'clear':
+            return [('clear',)]
+        return [('meta', self._copy_meta(self.META_OPS[op], data))]
+
+    def write(self, records: List[list]) -> int:
+        """Run the queued row steps, rewrite the meta fields they changed and commit"""
+        written = 0
+        meta = {}
+        with self._lock:
+            for steps in records:
+                for step in steps:
+                    kind = step[0]
+                    if kind == 'exec':
+                        self._conn.execute(step[1], step[2])
+                    elif kind == 'prayer':
+                        written += self._insert_prayer(step[1])
+                    elif kind == 'prayer_data':
+                        encoded = json.dumps(step[1], ensure_ascii=False, default=json_default)
+                        self._conn.execute("UPDATE prayers SET data = ? WHERE id = ?", (encoded, step[1]['id']))
+                        written += len(encoded)
+                    elif kind == 'birthdays':
+                        written += self._insert_birthdays(step[1])
+                    elif kind == 'meta':
+                        meta.update(step[1])
+                    elif kind == 'clear':
+                        # the meta changes before a clear are part of the rewrite
+                        self._write_all(BotData().snapshot(), 0)
+                        meta = {}
+            rows = [(key, self._encode_meta(value)) for key, value in meta.items()]
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", rows)
+            self._conn.commit()
+        return written + sum(len(value) for _, value in rows)
+
+    def _write_all(self, data: dict, seq: int):
+        for table in ('meta', 'prayers', 'quiz_scores', 'group_scores', 'birthdays', 'users', 'chat_groups'):
+            self._conn.execute(f"DELETE FROM {table}")
+        for key in self.META_FIELDS:
+            self._put_meta(key, data.get(key))
+        self._put_meta('journal_seq', seq)
+        for prayer in data.get('prayers', []):
+            self._insert_prayer(prayer)
+        self._insert_birthdays(data.get('birthdays', []))
+        self._conn.executemany(
+            "INSERT INTO quiz_scores (user_id, name, score) VALUES (?, ?, ?)",
+            [(uid, entry.get('name'), entry.get('score', 0)) for uid, entry in data.get('quiz_scores', {}).items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO group_scores (chat_id, user_id, score) VALUES (?, ?, ?)",
+            [(chat_id, uid, score) for chat_id, scores in data.get('group_scores', {}).items()
+             for uid, score in scores.items()],
+        )
+        self._conn.executemany("INSERT INTO users (id) VALUES (?)", [(uid,) for uid in data.get('users', [])])
+        self._conn.executemany("INSERT INTO chat_groups (id) VALUES (?)", [(cid,) for cid in data.get('groups', [])])
+
+    def compact(self, data: dict, seq: int) -> int:
+        with self._lock:
+            self._write_all(data, seq)
+            self._conn.commit()
+            self._conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+        return os.path.getsize(self.path)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class DataPersister:
+    """Write-behind persister: queues record()ed mutations and flushes them from a worker thread"""
+
+    def __init__(self, storage: Storage, interval: float = SAVE_INTERVAL):
+        self.storage = storage
+        self.interval = interval
+        self.dirty = False
+        self.pending: list = []
+        self.seq = 0
+        self.journal_records = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+        self.compactions = 0
+        self.coalesced_writes = 0
+        self.bytes_written = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+        self.last_checkpoint = time.monotonic()
+        # Optional wrapper for storage writes on the worker thread, called
+        # as worker_hook(func, *args); /profile sets it while a window is open
+        self.worker_hook: Optional[Callable] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Lock held while storage is being written"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def log(self, op: str, args: tuple, result=None):
+        """Hand an applied mutation to storage and queue it for the next flush"""
+        if self.pending or self.dirty:
+            self.coalesced_writes += 1
+        self.seq += 1
+        self.pending.append(self.storage.log(self.seq, op, args, bot_data, result))
+
+    def mark_dirty(self):
+        """Write a full snapshot on the next flush"""
+        if self.pending or self.dirty:
+            self.coalesced_writes += 1
+        self.dirty = True
+
+    def _in_worker(self, func, *args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if self.worker_hook is not None:
+            return loop.run_in_executor(None, self.worker_hook, func, *args)
+        return loop.run_in_executor(None, func, *args)
+
+    async def flush(self) -> bool:
+        """Write pending changes now"""
+        async with self.lock:
+            compact = self.dirty or self.storage.should_compact(self.journal_records + len(self.pending))
+            if not compact and not self.pending:
+                return True
+            records, self.pending = self.pending, []
+            started = time.perf_counter()
+            try:
+                if compact:
+                    self.dirty = False
+                    written = await self._in_worker(self.storage.compact, bot_data.snapshot(), self.seq)
+                    self.journal_records = 0
+                    self.compactions += 1
+                else:
+                    written = await self._in_worker(self.storage.write, records)
+                    self.journal_records += len(records)
+            except Exception as e:
+                logger.exception(f"Error saving data: {e}")
+                self.failed_flushes += 1
+                metrics.inc('bot_save_failures_total')
+                self.pending = records + self.pending
+                self.dirty = self.dirty or compact
+                return False
+            latency = time.perf_counter() - started
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self.total_flush_latency += latency
+            self.bytes_written += written
+            self.flush_count += 1
+            kind = 'snapshot' if compact else 'journal'
+            metrics.observe('bot_save_seconds', latency, (('kind', kind),))
+            metrics.inc('bot_save_bytes_total', (('kind', kind),), written)
+            logger.debug(f"Data saved ({'snapshot' if compact else f'{len(records)} records'}, {written} bytes)")
+            return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if time.monotonic() - self.last_checkpoint >= MESSAGE_CHECKPOINT_INTERVAL:
+                    self.last_checkpoint = time.monotonic()
+                    checkpoint_message_counts()
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Background flush failed: {e}")
+
+    async def start(self, application: Application):
+        """post_init hook: start the background flush loop"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, application: Application):
+        """post_shutdown hook: stop the flush loop and write pending changes"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        checkpoint_message_counts()
+        await self.flush()
+        self.storage.close()
+
+    def stats_text(self) -> str:
+        """Human readable persistence counters"""
+        avg = self.total_flush_latency / self.flush_count if self.flush_count else 0.0
+        return (
+            f"💾 Flushes: {self.flush_count} (failed: {self.failed_flushes}, snapshots: {self.compactions})\n"
+            f"📝 Journal: {self.journal_records} records, {len(self.pending)} pending\n"
+            f"🔁 Coalesced writes: {self.coalesced_writes}\n"
+            f"⏱️ Flush latency: last {self.last_flush_latency * 1000:.1f} ms, "
+            f"avg {avg * 1000:.1f} ms, max {self.max_flush_latency * 1000:.1f} ms\n"
+        )
+
+
+def create_storage() -> Storage:
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    if STORAGE_BACKEND == 'sqlite':
+        return SqliteStorage()
+    return JournalStorage()
+
+
+storage = create_storage()
+persister = DataPersister(storage)
+
+
+def record(op: str, *args):
+    """Apply a BotData mutation and journal it for the next flush"""
+    result = getattr(bot_data, op)(*args)
+    persister.log(op, args, result)
+    return result
+
+
+def checkpoint_message_counts():
+    """Journal every message counter changed since the last checkpoint as one record"""
+    if not bot_data.counts_changed:
+        return
+    changed = {chat_id: bot_data.message_count.get(chat_id, 0) for chat_id in bot_data.counts_changed}
+    bot_data.counts_changed = set()
+    record('set_message_counts', changed)
+
 
 def load_data() -> bool:
-    """Load bot data from JSON file"""
+    """Load bot data from snapshot and journal"""
     global bot_data
+    if not storage.exists():
+        return False
     try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                bot_data = BotData.from_dict(data)
-            logger.info("Data loaded successfully")
-            return True
+        started = time.perf_counter()
+        bot_data, persister.seq, persister.journal_records = storage.load()
+        elapsed = time.perf_counter() - started
+        metrics.set('bot_load_seconds', elapsed)
+        logger.info(f"Data loaded successfully in {elapsed:.2f}s "
+                    f"({persister.journal_records} journal records replayed, "
+                    f"JSON codec: {'orjson' if orjson is not None else 'json'})")
+        return True
     except Exception as e:
         logger.exception(f"Error loading data: {e}")
     return False
 
 
+def export_data(data: dict) -> bytes:
+    """Encode a snapshot in the bot_data.json import/export format"""
+    return json.dumps(data, ensure_ascii=False, indent=2, default=json_default).encode('utf-8')
+
+
+def append_prayer_archive(prayers: List[dict], path: str = PRAYER_ARCHIVE_FILE) -> int:
+    """Append prayers to the gzip JSON-lines archive and fsync; returns bytes written
+
+    Every call adds one gzip member; readers see the members as one stream.
+    """
+    payload = ''.join(
+        json.dumps(prayer, ensure_ascii=False, default=json_default) + '\n' for prayer in prayers
+    ).encode('utf-8')
+    with open(path, 'ab') as f:
+        start = f.tell()
+        with gzip.GzipFile(fileobj=f, mode='ab') as gz:
+            gz.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell() - start
+
+
+def search_prayer_archive(query: dict, path: str = PRAYER_ARCHIVE_FILE) -> List[dict]:
+    """Archived prayers matching a /praylist query, oldest first (blocking)"""
+    matches = []
+    seen = set()
+    if not os.path.exists(path):
+        return matches
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                prayer = json.loads(line)
+                # a crash between archiving and journaling archives a batch twice
+                if prayer.get('id') in seen:
+                    continue
+                seen.add(prayer.get('id'))
+                if prayer_matches(prayer, query):
+                    matches.append(prayer)
+    except (EOFError, OSError, ValueError) as e:
+        logger.warning(f"Prayer archive {path} is truncated ({e}); searched the readable part")
+    return matches
+
+
+def replace_data(new_data: BotData):
+    """Swap in a whole new BotData (restore) and schedule a snapshot"""
+    global bot_data
+    bot_data = new_data
+    persister.mark_dirty()
+    quiz_scheduler.reschedule_all()
+    event_reminders.reschedule()
+
+
 def is_admin(user_id: Optional[int]) -> bool:
     """Check if user is admin"""
     if not user_id:
@@ -135,11 +1661,1373 @@ def is_admin(user_id: Optional[int]) -> bool:
     return user_id in ADMIN_IDS
 
 
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class BroadcastJob:
+    """One broadcast: the message to send and the chats still waiting for it"""
+
+    def __init__(self, kind: str, targets: List[int], text: Optional[str] = None,
+                 photo: Optional[str] = None, caption: str = "", job_id: Optional[str] = None):
+        self.id = job_id or datetime.now(TIMEZONE).strftime('%Y%m%d%H%M%S%f')
+        self.kind = kind
+        self.text = text
+        self.photo = photo
+        self.caption = caption
+        # Insertion-ordered set of chats not yet delivered (or permanently failed)
+        self.remaining = dict.fromkeys(targets)
+        self.total = len(self.remaining)
+        self.sent = 0
+        self.failed = 0
+        self.status_chat: Optional[int] = None
+        self.status_message: Optional[int] = None
+        self.started = time.monotonic()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'text': self.text,
+            'photo': self.photo,
+            'caption': self.caption,
+            'remaining': list(self.remaining),
+            'total': self.total,
+            'sent': self.sent,
+            'failed': self.failed,
+            'status_chat': self.status_chat,
+            'status_message': self.status_message,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['kind'], data.get('remaining', []), data.get('text'), data.get('photo'),
+                  data.get('caption', ""), data.get('id'))
+        job.total = data.get('total', job.total)
+        job.sent = data.get('sent', 0)
+        job.failed = data.get('failed', 0)
+        job.status_chat = data.get('status_chat')
+        job.status_message = data.get('status_message')
+        return job
+
+    def status_text(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return (
+            f"📢 Broadcast ပို့နေပါသည်...\n\n"
+            f"အောင်မြင်: {self.sent}\n"
+            f"မအောင်မြင်: {self.failed}\n"
+            f"ကျန်: {len(self.remaining)} / {self.total}\n"
+            f"⚡ {self.sent / elapsed:.1f} msgs/sec"
+        )
+
+
+class BroadcastEngine:
+    """Background broadcast sender: rate-limited worker pool over a job queue saved to BROADCAST_FILE"""
+
+    def __init__(self, path: str = BROADCAST_FILE, concurrency: int = BROADCAST_CONCURRENCY,
+                 rate: float = BROADCAST_RATE, progress_interval: float = BROADCAST_PROGRESS_INTERVAL):
+        self.path = path
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.bucket = TokenBucket(rate)
+        self.jobs: List[BroadcastJob] = []
+        self.bot = None
+        self._chat_next_send: Dict[int, float] = {}
+        self._pause_until = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.jobs = [BroadcastJob.from_dict(job) for job in json.load(f).get('jobs', [])]
+            if self.jobs:
+                logger.info(f"Resuming {len(self.jobs)} broadcast job(s)")
+        except Exception as e:
+            logger.exception(f"Error loading broadcast jobs: {e}")
+
+    def _write(self, data: dict):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    async def save(self):
+        """Persist the job queue (serialized off the event loop)"""
+        data = {'jobs': [job.to_dict() for job in self.jobs]}
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+        except Exception as e:
+            logger.exception(f"Error saving broadcast jobs: {e}")
+
+    async def start(self, application: Application):
+        """post_init hook: load saved jobs and start sending"""
+        self.bot = application.bot
+        self._wakeup = asyncio.Event()
+        self._load()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, application: Application):
+        """post_shutdown hook: stop sending and keep unfinished jobs for next start"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.save()
+
+    async def submit(self, job: BroadcastJob):
+        self.jobs.append(job)
+        await self.save()
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self.jobs:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            job = self.jobs[0]
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Broadcast {job.id} aborted: {e}")
+            self.jobs.pop(0)
+            await self.save()
+
+    async def _run_job(self, job: BroadcastJob):
+        job.started = time.monotonic()
+        queue: asyncio.Queue = asyncio.Queue()
+        for chat_id in job.remaining:
+            queue.put_nowait((chat_id, 1))
+        workers = [asyncio.create_task(self._worker(job, queue))
+                   for _ in range(max(1, min(self.concurrency, queue.qsize())))]
+        reporter = asyncio.create_task(self._report(job))
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            reporter.cancel()
+        await self._edit_status(
+            job,
+            f"✅ Broadcast ပို့ပြီးပါပြီ။\n\n"
+            f"အောင်မြင်: {job.sent}\n"
+            f"မအောင်မြင်: {job.failed}"
+        )
+        logger.info(f"Broadcast {job.id} finished: {job.sent} sent, {job.failed} failed")
+
+    async def _report(self, job: BroadcastJob):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self.save()
+            await self._edit_status(job, job.status_text())
+
+    async def _edit_status(self, job: BroadcastJob, text: str):
+        if job.status_chat is None:
+            return
+        try:
+            await self.bot.edit_message_text(text, chat_id=job.status_chat, message_id=job.status_message)
+        except TelegramError as e:
+            logger.debug(f"Broadcast status edit failed: {e}")
+
+    async def _throttle(self, chat_id: int):
+        now = time.monotonic()
+        if self._pause_until > now:
+            await asyncio.sleep(self._pause_until - now)
+        await self.bucket.acquire()
+        now = time.monotonic()
+        next_ok = self._chat_next_send.get(chat_id, 0.0)
+        self._chat_next_send[chat_id] = max(now, next_ok) + (3.0 if chat_id < 0 else 1.0)
+        if next_ok > now:
+            await asyncio.sleep(next_ok - now)
+        if len(self._chat_next_send) > 10000:
+            self._chat_next_send = {cid: t for cid, t in self._chat_next_send.items() if t > now}
+
+    async def _deliver(self, job: BroadcastJob, chat_id: int):
+        if job.kind == 'photo':
+            await self.bot.send_photo(chat_id=chat_id, photo=job.photo, caption=job.caption)
+        else:
+            await self.bot.send_message(chat_id=chat_id, text=job.text)
+
+    async def _worker(self, job: BroadcastJob, queue: asyncio.Queue):
+        while True:
+            try:
+                chat_id, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self._throttle(chat_id)
+            try:
+                await self._deliver(job, chat_id)
+                job.sent += 1
+            except RetryAfter as e:
+                # Flood wait: pause every worker, and don't count it as an attempt
+                self._pause_until = max(self._pause_until, time.monotonic() + e.retry_after)
+                queue.put_nowait((chat_id, attempt))
+                continue
+            except ChatMigrated as e:
+                job.remaining[e.new_chat_id] = None
+                queue.put_nowait((e.new_chat_id, attempt))
+            except BadRequest as e:
+                logger.warning(f"Failed to send to {chat_id}: {e}")
+                job.failed += 1
+            except NetworkError as e:
+                if attempt < BROADCAST_MAX_ATTEMPTS:
+                    queue.put_nowait((chat_id, attempt + 1))
+                    continue
+                logger.warning(f"Failed to send to {chat_id} after {attempt} attempts: {e}")
+                job.failed += 1
+            except Exception as e:
+                logger.warning(f"Failed to send to {chat_id}: {e}")
+                job.failed += 1
+            job.remaining.pop(chat_id, None)
+
+
+broadcaster = BroadcastEngine()
+
+
+BROADCAST_TARGETS = {
+    'groups': "Group များ",
+    'users': "User များ",
+    'all': "User နှင့် Group အားလုံး",
+    'quiz': "Quiz ဖြေဖူးသူများ",
+    'prayers': f"ရက် {PRAYER_SEGMENT_DAYS} အတွင်း ဆုတောင်းခံချက်ပို့သူများ",
+}
+
+
+def broadcast_targets(target: str) -> List[int]:
+    """Chat ids for a broadcast audience, read from incrementally kept sets"""
+    if target == 'users':
+        return list(bot_data.users)
+    if target == 'all':
+        return list(bot_data.users) + list(bot_data.groups)
+    if target == 'quiz':
+        return [int(user_id) for user_id in bot_data.quiz_scores]
+    if target == 'prayers':
+        since = (datetime.now(TIMEZONE) - timedelta(days=PRAYER_SEGMENT_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+        return bot_data.recent_prayer_users(since)
+    return list(bot_data.groups)
+
+
+class AutoQuizScheduler:
+    """Per-chat auto quiz pacing (thresholds, cooldowns, timed quizzes, decks) on the PTB JobQueue"""
+
+    def __init__(self):
+        self.job_queue = None
+        self.bot = None
+        self._last_sent: Dict[int, float] = {}
+        self._decks: Dict[int, List[int]] = {}
+        self._timers: Dict[int, object] = {}
+        self._deferred: Dict[int, object] = {}
+
+    async def start(self, application: Application):
+        """post_init hook: install the repeating jobs of every chat"""
+        self.bot = application.bot
+        self.job_queue = application.job_queue
+        if self.job_queue is None:
+            logger.warning("JobQueue unavailable (install python-telegram-bot[job-queue]); "
+                           "auto quiz cooldowns and timed quizzes are disabled")
+            return
+        self.reschedule_all()
+
+    @staticmethod
+    def settings(chat_id: int) -> dict:
+        return bot_data.quiz_schedules.get(chat_id) or {'cooldown': AUTO_QUIZ_COOLDOWN, 'every': 0}
+
+    def reschedule_all(self):
+        """Rebuild the repeating jobs from bot_data (after load, restore or clear)"""
+        for chat_id in list(self._timers):
+            self.reschedule(chat_id)
+        for chat_id in bot_data.quiz_schedules:
+            self.reschedule(chat_id)
+
+    def reschedule(self, chat_id: int):
+        if self.job_queue is None:
+            return
+        job = self._timers.pop(chat_id, None)
+        if job is not None:
+            job.schedule_removal()
+        every = self.settings(chat_id)['every']
+        if every:
+            self._timers[chat_id] = self.job_queue.run_repeating(
+                self._timed_quiz, interval=every * 60, first=every * 60,
+                chat_id=chat_id, name=f"autoquiz_{chat_id}",
+            )
+
+    def cooldown_left(self, chat_id: int) -> float:
+        last = self._last_sent.get(chat_id)
+        if last is None:
+            return 0.0
+        return last + self.settings(chat_id)['cooldown'] * 60 - time.monotonic()
+
+    def draw(self, chat_id: int) -> Optional[dict]:
+        """Next quiz from the chat's deck, reshuffling once it runs out"""
+        deck = self._decks.get(chat_id)
+        while True:
+            if not deck:
+                if not bot_data.quiz_ids:
+                    return None
+                deck = self._decks[chat_id] = list(bot_data.quiz_ids)
+                random.shuffle(deck)
+            # ids deleted since the deck was dealt are skipped
+            quiz = bot_data.quiz_by_id.get(deck.pop())
+            if quiz is not None:
+                return quiz
+
+    async def trigger(self, bot, chat_id: int) -> bool:
+        """Threshold reached: send now or after the cooldown.
+
+        Returns False when the quiz could not be sent or queued, so the
+        caller keeps counting and retries on a later message.
+        """
+        if chat_id in self._deferred:
+            return True
+        left = self.cooldown_left(chat_id)
+        if left <= 0:
+            await self.send(bot, chat_id)
+            return True
+        if self.job_queue is None:
+            return False
+        self._deferred[chat_id] = self.job_queue.run_once(
+            self._deferred_quiz, left, chat_id=chat_id, name=f"autoquiz_deferred_{chat_id}",
+        )
+        return True
+
+    async def send(self, bot, chat_id: int):
+        quiz = self.draw(chat_id)
+        if quiz is None:
+            return
+        self._last_sent[chat_id] = time.monotonic()
+        bot_data.message_count[chat_id] = 0
+        bot_data.counts_changed.add(chat_id)
+        quiz_text, reply_markup = quiz_message(quiz)
+        try:
+            await bot.send_message(chat_id=chat_id, text=quiz_text, reply_markup=reply_markup,
+                                   parse_mode=ParseMode.MARKDOWN)
+        except TelegramError as e:
+            logger.warning(f"Failed to send auto quiz to {chat_id}: {e}")
+
+    async def _deferred_quiz(self, context: ContextTypes.DEFAULT_TYPE):
+        chat_id = context.job.chat_id
+        self._deferred.pop(chat_id, None)
+        await self.send(context.bot, chat_id)
+
+    async def _timed_quiz(self, context: ContextTypes.DEFAULT_TYPE):
+        chat_id = context.job.chat_id
+        if chat_id in self._deferred or self.cooldown_left(chat_id) > 0:
+            return
+        if not bot_data.message_count.get(chat_id):
+            return
+        await self.send(context.bot, chat_id)
+
+
+quiz_scheduler = AutoQuizScheduler()
+
+
+def archive_past_events(now: Optional[datetime] = None):
+    """Move events dated before today to past_events (a no-op most of the time)"""
+    now = now or datetime.now(TIMEZONE)
+    today = now.strftime('%Y-%m-%d 00:00')
+    if bot_data.has_past_events(today):
+        record('archive_events', today)
+
+
+class EventReminders:
+    """Event reminders EVENT_REMINDER_HOURS ahead, driven by one one-shot timer"""
+
+    def __init__(self):
+        self.job_queue = None
+        self._job = None
+
+    async def start(self, application: Application):
+        """post_init hook: archive stale events and arm the timer"""
+        self.job_queue = application.job_queue
+        if self.job_queue is None:
+            logger.warning("JobQueue unavailable; event reminders and archiving are disabled")
+            return
+        self.reschedule()
+
+    def reschedule(self):
+        """Re-arm the timer after events changed (or bot_data was replaced)"""
+        if self.job_queue is None:
+            return
+        if self._job is not None:
+            self._job.schedule_removal()
+        self._job = self.job_queue.run_once(self._tick, 0, name='event_reminders')
+
+    async def _tick(self, context: ContextTypes.DEFAULT_TYPE):
+        self._job = None
+        now = datetime.now(TIMEZONE)
+        archive_past_events(now)
+        if EVENT_REMINDER_HOURS <= 0:
+            return
+        ahead = timedelta(hours=EVENT_REMINDER_HOURS)
+        horizon = (now + ahead).strftime(EVENT_KEY_FORMAT)
+        # events that started before the bot first looked get no reminder
+        after = max(bot_data.event_reminder_mark, now.strftime(EVENT_KEY_FORMAT))
+        due = bot_data.events_between(after, horizon)
+        if due and bot_data.event_groups:
+            lines = ["⏰ မကြာမီ ကျင်းပမည့် အစီအစဉ်များ\n"]
+            lines.extend(f"• {format_event(event)}" for event in due)
+            lines.append("\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH")
+            await broadcaster.submit(BroadcastJob('text', list(bot_data.event_groups), text='\n'.join(lines)))
+            logger.info(f"Reminder for {len(due)} event(s) queued to {len(bot_data.event_groups)} group(s)")
+        if horizon > bot_data.event_reminder_mark:
+            record('set_event_reminder_mark', horizon)
+
+        upcoming = bot_data.next_event_after(horizon)
+        if upcoming is not None:
+            start = TIMEZONE.localize(datetime.strptime(event_key(upcoming), EVENT_KEY_FORMAT))
+            # one second late so the event is inside the horizon when we wake
+            delay = (start - ahead - now).total_seconds() + 1
+            self._job = self.job_queue.run_once(self._tick, max(delay, 0), name='event_reminders')
+
+
+event_reminders = EventReminders()
+
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    """Concurrent update processing, at most `limit` at a time, serialized per chat (callback queries: per user)"""
+
+    def __init__(self, limit: int = UPDATE_CONCURRENCY):
+        # PTB takes its own semaphore before do_process_update(); keep it
+        # out of the way so updates queued behind a busy chat hold no slot
+        super().__init__(max_concurrent_updates=2 ** 31 - 1)
+        self.limit = max(1, limit)
+        self._slots: Optional[asyncio.Semaphore] = None
+        # key -> [lock, updates holding or waiting for it]; dropped when idle
+        self._chats: Dict[object, list] = {}
+        self.queued = 0
+        self.max_queued = 0
+        self.running = 0
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding the updates that run at the same time"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.limit)
+        return self._slots
+
+    @staticmethod
+    def key(update: object) -> object:
+        """Serialization key: the chat, or the user for callback queries"""
+        if isinstance(update, Update):
+            if update.callback_query:
+                return ('user', update.callback_query.from_user.id)
+            if update.effective_chat:
+                return update.effective_chat.id
+            if update.effective_user:
+                return ('user', update.effective_user.id)
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_process_update(self, update: object, coroutine):
+        key = self.key(update)
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = [asyncio.Lock(), 0]
+        chat[1] += 1
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        queued_at = time.monotonic()
+        started = False
+        try:
+            async with chat[0], self.slots:
+                started = True
+                self.queued -= 1
+                wait = time.monotonic() - queued_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.running += 1
+                try:
+                    await coroutine
+                finally:
+                    self.running -= 1
+                    self.processed += 1
+                    if metrics.enabled:
+                        metrics.count_update(update, time.monotonic() - queued_at)
+        finally:
+            if not started:
+                # cancelled while queued (shutdown)
+                self.queued -= 1
+                coroutine.close()
+            chat[1] -= 1
+            if not chat[1]:
+                del self._chats[key]
+
+    def stats_text(self) -> str:
+        """Human readable update processing counters"""
+        avg = self.total_wait / self.processed if self.processed else 0.0
+        return (
+            f"⚙️ Updates: {self.processed} processed, {self.running} running, "
+            f"{self.queued} queued (max {self.max_queued}, limit {self.limit})\n"
+            f"⏳ Queue wait: avg {avg * 1000:.1f} ms, max {self.max_wait * 1000:.1f} ms\n"
+        )
+
+
+update_processor = ChatUpdateProcessor()
+
+
+def parse_rate(spec: str) -> Tuple[int, float]:
+    """'30/60' -> (30 updates, per 60 seconds); a bare number is per minute"""
+    try:
+        count, _, period = spec.partition('/')
+        return int(count), float(period or 60)
+    except ValueError:
+        logger.error(f"Invalid rate limit {spec!r}, expected updates/seconds; limit disabled")
+        return 0, 60.0
+
+
+class RateLimit:
+    """Token buckets for one scope: `capacity` updates per `period` seconds per key"""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period if period > 0 else 0.0
+        # key -> [tokens, monotonic time of the last check]
+        self.buckets: OrderedDict = OrderedDict()
+        self.throttled = 0
+
+    def allow(self, key, now: float) -> bool:
+        if self.capacity <= 0:
+            return True
+        buckets = self.buckets
+        while buckets:
+            oldest = next(iter(buckets))
+            if now - buckets[oldest][1] < self.period:
+                break
+            del buckets[oldest]
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [float(self.capacity), now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            buckets.move_to_end(key)
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        self.throttled += 1
+        return False
+
+
+class FloodGuard:
+    """Handler-group -1 middleware that drops updates over the rate limits"""
+
+    def __init__(self):
+        self.users = RateLimit(*parse_rate(RATE_LIMIT_USER))
+        self.chats = RateLimit(*parse_rate(RATE_LIMIT_CHAT))
+        self.commands = RateLimit(*parse_rate(RATE_LIMIT_COMMAND))
+        self.notices = RateLimit(1, max(self.users.period, self.commands.period))
+
+    @staticmethod
+    def command_of(message) -> Optional[str]:
+        text = message.text if message is not None else None
+        if not text or not text.startswith('/'):
+            return None
+        return text.split(maxsplit=1)[0][1:].split('@', 1)[0].lower()
+
+    def check(self, update: Update, now: float) -> bool:
+        user = update.effective_user
+        if user is None or is_admin(user.id):
+            return True
+        if not self.users.allow(user.id, now):
+            return False
+        chat = update.effective_chat
+        message = update.message
+        if message is not None and chat is not None and chat.type != 'private':
+            if not self.chats.allow(chat.id, now):
+                return False
+        command = self.command_of(message)
+        if command is not None:
+            return self.commands.allow((user.id, command), now)
+        return True
+
+    async def __call__(self, update: object, context: ContextTypes.DEFAULT_TYPE):
+        if not isinstance(update, Update):
+            return
+        now = time.monotonic()
+        if self.check(update, now):
+            return
+        user_id = update.effective_user.id
+        notify = self.notices.allow(user_id, now)
+        if update.callback_query is not None:
+            # answer anyway, or the button keeps spinning
+            await update.callback_query.answer("⏳ ခဏစောင့်ပြီးမှ ပြန်နှိပ်ပါ။" if notify else None)
+        elif notify and self.command_of(update.message) is not None:
+            await update.message.reply_text("⏳ အလွန်မြန်နေပါသည်။ ခဏစောင့်ပြီးမှ ပြန်ကြိုးစားပါ။")
+        raise ApplicationHandlerStop
+
+    def stats_text(self) -> str:
+        tracked = len(self.users.buckets) + len(self.chats.buckets) + len(self.commands.buckets)
+        return (
+            f"🚦 Throttled: {self.users.throttled} user, {self.chats.throttled} group, "
+            f"{self.commands.throttled} command ({tracked} active buckets)\n"
+        )
+
+
+flood_guard = FloodGuard()
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    'bot_updates_total': ('counter', 'Updates processed, by update type and command'),
+    'bot_update_seconds': ('histogram', 'Time from receiving an update to finishing it, queue wait included'),
+    'bot_handler_calls_total': ('counter', 'Handler calls by outcome (ok, error, stopped)'),
+    'bot_handler_seconds': ('histogram', 'Handler run time'),
+    'bot_api_requests_total': ('counter', 'Bot API requests by method and outcome (ok, HTTP status or error type)'),
+    'bot_api_request_seconds': ('histogram', 'Bot API request latency'),
+    'bot_save_seconds': ('histogram', 'Duration of a data flush (journal append or snapshot)'),
+    'bot_save_bytes_total': ('counter', 'Bytes written by data flushes'),
+    'bot_save_failures_total': ('counter', 'Data flushes that failed and were retried later'),
+    'bot_load_seconds': ('gauge', 'Time the last data load took'),
+    'bot_storage_bytes': ('gauge', 'Size of the data files on disk'),
+    'bot_journal_pending': ('gauge', 'Changes waiting for the next flush'),
+    'bot_updates_running': ('gauge', 'Updates being handled right now'),
+    'bot_updates_queued': ('gauge', 'Updates waiting behind their chat or a free slot'),
+    'bot_throttled_total': ('counter', 'Updates dropped by flood protection, by limit'),
+    'bot_resident_memory_bytes': ('gauge', 'Resident memory of the bot process'),
+    'bot_uptime_seconds': ('gauge', 'Seconds since the bot process started'),
+}
+
+
+class Histogram:
+    """Cumulative-on-render latency histogram over HISTOGRAM_BUCKETS"""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self.sum += value
+
+
+def _labels(labels: tuple, extra: str = '') -> str:
+    """Render label pairs as {name="value",...}"""
+    parts = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Metrics:
+    """Prometheus-style counters and histograms served on /metrics"""
+
+    def __init__(self, enabled: bool = METRICS_PORT > 0):
+        self.enabled = enabled
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        self.histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self.gauges: Dict[Tuple[str, tuple], float] = {}
+        # registered command names; anything else is counted as 'other'
+        self.commands: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = Histogram()
+        histogram.observe(value)
+
+    def set(self, name: str, value: float, labels: tuple = ()):
+        self.gauges[(name, labels)] = value
+
+    def count_update(self, update: object, seconds: float):
+        """Count a finished update by type and command"""
+        if not isinstance(update, Update):
+            kind = type(update).__name__
+        elif update.message is not None:
+            kind = 'message'
+        elif update.callback_query is not None:
+            kind = 'callback_query'
+        else:
+            kind = next((t for t in Update.ALL_TYPES if getattr(update, t, None) is not None), 'other')
+        command = FloodGuard.command_of(update.message) if kind == 'message' else None
+        if command is not None and command not in self.commands:
+            command = 'other'
+        self.inc('bot_updates_total', (('type', kind), ('command', command or '')))
+        self.observe('bot_update_seconds', seconds, (('type', kind),))
+
+    def timed(self, callback):
+        """Wrap a handler callback with a latency histogram and outcome counters"""
+        name = getattr(callback, '__name__', type(callback).__name__)
+        labels = (('handler', name),)
+        histogram = self.histograms.setdefault(('bot_handler_seconds', labels), Histogram())
+        counters = self.counters
+
+        async def timed_callback(update, context):
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = await callback(update, context)
+                outcome = 'ok'
+                return result
+            except ApplicationHandlerStop:
+                outcome = 'stopped'
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+                key = ('bot_handler_calls_total', labels + (('outcome', outcome),))
+                counters[key] = counters.get(key, 0) + 1
+
+        timed_callback.__name__ = name
+        return timed_callback
+
+    def timed_request(self, request: BaseRequest):
+        """Time the Bot API calls made through `request`"""
+        do_request = request.do_request
+
+        async def timed_do_request(url: str, *args, **kwargs):
+            # file downloads carry the file path in the URL
+            method = 'download' if '/file/bot' in url else url.rsplit('/', 1)[-1]
+            started = time.perf_counter()
+            outcome = 'ok'
+            try:
+                code, payload = await do_request(url, *args, **kwargs)
+                if not 200 <= code < 300:
+                    outcome = str(code)
+                return code, payload
+            except Exception as e:
+                outcome = type(e).__name__
+                raise
+            finally:
+                self.observe('bot_api_request_seconds', time.perf_counter() - started, (('method', method),))
+                self.inc('bot_api_requests_total', (('method', method), ('outcome', outcome)))
+
+        request.do_request = timed_do_request
+
+    def instrument(self, application: Application):
+        """Wrap every registered handler and the bot's request object"""
+        for handler in iter_handlers(application):
+            handler.callback = self.timed(handler.callback)
+            if isinstance(handler, CommandHandler):
+                self.commands.update(handler.commands)
+        self.timed_request(application.bot.request)
+
+    def collect(self):
+        """Refresh the gauges that describe current state"""
+        self.set('bot_uptime_seconds', time.perf_counter() - STARTED_AT)
+        self.set('bot_updates_running', update_processor.running)
+        self.set('bot_updates_queued', update_processor.queued)
+        self.set('bot_journal_pending', len(persister.pending))
+        try:
+            self.set('bot_storage_bytes', storage.size())
+        except OSError:
+            pass
+        rss = process_rss()
+        if rss is not None:
+            self.set('bot_resident_memory_bytes', rss)
+        for scope, limit in (('user', flood_guard.users), ('chat', flood_guard.chats),
+                             ('command', flood_guard.commands)):
+            self.counters[('bot_throttled_total', (('limit', scope),))] = limit.throttled
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        self.collect()
+        series: Dict[str, list] = {}
+        for (name, labels), value in itertools.chain(self.counters.items(), self.gauges.items()):
+            series.setdefault(name, []).append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), histogram in self.histograms.items():
+            lines = series.setdefault(name, [])
+            total = 0
+            for bound, count in zip(HISTOGRAM_BUCKETS + ('+Inf',), histogram.counts):
+                total += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_labels(labels, le)} {total}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(labels)} {total}")
+        out = []
+        for name in sorted(series):
+            kind, description = METRIC_HELP.get(name, ('untyped', name))
+            out.append(f"# HELP {name} {description}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(series[name])
+        return '\n'.join(out) + '\n'
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass  # headers
+            parts = request_line.split()
+            if len(parts) >= 2 and parts[0] in (b'GET', b'HEAD') and parts[1].split(b'?')[0] == b'/metrics':
+                status, body = '200 OK', self.render().encode('utf-8')
+            else:
+                status, body = '404 Not Found', b'Not found\n'
+            head = (f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode('ascii')
+            writer.write(head if parts[:1] == [b'HEAD'] else head + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, application: Application):
+        """post_init hook: serve /metrics"""
+        if not self.enabled or METRICS_PORT <= 0:
+            return
+        try:
+            self._server = await asyncio.start_server(self._serve, METRICS_LISTEN, METRICS_PORT)
+        except OSError as e:
+            logger.error(f"Metrics endpoint could not listen on {METRICS_LISTEN}:{METRICS_PORT}: {e}")
+            return
+        logger.info(f"Metrics at http://{METRICS_LISTEN}:{METRICS_PORT}/metrics")
+
+    async def stop(self, application: Application):
+        """post_shutdown hook: close the endpoint"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+metrics = Metrics()
+
+
 def get_current_month_birthdays():
     """Get birthdays for current month"""
     current_month = datetime.now(TIMEZONE).month
-    monthly_birthdays = [b for b in bot_data.birthdays if b.get('month') == current_month]
-    return monthly_birthdays
+    return storage.birthdays_in_month(current_month)
+
+
+def _utf16_len(text: str) -> int:
+    # Telegram measures message length in UTF-16 code units
+    return len(text.encode('utf-16-le')) // 2
+
+
+def split_message(text: str, limit: int = MessageLimit.MAX_TEXT_LENGTH) -> List[str]:
+    """Split text into messages Telegram accepts, breaking between lines"""
+    if not text.strip():
+        return []
+    if _utf16_len(text) <= limit:
+        return [text]
+    pieces = []
+    for line in text.split('\n'):
+        if _utf16_len(line) > limit:
+            step = limit // 2
+            pieces.extend(line[i:i + step] for i in range(0, len(line), step))
+        else:
+            pieces.append(line)
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        length = _utf16_len(piece)
+        if current and size + 1 + length > limit:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+        size += length + 1 if current else length
+        current.append(piece)
+    if current:
+        chunks.append('\n'.join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+# Rendered replies: key -> (generations of the collections used, message chunks),
+# in least recently used order
+render_cache: OrderedDict = OrderedDict()
+
+
+def cached_render(key: str, fields: Tuple[str, ...], render, split=split_message) -> List[str]:
+    """Chunks of render(), re-rendered only when one of `fields` changed
+
+    Pass split=None when render() already returns the chunks.
+    """
+    generation = tuple(bot_data.generations[field] for field in fields)
+    cached = render_cache.get(key)
+    if cached is not None and cached[0] == generation:
+        render_cache.move_to_end(key)
+        return cached[1]
+    chunks = render() if split is None else split(render())
+    render_cache[key] = (generation, chunks)
+    render_cache.move_to_end(key)
+    while len(render_cache) > RENDER_CACHE_SIZE:
+        render_cache.popitem(last=False)
+    return chunks
+
+
+async def reply_chunks(message, chunks: List[str], **kwargs):
+    """Send a reply split by split_message()"""
+    for chunk in chunks:
+        await message.reply_text(chunk, **kwargs)
+
+
+def format_parse_errors(errors: List[Tuple[int, str]], limit: int = 10, summary: bool = True) -> str:
+    """Reply suffix listing the first rejected lines ('' when there are none)"""
+    if not errors:
+        return ""
+    lines = [""]
+    if summary:
+        lines.append(f"❌ {len(errors):,} ကြောင်း မှားယွင်းနေ၍ မထည့်ပါ:")
+    lines.extend(f"• လိုင်း {number}: {reason}" for number, reason in errors[:limit])
+    if len(errors) > limit:
+        lines.append(f"... နောက်ထပ် {len(errors) - limit:,} ခု")
+    return '\n'.join(lines)
+
+
+def format_duplicates(count: int) -> str:
+    """Reply suffix for entries skipped as already stored ('' when none)"""
+    return f"\n♻️ ထပ်နေ၍ ချန်ထားသည်: {count:,}" if count else ""
+
+
+def render_about() -> str:
+    return (
+        f"ℹ️ **အသင်းတော်အကြောင်း**\n\n{bot_data.about}\n\n"
+        f"━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH"
+    )
+
+
+class PagedList:
+    """A list shown PAGE_SIZE items at a time with ◀️ / ▶️ buttons"""
+
+    def __init__(self, field: str, title: str, count, page_items, format_item, admin_only: bool = False):
+        self.field = field
+        self.title = title
+        self.count = count
+        self.page_items = page_items
+        self.format_item = format_item
+        self.admin_only = admin_only
+
+
+def _format_prayer(idx: int, prayer: dict) -> str:
+    answered = " ✅" if prayer.get('status') == 'answered' else ""
+    return (f"{idx}. #{prayer.get('id')} @{prayer['username']}{answered}\n"
+            f"   {prayer['prayer']}\n   📅 {prayer['date']}\n")
+
+
+PAGED_LISTS = {
+    'contacts': PagedList(
+        'contacts', "📞 **ဆက်သွယ်ရန်**",
+        lambda: len(bot_data.contacts),
+        lambda start, stop: bot_data.contacts[start:stop],
+        lambda idx, contact: f"{idx}. {contact}",
+    ),
+    'events': PagedList(
+        'events', "📅 **လာမည့်အစီအစဉ်များ**",
+        lambda: len(bot_data.events),
+        lambda start, stop: bot_data.events[start:stop],
+        lambda idx, event: f"{idx}. {format_event(event)}",
+    ),
+    # newest first
+    'prayers': PagedList(
+        'prayers', "🙏 **ဆုတောင်းခံချက်စာရင်း**",
+        lambda: len(bot_data.prayers),
+        lambda start, stop: storage.recent_prayers(stop - start, start)[::-1],
+        _format_prayer,
+        admin_only=True,
+    ),
+}
+
+
+def render_page(kind: str, page: int, part: int = 0) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    """One page of a paged list (or one part of it, see page_parts) and its navigation buttons
+
+    Only the requested page is sliced from the list, and its text is
+    cached until the list changes.
+    """
+    paged = PAGED_LISTS[kind]
+    pages = max(1, -(-paged.count() // PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+
+    def render() -> List[str]:
+        start = page * PAGE_SIZE
+        return page_parts(paged.title, paged.page_items(start, start + PAGE_SIZE), paged.format_item,
+                          start, page, pages)
+
+    parts = cached_render(f"{kind}:{page}", (paged.field,), render, split=None)
+    part = len(parts) - 1 if not 0 <= part < len(parts) else part
+    return parts[part], page_buttons(page, pages, part, len(parts), lambda n, p: page_callback_data(kind, n, p))
+
+
+def page_parts(title: str, items: list, format_item, start: int, page: int, pages: int) -> List[str]:
+    """The messages of one page: one, or more when its items do not fit in one"""
+    body = '\n'.join(format_item(idx, item) for idx, item in enumerate(items, start + 1))
+    text = page_text(title, body, page, pages)
+    if _utf16_len(text) <= MessageLimit.MAX_TEXT_LENGTH:
+        return [text]
+    # the overflow goes to further parts of the same page, split between lines
+    room = MessageLimit.MAX_TEXT_LENGTH - _utf16_len(page_text(title, '', page, pages, (999, 999)))
+    chunks = split_message(body, room)
+    return [page_text(title, chunk, page, pages, (n, len(chunks))) for n, chunk in enumerate(chunks)]
+
+
+def page_text(title: str, body: str, page: int, pages: int, part: Optional[Tuple[int, int]] = None) -> str:
+    lines = [title + "\n"]
+    if body:
+        lines.append(body)
+    if part is not None:
+        lines.append(f"\n📄 {page + 1}/{pages} ({part[0] + 1}/{part[1]})")
+    elif pages > 1:
+        lines.append(f"\n📄 {page + 1}/{pages}")
+    lines.append("\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH")
+    return '\n'.join(lines)
+
+
+def page_buttons(page: int, pages: int, part: int, parts: int, callback_data) -> Optional[InlineKeyboardMarkup]:
+    """◀️ / ▶️ buttons; callback_data(n, p) is the data of the button for part p of page n
+
+    Part -1 is the last part of a page.
+    """
+    buttons = []
+    if part > 0:
+        buttons.append(InlineKeyboardButton("◀️", callback_data=callback_data(page, part - 1)))
+    elif page > 0:
+        buttons.append(InlineKeyboardButton("◀️", callback_data=callback_data(page - 1, -1)))
+    if part < parts - 1:
+        buttons.append(InlineKeyboardButton("▶️", callback_data=callback_data(page, part + 1)))
+    elif page < pages - 1:
+        buttons.append(InlineKeyboardButton("▶️", callback_data=callback_data(page + 1, 0)))
+    return InlineKeyboardMarkup([buttons]) if buttons else None
+
+
+def page_callback_data(kind: str, page: int, part: int) -> str:
+    # buttons of pages that fit one message keep the page_<kind>_<n> form
+    return f"page_{kind}_{page}_{part}" if part else f"page_{kind}_{page}"
+
+
+def make_prayer_query(status: Optional[str] = None, user: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None, archive: bool = False) -> dict:
+    """A /praylist filter; user is a user id or an @username"""
+    user_id = None
+    if user:
+        user_id = int(user) if user.isdigit() else bot_data.prayer_usernames.get(user.lstrip('@').lower())
+    return {'status': status, 'user': user, 'user_id': user_id, 'since': since, 'until': until,
+            'archive': archive}
+
+
+def parse_prayer_query(args: List[str]) -> dict:
+    """/praylist [open|answered] [@user|user_id] [from [to]] [archive]; ValueError if malformed"""
+    status = user = None
+    dates = []
+    archive = False
+    for arg in args:
+        word = arg.lower()
+        if word in PRAYER_STATUSES:
+            status = word
+        elif word == 'archive':
+            archive = True
+        elif arg.isdigit() or (arg.startswith('@') and len(arg) > 1):
+            user = arg
+        else:
+            dates.append(datetime.strptime(arg, '%Y-%m-%d').strftime('%Y-%m-%d'))
+    if len(dates) > 2:
+        raise ValueError("too many dates")
+    dates += [None] * (2 - len(dates))
+    return make_prayer_query(status, user, dates[0], dates[1], archive)
+
+
+def encode_prayer_query(query: dict, page: int, part: int = 0) -> str:
+    """Callback data of a query page: fits the 64 byte limit with any username"""
+    return '_'.join((
+        'prq', f"{page}.{part}" if part else str(page), (query['status'] or '')[:1],
+        (query['since'] or '').replace('-', ''), (query['until'] or '').replace('-', ''),
+        '1' if query['archive'] else '',
+        # usernames may contain '_', so the user goes last
+        (query['user'] or '').lstrip('@'),
+    ))
+
+
+def decode_prayer_query(data: str) -> Tuple[dict, int, int]:
+    _, page, status, since, until, archive, user = data.split('_', 6)
+    page, _, part = page.partition('.')
+
+    def date(value: str) -> Optional[str]:
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}" if value else None
+
+    # usernames never start with a digit
+    if user and not user.isdigit():
+        user = '@' + user
+    status = {'o': 'open', 'a': 'answered'}.get(status)
+    return make_prayer_query(status, user or None, date(since), date(until), archive == '1'), int(page), int(part or 0)
+
+
+# (query callback data, archive size, archive mtime) -> matches of the last archive search
+prayer_archive_cache = {}
+
+
+async def find_archived_prayers(query: dict) -> List[dict]:
+    """search_prayer_archive() in a worker thread; the last result is kept for paging"""
+    try:
+        stat = os.stat(PRAYER_ARCHIVE_FILE)
+    except OSError:
+        return []
+    key = (encode_prayer_query(query, 0), stat.st_size, stat.st_mtime_ns)
+    if key not in prayer_archive_cache:
+        matches = await asyncio.get_running_loop().run_in_executor(None, search_prayer_archive, query)
+        prayer_archive_cache.clear()
+        prayer_archive_cache[key] = matches
+    return prayer_archive_cache[key]
+
+
+async def render_prayer_query(query: dict, page: int,
+                              part: int = 0) -> Tuple[Optional[str], Optional[InlineKeyboardMarkup]]:
+    """One page (or part, see page_parts) of filtered /praylist results; (None, None) when nothing matches"""
+    page = max(page, 0)
+    if query['archive']:
+        matches = await find_archived_prayers(query)
+        total = len(matches)
+        pages = max(1, -(-total // PAGE_SIZE))
+        page = min(page, pages - 1)
+        end = total - page * PAGE_SIZE
+        items = matches[max(0, end - PAGE_SIZE):max(0, end)][::-1]
+    else:
+        items, total = storage.find_prayers(query, PAGE_SIZE, page * PAGE_SIZE)
+        pages = max(1, -(-total // PAGE_SIZE))
+        if page >= pages:
+            page = pages - 1
+            items, total = storage.find_prayers(query, PAGE_SIZE, page * PAGE_SIZE)
+    if not total:
+        return None, None
+
+    filters_text = [query['status'], query['user']]
+    if query['since'] or query['until']:
+        filters_text.append(f"{query['since'] or '…'} – {query['until'] or '…'}")
+    if query['archive']:
+        filters_text.append("archive")
+    title = "🙏 **ဆုတောင်းခံချက်စာရင်း**\n🔎 " + " · ".join(f for f in filters_text if f) + f" ({total})"
+    parts = page_parts(title, items, _format_prayer, page * PAGE_SIZE, page, pages)
+    part = len(parts) - 1 if not 0 <= part < len(parts) else part
+    return parts[part], page_buttons(page, pages, part, len(parts), lambda n, p: encode_prayer_query(query, n, p))
+
+
+def render_birthdays() -> str:
+    birthdays = get_current_month_birthdays()
+    if not birthdays:
+        return ""
+    current_month = datetime.now(TIMEZONE).strftime('%B')
+    lines = [f"🎂 **{current_month} လ မွေးနေ့များ**\n"]
+    lines.extend(f"• {bd['month']}/{bd['day']} - {bd['name']}" for bd in birthdays)
+    lines.append("\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH")
+    return '\n'.join(lines)
+
+
+def render_counts() -> str:
+    counts = storage.counts()
+    return (
+        "📊 **Bot Statistics**\n\n"
+        f"👥 Users: {counts['users']}\n"
+        f"👨‍👩‍👧‍👦 Groups: {counts['groups']}\n"
+        f"📖 Verses: {counts['verses']}\n"
+        f"❓ Quizzes: {counts['quizzes']}\n"
+        f"🙏 Prayers: {counts['prayers']}\n"
+        f"🎂 Birthdays: {counts['birthdays']}\n"
+        f"📅 Events: {counts['events']}\n"
+        f"📞 Contacts: {counts['contacts']}\n"
+    )
+
+
+def deep_sizeof(obj, seen: set) -> int:
+    """Bytes used by obj and everything it references that is not in `seen` yet"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, Record):
+        size += sum(deep_sizeof(getattr(obj, key), seen) for key in obj.FIELDS if hasattr(obj, key))
+        size += deep_sizeof(obj.extra, seen)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+def memory_usage() -> List[Tuple[str, int, int]]:
+    """(collection, items, bytes) for bot_data
+
+    Collections are measured in order with one shared `seen` set, so an
+    index only counts what it adds on top of the records it points to.
+    """
+    data = bot_data
+    collections = (
+        ('prayers', len(data.prayers), (data.prayers, data._prayer_dates)),
+        ('prayer indexes', len(data.prayer_by_id),
+         (data.prayer_by_id, data.prayers_by_user, data.prayer_usernames, data.prayer_activity)),
+        ('quizzes', len(data.quizzes), (data.quizzes,)),
+        ('quiz index', len(data.quiz_ids), (data.quiz_by_id, data.quiz_ids, data._quiz_pos)),
+        ('scores', len(data.quiz_scores), (data.quiz_scores, data.group_scores)),
+        ('leaderboards', 1 + len(data.group_leaderboards), (data.leaderboard, data.group_leaderboards)),
+        ('birthdays', len(data.birthdays), (data.birthdays,)),
+        ('birthday index', len(data.birthdays), (data.birthday_index,)),
+        ('events', len(data.events) + len(data.past_events), (data.events, data._event_keys, data.past_events)),
+        ('verses & contacts', len(data.verses) + len(data.contacts), (data.verses, data.contacts, data.about)),
+        ('dedupe index', sum(len(index) for index in data.dedupe_index.values()), (data.dedupe_index,)),
+        ('users & groups', len(data.users) + len(data.groups), (data.users, data.groups)),
+        ('counters & settings', len(data.message_count),
+         (data.message_count, data.counts_changed, data.chat_thresholds, data.quiz_schedules,
+          data.birthday_groups, data.event_groups, data.generations)),
+    )
+    seen = set()
+    return [(name, items, sum(deep_sizeof(obj, seen) for obj in objs)) for name, items, objs in collections]
+
+
+def process_rss() -> Optional[int]:
+    """Resident memory of this process in bytes (peak where the current value is unknown)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return None
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class Profiler:
+    """cProfile window opened by /profile, covering the event loop and the flush threads"""
+
+    def __init__(self):
+        self.profile: Optional[cProfile.Profile] = None
+        self.worker_profile: Optional[cProfile.Profile] = None
+        self.worker_runs = 0
+        self.started = 0.0
+        self.job = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.profile is not None
+
+    def start(self):
+        """Start profiling the calling (event loop) thread; ValueError if another profiler runs"""
+        if sys.getprofile() is not None:
+            raise ValueError("another profiler is active")
+        profile = cProfile.Profile()
+        profile.enable()
+        self.profile = profile
+        self.worker_profile = cProfile.Profile()
+        self.worker_runs = 0
+        self.started = time.perf_counter()
+
+    def run(self, func, *args):
+        """Call func, under the worker profile while a window is open"""
+        worker = self.worker_profile
+        if worker is None:
+            return func(*args)
+        with self._worker_lock:
+            try:
+                worker.enable()
+            except ValueError:
+                # Python 3.12+: the loop's profile already sees every thread
+                return func(*args)
+            self.worker_runs += 1
+            try:
+                return func(*args)
+            finally:
+                worker.disable()
+
+    def stop(self) -> Tuple[pstats.Stats, float]:
+        """Close the window; returns the merged stats and its length in seconds"""
+        profile, worker = self.profile, self.worker_profile
+        profile.disable()
+        self.profile = self.worker_profile = None
+        elapsed = time.perf_counter() - self.started
+        stats = pstats.Stats(profile)
+        with self._worker_lock:
+            if self.worker_runs:
+                stats.add(worker)
+        return stats, elapsed
+
+
+profiler = Profiler()
+
+
+# The event loop waiting for I/O: idle time, not work
+IDLE_FUNCTIONS = (
+    "<method 'poll' of 'select.",
+    "<method 'control' of 'select.",
+    "<built-in method select.select>",
+    "<built-in method _overlapped.GetQueuedCompletionStatus>",
+)
+
+
+def render_profile(stats: pstats.Stats, elapsed: float, top: int) -> str:
+    """Hottest functions by own time, idle waiting left out"""
+    busy = [item for item in stats.stats.items() if not item[0][2].startswith(IDLE_FUNCTIONS)]
+    rows = sorted(busy, key=lambda item: item[1][2], reverse=True)[:top]
+    calls = sum(stat[1] for _, stat in busy)
+    busy_time = sum(stat[2] for _, stat in busy)
+    lines = [f"🔬 Profile: {elapsed:.0f}s, busy {busy_time:.2f}s, {calls:,} calls\n",
+             "own ms / total ms / calls - function"]
+    for (filename, line, name), (_, nc, tt, ct, _) in rows:
+        where = f"{os.path.basename(filename)}:{line} {name}" if line else name
+        lines.append(f"{tt * 1000:.1f} / {ct * 1000:.1f} / {nc:,} - {where}")
+    return '\n'.join(lines)
+
+
+async def send_profile(bot, chat_id: int, top: int):
+    """Close the profiling window and send its summary and .prof file to chat_id"""
+    persister.worker_hook = None
+    stats, elapsed = profiler.stop()
+    await bot.send_message(chat_id=chat_id, text=split_message(render_profile(stats, elapsed, top))[0])
+    await bot.send_document(
+        chat_id=chat_id,
+        # the pstats file format: what Stats.dump_stats() writes
+        document=marshal.dumps(stats.stats),
+        filename=f"profile_{datetime.now(TIMEZONE).strftime('%Y%m%d_%H%M%S')}.prof",
+        caption="python -m pstats ဖြင့် ဖွင့်ကြည့်နိုင်ပါသည်။",
+    )
+
+
+async def finish_profile(context: ContextTypes.DEFAULT_TYPE):
+    """Job: the /profile window is over"""
+    profiler.job = None
+    try:
+        await send_profile(context.bot, context.job.chat_id, context.job.data)
+    except Exception as e:
+        logger.exception(f"Profile send error: {e}")
 
 
 # Command handlers
@@ -150,10 +3038,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Track users and groups
     if chat and chat.type == 'private':
-        bot_data.users.add(user.id)
-    elif chat:
-        bot_data.groups.add(chat.id)
-    save_data()
+        if user.id not in bot_data.users:
+            record('add_user', user.id)
+    elif chat and chat.id not in bot_data.groups:
+        record('add_group', chat.id)
 
     welcome_text = f"""
 🙏 ကြိုဆိုပါတယ် {user.first_name}!
@@ -196,15 +3084,23 @@ async def edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /edcontact - ဆက်သွယ်ရန်အချက်အလက်များထည့်ရန်
 /edverse - ကျမ်းချက်များထည့်ရန်
 /edevents - အစီအစဉ်များထည့်ရန်
+/eventalert - Group သို့ အစီအစဉ်သတိပေးချက် ဖွင့်/ပိတ်ရန်
 /edbirthday - မွေးနေ့များထည့်ရန်
+/birthdayalert - Group သို့ နေ့စဉ်မွေးနေ့ကြေညာချက် ဖွင့်/ပိတ်ရန်
 /edquiz - Quiz များထည့်ရန်
-/praylist - ဆုတောင်းခံချက်စာရင်း
+/praylist - ဆုတောင်းခံချက်စာရင်း (filter ဖြင့် ရှာနိုင်)
+/praystatus - ဆုတောင်းခံချက် answered/open ပြောင်းရန်
 /set - Quiz ကျမည့်အကြိမ်သတ်မှတ်ရန်
+/autoquiz - Group အလိုက် Auto Quiz cooldown/အချိန်သတ်မှတ်ရန်
 /broadcast - သတင်းစကားများပို့ရန်
 /stats - အသုံးပြုသူများစာရင်း
+/memory - Memory သုံးစွဲမှု
+/profile - Bot ကို Profile လုပ်ရန် (နှေးနေလျှင်)
+/import - File မှ ကျမ်းချက်/Quiz/မွေးနေ့ များ တစ်ခါတည်းထည့်ရန်
 /backup - Data ကို Backup လုပ်ရန်
 /restore - Data ပြန်ယူရန်
 /delete - Data များဖျက်ရန်
+/dedupe - ထပ်နေသော ကျမ်းချက်/ဆက်သွယ်ရန်/Quiz များ ရှာဖျက်ရန်
 /allclear - Data အားလုံးဖျက်ရန်
 
 ━━━━━━━━━━━━━━━
@@ -228,8 +3124,7 @@ async def edabout(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def receive_about(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive about text"""
-    bot_data.about = update.message.text
-    save_data()
+    record('set_about', update.message.text)
     await update.message.reply_text("✅ အသင်းတော်အကြောင်း သိမ်းဆည်းပြီးပါပြီ။")
     return ConversationHandler.END
 
@@ -237,11 +3132,8 @@ async def receive_about(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def about(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /about command"""
     if bot_data.about:
-        await update.message.reply_text(
-            f"ℹ️ **အသင်းတော်အကြောင်း**\n\n{bot_data.about}\n\n"
-            f"━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH",
-            parse_mode=ParseMode.MARKDOWN
-        )
+        chunks = cached_render('about', ('about',), render_about)
+        await reply_chunks(update.message, chunks, parse_mode=ParseMode.MARKDOWN)
     else:
         await update.message.reply_text("📝 အချက်အလက်များ မရှိသေးပါ။")
 
@@ -265,30 +3157,53 @@ async def edcontact(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def receive_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive contact info"""
-    contacts = update.message.text.strip().split('\n')
-    added = 0
-    for contact in contacts:
-        contact = contact.strip()
-        if contact:
-            bot_data.contacts.append(contact)
-            added += 1
-    save_data()
-    await update.message.reply_text(f"✅ ဆက်သွယ်ရန်အချက်အလက် {added} ခု ထည့်ပြီးပါပြီ။")
+    new_contacts, errors = parse_contacts(update.message.text)
+    new_contacts, duplicates = bot_data.new_entries('contact', new_contacts)
+    added = len(new_contacts)
+    if new_contacts:
+        record('add_contacts', new_contacts)
+    await update.message.reply_text(
+        f"✅ ဆက်သွယ်ရန်အချက်အလက် {added} ခု ထည့်ပြီးပါပြီ။" + format_duplicates(duplicates) + format_parse_errors(errors)
+    )
     return ConversationHandler.END
 
 
 async def contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /contact command"""
     if bot_data.contacts:
-        contact_text = "📞 **ဆက်သွယ်ရန်**\n\n"
-        for idx, contact in enumerate(bot_data.contacts, 1):
-            contact_text += f"{idx}. {contact}\n"
-        contact_text += "\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH"
-        await update.message.reply_text(contact_text, parse_mode=ParseMode.MARKDOWN)
+        text, reply_markup = render_page('contacts', 0)
+        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
     else:
         await update.message.reply_text("📝 ဆက်သွယ်ရန်အချက်အလက် မရှိသေးပါ။")
 
 
+async def page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle ◀️ / ▶️ buttons of paged lists"""
+    query = update.callback_query
+    # page_<kind>_<n>, or page_<kind>_<n>_<part> for pages split into parts
+    parts = query.data.split('_')
+    numbers = parts[2:]
+    valid = 1 <= len(numbers) <= 2 and all(n.lstrip('-').isdigit() for n in numbers)
+    paged = PAGED_LISTS.get(parts[1]) if valid else None
+    if paged is None:
+        await query.answer()
+        return
+    if paged.admin_only and not is_admin(query.from_user.id):
+        await query.answer("⚠️ သင်သည် Admin မဟုတ်ပါ။", show_alert=True)
+        return
+
+    await query.answer()
+    if parts[1] == 'events':
+        archive_past_events()
+    text, reply_markup = render_page(parts[1], *map(int, numbers))
+    try:
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    except BadRequest as e:
+        # pressing a button twice re-renders the same page
+        if 'not modified' not in str(e).lower():
+            raise
+
+
 async def edverse(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /edverse command"""
     if not is_admin(update.effective_user.id):
@@ -307,14 +3222,14 @@ async def edverse(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def receive_verse(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive verse"""
-    verses = update.message.text.strip().split('\n')
-    count = 0
-    for verse in verses:
-        if verse.strip():
-            bot_data.verses.append(verse.strip())
-            count += 1
-    save_data()
-    await update.message.reply_text(f"✅ ကျမ်းချက် {count} ခု ထည့်ပြီးပါပြီ။")
+    new_verses, errors = parse_verses(update.message.text)
+    new_verses, duplicates = bot_data.new_entries('verse', new_verses)
+    count = len(new_verses)
+    if new_verses:
+        record('add_verses', new_verses)
+    await update.message.reply_text(
+        f"✅ ကျမ်းချက် {count} ခု ထည့်ပြီးပါပြီ။" + format_duplicates(duplicates) + format_parse_errors(errors)
+    )
     return ConversationHandler.END
 
 
@@ -344,10 +3259,10 @@ async def edevents(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await update.message.reply_text(
         "📅 အစီအစဉ်များထည့်ပါ:\n\n"
-        "Format: ရက်စွဲ - အစီအစဉ်အမည်\n"
+        "Format: ရက်စွဲ [အချိန်] - အစီအစဉ်အမည်\n"
         "ဥပမာ:\n"
         "2024-03-15 - နှစ်သစ်ကူးပွဲတော်\n"
-        "2024-04-01 - လူငယ်စခန်း\n\n"
+        "2024-04-01 18:30 - လူငယ်စခန်း\n\n"
         "တစ်ကြောင်းချင်းစီ ရေးပါ။ ပယ်ဖျက်ရန် /cancel"
     )
     return EDIT_EVENTS
@@ -355,27 +3270,59 @@ async def edevents(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def receive_events(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive events"""
-    events = update.message.text.strip().split('\n')
-    count = 0
-    for event in events:
-        if event.strip():
-            bot_data.events.append(event.strip())
-            count += 1
-    save_data()
-    await update.message.reply_text(f"✅ အစီအစဉ် {count} ခု ထည့်ပြီးပါပြီ။")
+    new_events, errors = parse_events(update.message.text)
+    count = len(new_events)
+    if new_events:
+        record('add_events', new_events)
+        event_reminders.reschedule()
+    undated = sum(1 for event in new_events if not event['date'])
+    text = f"✅ အစီအစဉ် {count} ခု ထည့်ပြီးပါပြီ။"
+    if undated:
+        text += f"\n⚠️ {undated} ခုတွင် ရက်စွဲ (YYYY-MM-DD) မပါသဖြင့် သတိပေးချက် မပို့ပါ။"
+    await update.message.reply_text(text + format_parse_errors(errors))
     return ConversationHandler.END
 
 
 async def events(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /events command"""
+    archive_past_events()
     if bot_data.events:
-        events_text = "📅 **လာမည့်အစီအစဉ်များ**\n\n"
-        for idx, event in enumerate(bot_data.events, 1):
-            events_text += f"{idx}. {event}\n"
-        events_text += "\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH"
-        await update.message.reply_text(events_text, parse_mode=ParseMode.MARKDOWN)
+        text, reply_markup = render_page('events', 0)
+        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    else:
+        await update.message.reply_text("📝 အစီအစဉ်များ မရှိသေးပါ။")
+
+
+async def event_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /eventalert command - event reminders for this group"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    chat = update.effective_chat
+    if chat.type == 'private':
+        await update.message.reply_text("⚠️ ဤ command ကို Group ထဲတွင်သာ သုံးနိုင်ပါသည်။")
+        return
+
+    hours = f"{EVENT_REMINDER_HOURS:g}"
+    choice = context.args[0].lower() if context.args else ''
+    if choice not in ('on', 'off'):
+        status = "ဖွင့်ထားသည်" if chat.id in bot_data.event_groups else "ပိတ်ထားသည်"
+        await update.message.reply_text(
+            "⏰ အစီအစဉ် သတိပေးချက်:\n\n"
+            "/eventalert on - ဤ Group သို့ ပို့ရန်\n"
+            "/eventalert off - ရပ်ရန်\n\n"
+            f"လက်ရှိ: {status} (အစီအစဉ် မစမီ {hours} နာရီ)"
+        )
+        return
+
+    record('set_event_group', chat.id, choice == 'on')
+    if choice == 'on':
+        await update.message.reply_text(
+            f"✅ အစီအစဉ်များ မစမီ {hours} နာရီတွင် ဤ Group သို့ သတိပေးပါမည်။"
+        )
     else:
-        await update.message.reply_text("📝 အစီအစဉ်များ မရှိသေးပါ။")
+        await update.message.reply_text("✅ ဤ Group ၏ အစီအစဉ် သတိပေးချက်ကို ရပ်လိုက်ပါပြီ။")
 
 
 async def edbirthday(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -399,57 +3346,92 @@ async def receive_birthday(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive birthdays. Expected formats:
     3-15 - Name
     03-05 - Name
+    ၃-၁၅ - Name
     """
-    text = update.message.text.strip()
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    count = 0
-    for line in lines:
-        # pattern: month-day - name
-        m = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s*-\s*(.+)$", line)
-        if m:
-            try:
-                month = int(m.group(1))
-                day = int(m.group(2))
-                name = m.group(3).strip()
-                if 1 <= month <= 12 and 1 <= day <= 31:
-                    bot_data.birthdays.append({'month': month, 'day': day, 'name': name})
-                    count += 1
-            except Exception:
-                continue
-        else:
-            # try alternate pattern: mm-dd name (no second hyphen)
-            m2 = re.match(r"^(\d{1,2})\s*-\s*(\d{1,2})\s+[-:]?\s*(.+)$", line)
-            if m2:
-                try:
-                    month = int(m2.group(1))
-                    day = int(m2.group(2))
-                    name = m2.group(3).strip()
-                    if 1 <= month <= 12 and 1 <= day <= 31:
-                        bot_data.birthdays.append({'month': month, 'day': day, 'name': name})
-                        count += 1
-                except Exception:
-                    continue
-
-    save_data()
-    await update.message.reply_text(f"✅ မွေးနေ့ {count} ခု ထည့်ပြီးပါပြီ။")
+    new_birthdays, errors = parse_birthdays(update.message.text)
+    count = len(new_birthdays)
+    if new_birthdays:
+        record('add_birthdays', new_birthdays)
+    await update.message.reply_text(f"✅ မွေးနေ့ {count} ခု ထည့်ပြီးပါပြီ။" + format_parse_errors(errors))
     return ConversationHandler.END
 
 
 async def birthday(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /birthday command"""
-    monthly_birthdays = get_current_month_birthdays()
-
-    if monthly_birthdays:
-        current_month = datetime.now(TIMEZONE).strftime('%B')
-        birthday_text = f"🎂 **{current_month} လ မွေးနေ့များ**\n\n"
-        for bd in sorted(monthly_birthdays, key=lambda x: x['day']):
-            birthday_text += f"• {bd['month']}/{bd['day']} - {bd['name']}\n"
-        birthday_text += "\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH"
-        await update.message.reply_text(birthday_text, parse_mode=ParseMode.MARKDOWN)
+    month = datetime.now(TIMEZONE).month
+    # a month without birthdays renders to no chunks, cached like the others
+    chunks = cached_render(f"birthday:{month}", ('birthdays',), render_birthdays)
+
+    if chunks:
+        await reply_chunks(update.message, chunks, parse_mode=ParseMode.MARKDOWN)
     else:
         await update.message.reply_text("🎂 ယခုလတွင် မွေးနေ့များ မရှိပါ။")
 
 
+async def birthday_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /birthdayalert command - daily birthday post for this group"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    chat = update.effective_chat
+    if chat.type == 'private':
+        await update.message.reply_text("⚠️ ဤ command ကို Group ထဲတွင်သာ သုံးနိုင်ပါသည်။")
+        return
+
+    choice = context.args[0].lower() if context.args else ''
+    if choice not in ('on', 'off'):
+        status = "ဖွင့်ထားသည်" if chat.id in bot_data.birthday_groups else "ပိတ်ထားသည်"
+        await update.message.reply_text(
+            "🎂 နေ့စဉ် မွေးနေ့ကြေညာချက်:\n\n"
+            "/birthdayalert on - ဤ Group သို့ ပို့ရန်\n"
+            "/birthdayalert off - ရပ်ရန်\n\n"
+            f"လက်ရှိ: {status} (နေ့စဉ် {BIRTHDAY_ANNOUNCE_TIME})"
+        )
+        return
+
+    record('set_birthday_group', chat.id, choice == 'on')
+    if choice == 'on':
+        await update.message.reply_text(
+            f"✅ ယနေ့မွေးနေ့ရှင်များကို နေ့စဉ် {BIRTHDAY_ANNOUNCE_TIME} တွင် ဤ Group သို့ ကြေညာပေးပါမည်။"
+        )
+    else:
+        await update.message.reply_text("✅ ဤ Group ၏ မွေးနေ့ကြေညာချက်ကို ရပ်လိုက်ပါပြီ။")
+
+
+async def announce_birthdays(context: ContextTypes.DEFAULT_TYPE):
+    """Daily job: post today's birthdays to the subscribed groups"""
+    if not bot_data.birthday_groups:
+        return
+    today = datetime.now(TIMEZONE)
+    birthdays = storage.birthdays_on(today.month, today.day)
+    if not birthdays:
+        return
+
+    lines = ["🎂 ယနေ့ မွေးနေ့ရှင်များ\n"]
+    lines.extend(f"• {bd['name']}" for bd in birthdays)
+    lines.append("\n🎉 မွေးနေ့မှာ ပျော်ရွှင်ပါစေ။ ဘုရားသခင် ကောင်းချီးပေးပါစေ။")
+    lines.append("\n━━━━━━━━━━━━━━━\n✨ Created by: PINLON-YOUTH")
+    # the broadcast engine takes care of flood limits and restarts
+    await broadcaster.submit(BroadcastJob('text', list(bot_data.birthday_groups), text='\n'.join(lines)))
+    logger.info(f"Birthday announcement for {len(birthdays)} birthday(s) queued to "
+                f"{len(bot_data.birthday_groups)} group(s)")
+
+
+def schedule_birthday_announcements(application: Application):
+    """Register the daily announce_birthdays job at BIRTHDAY_ANNOUNCE_TIME"""
+    if application.job_queue is None:
+        logger.warning("JobQueue unavailable; daily birthday announcements are disabled")
+        return
+    try:
+        hour, minute = (int(part) for part in BIRTHDAY_ANNOUNCE_TIME.split(':'))
+        at = dtime(hour, minute, tzinfo=TIMEZONE)
+    except ValueError:
+        logger.error(f"Invalid BIRTHDAY_ANNOUNCE_TIME {BIRTHDAY_ANNOUNCE_TIME!r}, expected HH:MM")
+        return
+    application.job_queue.run_daily(announce_birthdays, time=at, name='birthday_announcements')
+
+
 async def pray(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /pray command"""
     if not context.args:
@@ -469,8 +3451,7 @@ async def pray(update: Update, context: ContextTypes.DEFAULT_TYPE):
         'date': datetime.now(TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
     }
 
-    bot_data.prayers.append(prayer_entry)
-    save_data()
+    record('add_prayer', prayer_entry)
 
     await update.message.reply_text(
         "✅ သင့်ဆုတောင်းခံချက်ကို လက်ဝယ်ရရှိပြီး ဆုတောင်းပေးပါမည်။\n\n"
@@ -484,38 +3465,172 @@ async def praylist(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
         return
 
-    if bot_data.prayers:
-        prayer_text = "🙏 **ဆုတောင်းခံချက်စာရင်း**\n\n"
-        for idx, prayer in enumerate(bot_data.prayers[-20:], 1):  # Last 20
-            prayer_text += f"{idx}. @{prayer['username']}\n"
-            prayer_text += f"   {prayer['prayer']}\n"
-            prayer_text += f"   📅 {prayer['date']}\n\n"
-        await update.message.reply_text(prayer_text, parse_mode=ParseMode.MARKDOWN)
+    if context.args:
+        try:
+            query = parse_prayer_query(context.args)
+        except ValueError:
+            await update.message.reply_text(
+                "🙏 ဆုတောင်းခံချက် ရှာရန်:\n\n"
+                "/praylist [open|answered] [@username|user_id] [YYYY-MM-DD [YYYY-MM-DD]] [archive]\n\n"
+                "ဥပမာ: /praylist open 2024-01-01 2024-03-31"
+            )
+            return
+        text, reply_markup = await render_prayer_query(query, 0)
+        if text is None:
+            await update.message.reply_text("📝 ကိုက်ညီသော ဆုတောင်းခံချက် မရှိပါ။")
+        else:
+            await update.message.reply_text(text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    elif bot_data.prayers:
+        text, reply_markup = render_page('prayers', 0)
+        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
     else:
         await update.message.reply_text("📝 ဆုတောင်းခံချက်များ မရှိသေးပါ။")
 
 
+async def prayer_query_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle ◀️ / ▶️ buttons of filtered /praylist results"""
+    query = update.callback_query
+    if not is_admin(query.from_user.id):
+        await query.answer("⚠️ သင်သည် Admin မဟုတ်ပါ။", show_alert=True)
+        return
+    await query.answer()
+    try:
+        prayer_query, page, part = decode_prayer_query(query.data)
+    except ValueError:
+        return
+    text, reply_markup = await render_prayer_query(prayer_query, page, part)
+    if text is None:
+        text = "📝 ကိုက်ညီသော ဆုတောင်းခံချက် မရှိပါ။"
+    try:
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    except BadRequest as e:
+        if 'not modified' not in str(e).lower():
+            raise
+
+
+async def pray_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /praystatus <id> answered|open - Admin only"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    args = context.args or []
+    if len(args) != 2 or not args[0].lstrip('#').isdigit() or args[1].lower() not in PRAYER_STATUSES:
+        await update.message.reply_text(
+            "🙏 ဆုတောင်းခံချက် အခြေအနေ ပြောင်းရန်:\n\n"
+            "/praystatus နံပါတ် answered - ပြည့်စုံပြီ\n"
+            "/praystatus နံပါတ် open - ပြန်ဖွင့်ရန်\n\n"
+            "နံပါတ် (#) ကို /praylist တွင် ကြည့်ပါ။"
+        )
+        return
+
+    prayer_id = int(args[0].lstrip('#'))
+    if prayer_id not in bot_data.prayer_by_id:
+        # archived prayers are read-only
+        await update.message.reply_text("❌ ဆုတောင်းခံချက် မတွေ့ပါ။")
+        return
+    record('set_prayer_status', prayer_id, args[1].lower())
+    await update.message.reply_text(f"✅ #{prayer_id} ကို {args[1].lower()} အဖြစ် ပြောင်းပြီးပါပြီ။")
+
+
+async def archive_old_prayers(context: ContextTypes.DEFAULT_TYPE):
+    """Daily job: move prayers older than PRAYER_RETENTION_DAYS to PRAYER_ARCHIVE_FILE"""
+    cutoff = (datetime.now(TIMEZONE) - timedelta(days=PRAYER_RETENTION_DAYS)).strftime('%Y-%m-%d')
+    old = bot_data.prayers_before(cutoff)
+    if not old:
+        return
+    try:
+        written = await asyncio.get_running_loop().run_in_executor(None, append_prayer_archive, old)
+    except OSError as e:
+        logger.error(f"Could not write {PRAYER_ARCHIVE_FILE}: {e}")
+        return
+    # drop them from the store only once they are safely in the archive
+    record('archive_prayers', old[-1]['id'])
+    logger.info(f"Archived {len(old)} prayer(s) from before {cutoff} ({written} bytes)")
+
+
+def schedule_prayer_archiving(application: Application):
+    """Register the daily archive_old_prayers job (first run a minute after start)"""
+    if PRAYER_RETENTION_DAYS <= 0:
+        return
+    if application.job_queue is None:
+        logger.warning("JobQueue unavailable; old prayers are not archived")
+        return
+    application.job_queue.run_repeating(archive_old_prayers, interval=timedelta(days=1), first=60,
+                                        name='prayer_archive')
+
+
 async def set_quiz_threshold(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /set command"""
+    """Handle /set command (/set N group for this group only)"""
     if not is_admin(update.effective_user.id):
         await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
         return
 
+    chat = update.effective_chat
     if not context.args or not context.args[0].isdigit():
+        current = f"လက်ရှိ: {bot_data.quiz_threshold} messages"
+        if chat.id in bot_data.chat_thresholds:
+            current += f" (ဤ Group: {bot_data.chat_thresholds[chat.id]} messages)"
         await update.message.reply_text(
             "⚙️ Quiz ကျမည့် message အရေအတွက်သတ်မှတ်ရန်:\n\n"
-            f"/set နံပါတ်\n\n"
-            f"လက်ရှိ: {bot_data.quiz_threshold} messages"
+            f"/set နံပါတ်\n"
+            f"/set နံပါတ် group - ဤ Group အတွက်သာ (0 = ပုံမှန်သို့ပြန်)\n\n"
+            f"{current}"
+        )
+        return
+
+    if len(context.args) > 1 and context.args[1].lower() == 'group' and chat.type != 'private':
+        record('set_chat_threshold', chat.id, int(context.args[0]))
+        threshold = bot_data.chat_thresholds.get(chat.id, bot_data.quiz_threshold)
+        await update.message.reply_text(
+            f"✅ ဤ Group ၏ Quiz threshold ကို {threshold} messages သို့ သတ်မှတ်ပြီးပါပြီ။"
         )
         return
 
-    bot_data.quiz_threshold = int(context.args[0])
-    save_data()
+    record('set_quiz_threshold', int(context.args[0]))
     await update.message.reply_text(
         f"✅ Quiz threshold ကို {bot_data.quiz_threshold} messages သို့ သတ်မှတ်ပြီးပါပြီ။"
     )
 
 
+async def autoquiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /autoquiz command - auto quiz pacing for this group"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    chat = update.effective_chat
+    if chat.type == 'private':
+        await update.message.reply_text("⚠️ ဤ command ကို Group ထဲတွင်သာ သုံးနိုင်ပါသည်။")
+        return
+
+    settings = dict(quiz_scheduler.settings(chat.id))
+    args = [arg.lower() for arg in context.args]
+    if args == ['off']:
+        settings = {'cooldown': 0, 'every': 0}
+    elif len(args) == 2 and args[0] in ('cooldown', 'every') and args[1].isdigit():
+        settings[args[0]] = int(args[1])
+    else:
+        threshold = bot_data.chat_thresholds.get(chat.id, bot_data.quiz_threshold)
+        every = f"{settings['every']:g} မိနစ်တိုင်း" if settings['every'] else "ပိတ်ထားသည်"
+        await update.message.reply_text(
+            "⏱ Auto Quiz သတ်မှတ်ချက်များ:\n\n"
+            "/autoquiz cooldown မိနစ် - Quiz တစ်ခုနှင့်တစ်ခုကြား အနည်းဆုံးကြာချိန်\n"
+            "/autoquiz every မိနစ် - Message ရှိလျှင် မိနစ်အလိုက် Quiz ပို့ရန် (0 = ပိတ်)\n"
+            "/autoquiz off - ပုံမှန်သို့ပြန်ရန်\n\n"
+            f"လက်ရှိ: {threshold} messages, cooldown {settings['cooldown']:g} မိနစ်, အချိန်အလိုက်: {every}"
+        )
+        return
+
+    record('set_quiz_schedule', chat.id, settings['cooldown'], settings['every'])
+    quiz_scheduler.reschedule(chat.id)
+    settings = quiz_scheduler.settings(chat.id)
+    await update.message.reply_text(
+        f"✅ ဤ Group ၏ Auto Quiz: cooldown {settings['cooldown']:g} မိနစ်, "
+        f"အချိန်အလိုက် {settings['every']:g} မိနစ် (0 = ပိတ်)"
+    )
+
+
 async def edquiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /edquiz command"""
     if not is_admin(update.effective_user.id):
@@ -539,48 +3654,28 @@ async def edquiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def receive_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receive quizzes"""
-    quiz_blocks = update.message.text.strip().split('\n\n')
-    count = 0
-
-    for block in quiz_blocks:
-        lines = [l.strip() for l in block.strip().split('\n') if l.strip()]
-        if len(lines) >= 6:
-            # tolerate either 'A) text' or 'A)text'
-            choices = {}
-            for ch_line in lines[1:5]:
-                m = re.match(r"^([A-Da-d])\)\s*(.+)$", ch_line)
-                if m:
-                    choices[m.group(1).upper()] = m.group(2).strip()
-            answer_line = lines[5]
-            ans_m = re.search(r"([A-Da-d])", answer_line)
-            if ans_m and len(choices) == 4:
-                quiz = {
-                    'question': lines[0],
-                    'choices': choices,
-                    'answer': ans_m.group(1).upper()
-                }
-                bot_data.quizzes.append(quiz)
-                count += 1
-
-    save_data()
-    await update.message.reply_text(f"✅ Quiz {count} ခု ထည့်ပြီးပါပြီ။")
+    new_quizzes, errors = parse_quizzes(update.message.text)
+    new_quizzes, duplicates = bot_data.new_entries('quiz', new_quizzes)
+    count = len(new_quizzes)
+    if new_quizzes:
+        record('add_quizzes', new_quizzes)
+    await update.message.reply_text(
+        f"✅ Quiz {count} ခု ထည့်ပြီးပါပြီ။" + format_duplicates(duplicates) + format_parse_errors(errors)
+    )
     return ConversationHandler.END
 
 
 async def track_messages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Track messages for auto quiz"""
-    chat_id = str(update.effective_chat.id)
-
-    if chat_id not in bot_data.message_count:
-        bot_data.message_count[chat_id] = 0
-
-    bot_data.message_count[chat_id] += 1
-
-    if bot_data.message_count[chat_id] >= bot_data.quiz_threshold and bot_data.quizzes:
-        bot_data.message_count[chat_id] = 0
-        save_data()
-        # send quiz into the same chat by creating a pseudo-update-like object
-        await send_quiz(update, context)
+    # Runs for every group message: plain int-keyed dict updates only, the
+    # counters reach storage through checkpoint_message_counts()
+    chat_id = update.effective_chat.id
+    count = bot_data.message_count.get(chat_id, 0) + 1
+    threshold = bot_data.chat_thresholds.get(chat_id, bot_data.quiz_threshold)
+    if count >= threshold and bot_data.quiz_ids and await quiz_scheduler.trigger(context.bot, chat_id):
+        count = 0
+    bot_data.message_count[chat_id] = count
+    bot_data.counts_changed.add(chat_id)
 
 
 async def quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -588,17 +3683,9 @@ async def quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await send_quiz(update, context)
 
 
-async def send_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Send a random quiz"""
-    if not bot_data.quizzes:
-        if update.message:
-            await update.message.reply_text("📝 Quiz များ မရှိသေးပါ။")
-        else:
-            await context.bot.send_message(chat_id=update.effective_chat.id, text="📝 Quiz များ မရှိသေးပါ။")
-        return
-
-    quiz = random.choice(bot_data.quizzes)
-    quiz_id = bot_data.quizzes.index(quiz)
+def quiz_message(quiz: dict) -> Tuple[str, InlineKeyboardMarkup]:
+    """Quiz text and answer buttons"""
+    quiz_id = quiz['id']
 
     quiz_text = f"❓ **Quiz Time!**\n\n{quiz['question']}\n\n"
     quiz_text += f"A) {quiz['choices']['A']}\n"
@@ -614,8 +3701,20 @@ async def send_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
             InlineKeyboardButton("D", callback_data=f"quiz_{quiz_id}_D"),
         ]
     ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    return quiz_text, InlineKeyboardMarkup(keyboard)
+
+
+async def send_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Send the next quiz from this chat's deck"""
+    quiz = quiz_scheduler.draw(update.effective_chat.id)
+    if quiz is None:
+        if update.message:
+            await update.message.reply_text("📝 Quiz များ မရှိသေးပါ။")
+        else:
+            await context.bot.send_message(chat_id=update.effective_chat.id, text="📝 Quiz များ မရှိသေးပါ။")
+        return
 
+    quiz_text, reply_markup = quiz_message(quiz)
     if update.message:
         await update.message.reply_text(quiz_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
     else:
@@ -635,21 +3734,22 @@ async def quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     quiz_id = int(parts[1])
     user_answer = parts[2]
 
-    if quiz_id >= len(bot_data.quizzes):
+    quiz = bot_data.quiz_by_id.get(quiz_id)
+    if quiz is None:
         await query.edit_message_text("❌ Quiz မရှိတော့ပါ။")
         return
 
-    quiz = bot_data.quizzes[quiz_id]
     user_id = str(query.from_user.id)
     username = query.from_user.username or query.from_user.first_name
 
+    chat = update.effective_chat
+    chat_id = str(chat.id) if chat and chat.type != 'private' else None
+
     if user_id not in bot_data.quiz_scores:
-        bot_data.quiz_scores[user_id] = {'name': username, 'score': 0}
+        record('add_score', user_id, username, 0, chat_id)
 
     if user_answer == quiz['answer']:
-        bot_data.quiz_scores[user_id]['score'] += 1
-        bot_data.quiz_scores[user_id]['name'] = username
-        save_data()
+        record('add_score', user_id, username, 1, chat_id)
 
         result_text = f"✅ **မှန်ကန်ပါသည်!**\n\n"
         result_text += f"အဖြေ: {quiz['answer']}) {quiz['choices'][quiz['answer']]}\n\n"
@@ -658,6 +3758,7 @@ async def quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         result_text = f"❌ **မှားယွင်းနေပါသည်။**\n\n"
         result_text += f"မှန်ကန်သောအဖြေ: {quiz['answer']}) {quiz['choices'][quiz['answer']]}\n\n"
         result_text += f"🏆 သင့်ရမှတ်: {bot_data.quiz_scores[user_id]['score']}"
+    result_text += f" (#{bot_data.leaderboard.rank(user_id)})"
 
     await query.edit_message_text(result_text, parse_mode=ParseMode.MARKDOWN)
 
@@ -665,43 +3766,63 @@ async def quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Helper to save quiz score from other places if needed
 async def save_score(user_id: int, user_name: str, score: int):
     """Save quiz score to central bot_data and persist."""
-    uid = str(user_id)
-    if uid not in bot_data.quiz_scores:
-        bot_data.quiz_scores[uid] = {'name': user_name, 'score': 0}
-    bot_data.quiz_scores[uid]['score'] += score
-    bot_data.quiz_scores[uid]['name'] = user_name
-    save_data()
-    logger.info(f"Score saved for {user_name}: {bot_data.quiz_scores[uid]['score']}")
+    total = record('add_score', str(user_id), user_name, score)
+    logger.info(f"Score saved for {user_name}: {total}")
 
 
-async def tops(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /tops command"""
-    scores = bot_data.quiz_scores or {}
+# Rendered /tops messages: chat id (None = global) -> (board, version, names version, text)
+tops_cache = {}
 
-    if not scores:
-        await update.message.reply_text("🏆 Quiz အမှတ်များ မရှိသေးပါ။")
-        return
 
-    try:
-        sorted_scores = sorted(scores.items(), key=lambda item: item[1].get('score', 0), reverse=True)
+def render_tops(chat_id: Optional[str] = None) -> str:
+    """Render a top 10 leaderboard; re-rendered only when its top rows change"""
+    board = bot_data.leaderboard if chat_id is None else bot_data.group_leaderboards[chat_id]
+    cached = tops_cache.get(chat_id)
+    if cached and cached[0] is board and cached[1] == board.version and cached[2] == bot_data.names_version:
+        return cached[3]
 
+    if chat_id is None:
+        top_scores = storage.top_scores(10)
         tops_text = "<b>🏆 Quiz Top Scores</b>\n\n"
+    else:
+        top_scores = [(uid, bot_data.quiz_scores[uid].get('name'), score) for uid, score in board.top(10)]
+        tops_text = "<b>🏆 Group Quiz Top Scores</b>\n\n"
+
+    for idx, (user_id, name, score_points) in enumerate(top_scores, 1):
+        if idx == 1:
+            medal = "🥇"
+        elif idx == 2:
+            medal = "🥈"
+        elif idx == 3:
+            medal = "🥉"
+        else:
+            medal = f"{idx}."
+
+        safe_name = (name or 'Unknown')
+        tops_text += f"{medal} {safe_name} - <b>{score_points}</b> points\n"
+
+    tops_text += "\n━━━━━━━━━━━━━━━\n✨ Created by: <b>PINLON-YOUTH</b>"
+    tops_cache[chat_id] = (board, board.version, bot_data.names_version, tops_text)
+    return tops_text
 
-        for idx, (user_id, data) in enumerate(sorted_scores[:10], 1):
-            if idx == 1:
-                medal = "🥇"
-            elif idx == 2:
-                medal = "🥈"
-            elif idx == 3:
-                medal = "🥉"
-            else:
-                medal = f"{idx}."
 
-            safe_name = (data.get('name') or 'Unknown')
-            score_points = data.get('score', 0)
-            tops_text += f"{medal} {safe_name} - <b>{score_points}</b> points\n"
+async def tops(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /tops command (/tops group for this group's leaderboard)"""
+    chat_id = None
+    if context.args and context.args[0].lower() == 'group' and update.effective_chat.type != 'private':
+        chat_id = str(update.effective_chat.id)
+
+    board = bot_data.leaderboard if chat_id is None else bot_data.group_leaderboards.get(chat_id)
+    if not board:
+        await update.message.reply_text("🏆 Quiz အမှတ်များ မရှိသေးပါ။")
+        return
 
-        tops_text += "\n━━━━━━━━━━━━━━━\n✨ Created by: <b>PINLON-YOUTH</b>"
+    try:
+        tops_text = render_tops(chat_id)
+        user_id = str(update.effective_user.id)
+        rank = board.rank(user_id)
+        if rank is not None:
+            tops_text += f"\n\n📍 သင့်အဆင့်: #{rank} ({board.scores[user_id]} points)"
 
         await update.message.reply_text(tops_text, parse_mode=ParseMode.HTML)
 
@@ -711,13 +3832,23 @@ async def tops(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /broadcast command"""
+    """Handle /broadcast [groups|users|all|quiz|prayers] command"""
     if not is_admin(update.effective_user.id):
         await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
         return ConversationHandler.END
 
+    target = context.args[0].lower() if context.args else 'groups'
+    if target not in BROADCAST_TARGETS:
+        await update.message.reply_text(
+            "📢 ပို့မည့်သူများ ရွေးရန်:\n\n"
+            + "\n".join(f"/broadcast {name} - {label}" for name, label in BROADCAST_TARGETS.items())
+        )
+        return ConversationHandler.END
+
+    context.user_data['broadcast_target'] = target
     await update.message.reply_text(
         "📢 Broadcast Message ပို့ရန်:\n\n"
+        f"ပို့မည့်သူများ: {BROADCAST_TARGETS[target]}\n\n"
         "စာသားတစ်ခု သို့မဟုတ် ပုံတစ်ပုံ (caption ပါ) ပို့ပါ။\n\n"
         "ပယ်ဖျက်ရန် /cancel"
     )
@@ -725,33 +3856,19 @@ async def broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def receive_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Receive and send broadcast message"""
-    sent_count = 0
-    failed_count = 0
-
-    for group_id in bot_data.groups:
-        try:
-            if update.message.photo:
-                await context.bot.send_photo(
-                    chat_id=group_id,
-                    photo=update.message.photo[-1].file_id,
-                    caption=update.message.caption or ""
-                )
-            else:
-                await context.bot.send_message(
-                    chat_id=group_id,
-                    text=update.message.text
-                )
-            sent_count += 1
-        except Exception as e:
-            logger.exception(f"Failed to send to {group_id}: {e}")
-            failed_count += 1
+    """Receive broadcast message and queue it for the broadcast engine"""
+    message = update.message
+    target = context.user_data.pop('broadcast_target', 'groups')
+    targets = broadcast_targets(target)
+    if message.photo:
+        job = BroadcastJob('photo', targets, photo=message.photo[-1].file_id, caption=message.caption or "")
+    else:
+        job = BroadcastJob('text', targets, text=message.text)
 
-    await update.message.reply_text(
-        f"✅ Broadcast ပို့ပြီးပါပြီ။\n\n"
-        f"အောင်မြင်: {sent_count}\n"
-        f"မအောင်မြင်: {failed_count}"
-    )
+    status = await message.reply_text(f"📢 Broadcast စတင်နေပါပြီ... ({BROADCAST_TARGETS[target]} {job.total} ခု)")
+    job.status_chat = status.chat_id
+    job.status_message = status.message_id
+    await broadcaster.submit(job)
     return ConversationHandler.END
 
 
@@ -761,19 +3878,90 @@ async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
         return
 
-    stats_text = "📊 **Bot Statistics**\n\n"
-    stats_text += f"👥 Users: {len(bot_data.users)}\n"
-    stats_text += f"👨‍👩‍👧‍👦 Groups: {len(bot_data.groups)}\n"
-    stats_text += f"📖 Verses: {len(bot_data.verses)}\n"
-    stats_text += f"❓ Quizzes: {len(bot_data.quizzes)}\n"
-    stats_text += f"🙏 Prayers: {len(bot_data.prayers)}\n"
-    stats_text += f"🎂 Birthdays: {len(bot_data.birthdays)}\n"
-    stats_text += f"📅 Events: {len(bot_data.events)}\n"
-    stats_text += f"📞 Contacts: {len(bot_data.contacts)}\n"
+    # counts are cached per generation; the runtime counters are always live
+    counts_text = cached_render('stats', BotData.GENERATION_FIELDS[1:], render_counts)[0]
+    stats_text = (counts_text + "\n" + persister.stats_text() + update_processor.stats_text()
+                  + flood_guard.stats_text())
 
     await update.message.reply_text(stats_text, parse_mode=ParseMode.MARKDOWN)
 
 
+async def memory(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /memory command - bytes used per collection (Admin only)"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    started = time.perf_counter()
+    usage = memory_usage()
+    elapsed = time.perf_counter() - started
+    lines = ["🧠 **Memory**\n"]
+    lines.extend(f"• {name} ({items:,}): {format_bytes(size)}" for name, items, size in usage)
+    lines.append(f"\n📦 bot_data: {format_bytes(sum(size for _, _, size in usage))}")
+    rss = process_rss()
+    if rss is not None:
+        lines.append(f"🖥️ Process: {format_bytes(rss)}")
+    lines.append(f"⏱️ Measured in {elapsed * 1000:.0f} ms")
+    await update.message.reply_text('\n'.join(lines), parse_mode=ParseMode.MARKDOWN)
+
+
+async def profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /profile [seconds] [top] | /profile stop - profile the running bot (Admin only)"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    args = context.args or []
+    if args and args[0].lower() == 'stop':
+        if not profiler.active:
+            await update.message.reply_text("ℹ️ Profiling မလုပ်နေပါ။")
+            return
+        job, profiler.job = profiler.job, None
+        if job is not None:
+            job.schedule_removal()
+            top = job.data
+        else:
+            top = PROFILE_TOP
+        await send_profile(context.bot, update.effective_chat.id, top)
+        return
+
+    try:
+        seconds = int(args[0]) if args else PROFILE_SECONDS
+        top = int(args[1]) if len(args) > 1 else PROFILE_TOP
+    except ValueError:
+        await update.message.reply_text(
+            "❌ အသုံးပြုပုံ:\n"
+            f"/profile [စက္ကန့် 1-{PROFILE_MAX_SECONDS}] [function အရေအတွက်]\n"
+            "/profile stop"
+        )
+        return
+    seconds = min(max(seconds, 1), PROFILE_MAX_SECONDS)
+    top = min(max(top, 1), 50)
+
+    if profiler.active:
+        await update.message.reply_text("⚠️ Profiling လုပ်နေဆဲဖြစ်ပါသည်။ /profile stop ဖြင့် ရပ်နိုင်ပါသည်။")
+        return
+    if context.job_queue is None:
+        # nothing could end the window, and cProfile would stay on for good
+        await update.message.reply_text(
+            "⚠️ JobQueue မရှိသဖြင့် Profiling မလုပ်နိုင်ပါ (python-telegram-bot[job-queue] ထည့်သွင်းပါ)။"
+        )
+        return
+    try:
+        profiler.start()
+    except ValueError:
+        await update.message.reply_text("⚠️ အခြား profiler တစ်ခု အလုပ်လုပ်နေပါသည်။")
+        return
+    persister.worker_hook = profiler.run
+    profiler.job = context.job_queue.run_once(
+        finish_profile, seconds, chat_id=update.effective_chat.id, data=top, name='profile'
+    )
+    await update.message.reply_text(
+        f"🔬 {seconds} စက္ကန့် Profiling စတင်ပါပြီ။ ပြီးလျှင် အပူဆုံး function {top} ခုနှင့် "
+        ".prof ဖိုင်ကို ပို့ပေးပါမည်။"
+    )
+
+
 async def report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /report command"""
     if not context.args:
@@ -805,19 +3993,97 @@ async def backup(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
         return
 
-    if save_data():
-        try:
-            with open(DATA_FILE, 'rb') as f:
-                await update.message.reply_document(
-                    document=f,
-                    filename=f"backup_{datetime.now(TIMEZONE).strftime('%Y%m%d_%H%M%S')}.json",
-                    caption="✅ Data Backup လုပ်ပြီးပါပြီ။"
-                )
-        except Exception as e:
-            logger.exception(f"Backup send error: {e}")
-            await update.message.reply_text("❌ Backup ပို့ရာတွင် အမှားတက်နေပါသည်။")
-    else:
+    # Backups are always exported as JSON, whatever the storage backend
+    try:
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(None, export_data, bot_data.snapshot())
+    except Exception as e:
+        logger.exception(f"Backup export error: {e}")
         await update.message.reply_text("❌ Backup လုပ်ရာတွင် အမှားအယွင်းဖြစ်ပေါ်ခဲ့သည်။")
+        return
+
+    try:
+        await update.message.reply_document(
+            document=payload,
+            filename=f"backup_{datetime.now(TIMEZONE).strftime('%Y%m%d_%H%M%S')}.json",
+            caption="✅ Data Backup လုပ်ပြီးပါပြီ။"
+        )
+    except Exception as e:
+        logger.exception(f"Backup send error: {e}")
+        await update.message.reply_text("❌ Backup ပို့ရာတွင် အမှားတက်နေပါသည်။")
+
+
+async def import_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /import verse|quiz|birthday - add entries from an uploaded file (Admin only)"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return ConversationHandler.END
+
+    kind = context.args[0].lower() if context.args else ''
+    if kind not in IMPORT_KINDS:
+        await update.message.reply_text(
+            "📥 File မှ တစ်ခါတည်း ထည့်ရန်:\n\n"
+            "/import verse - ကျမ်းချက်များ\n"
+            "/import quiz - Quiz များ\n"
+            "/import birthday - မွေးနေ့များ"
+        )
+        return ConversationHandler.END
+
+    context.user_data['import_kind'] = kind
+    await update.message.reply_text(
+        "📁 File ကို ပို့ပါ (.txt, .csv သို့မဟုတ် .json):\n\n"
+        ".txt - /ed... တွင် ရိုက်ထည့်သည့် format အတိုင်း\n"
+        ".csv - verse: ကျမ်းချက်,အကိုးအကား | quiz: question,A,B,C,D,answer | birthday: month,day,name\n"
+        ".json - list သို့မဟုတ် /backup file\n\n"
+        "ရှိပြီးသားများကို ထပ်မထည့်ပါ။ ပယ်ဖျက်ရန် /cancel"
+    )
+    return IMPORT_FILE
+
+
+async def receive_import_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Receive an /import file: parse off the event loop, add everything as one change"""
+    kind = context.user_data.pop('import_kind', None)
+    document = update.message.document
+    if kind not in IMPORT_KINDS:
+        return ConversationHandler.END
+    if document.file_size and document.file_size > IMPORT_MAX_BYTES:
+        await update.message.reply_text(f"❌ File ကြီးလွန်းပါသည် (အများဆုံး {format_bytes(IMPORT_MAX_BYTES)})။")
+        return ConversationHandler.END
+
+    op, field, _ = IMPORT_KINDS[kind]
+    try:
+        file = await document.get_file()
+        data = bytes(await file.download_as_bytearray())
+        # verses and quizzes are checked against the live dedupe index
+        # (only read by the worker); birthdays have no index of their own
+        existing = bot_data.dedupe_index.get(kind)
+        if existing is None:
+            existing = {dedupe_key(kind, item) for item in getattr(bot_data, field)}
+        loop = asyncio.get_running_loop()
+        items, duplicates, errors = await loop.run_in_executor(
+            None, parse_import_file, kind, document.file_name or '', data, existing
+        )
+    except ValueError as e:
+        # includes UnicodeDecodeError and JSON syntax errors
+        logger.warning(f"Rejected {kind} import file: {e}")
+        await update.message.reply_text("❌ File ကို ဖတ်၍မရပါ (UTF-8 .txt, .csv သို့မဟုတ် .json ဖြစ်ရပါမည်)။")
+        return ConversationHandler.END
+    except Exception as e:
+        logger.exception(f"Import error: {e}")
+        await update.message.reply_text("❌ Import လုပ်ရာတွင် အမှားအယွင်းဖြစ်ပေါ်ခဲ့သည်။")
+        return ConversationHandler.END
+
+    if items:
+        # one mutation, so one journal record however large the file
+        record(op, items)
+    lines = [
+        f"✅ {len(items):,} ခု ထည့်ပြီးပါပြီ။",
+        f"♻️ ထပ်နေ၍ ချန်ထားသည်: {duplicates:,}",
+        f"❌ မှားယွင်းနေသည်: {len(errors):,}",
+    ]
+    logger.info(f"Imported {len(items)} {kind} entries ({duplicates} duplicates, {len(errors)} rejected)")
+    await update.message.reply_text('\n'.join(lines) + format_parse_errors(errors, summary=False))
+    return ConversationHandler.END
 
 
 async def restore(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -842,19 +4108,30 @@ async def receive_restore_file(update: Update, context: ContextTypes.DEFAULT_TYP
 
     try:
         file = await update.message.document.get_file()
-        # download as bytes and write to DATA_FILE
+        # download as bytes; the live DATA_FILE is only replaced by the
+        # snapshot written below, so a bad upload can't destroy current data
         try:
             data = await file.download_as_bytearray()
-            with open(DATA_FILE, 'wb') as f:
-                f.write(data)
         except AttributeError:
             # fallback for older/newer PTB versions
-            await file.download_to_drive(DATA_FILE)
+            upload_path = DATA_FILE + '.upload'
+            await file.download_to_drive(upload_path)
+            with open(upload_path, 'rb') as f:
+                data = f.read()
+            os.remove(upload_path)
+
+        try:
+            restored = BotData.from_dict(json_loads(bytes(data)))
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Rejected restore file: {e}")
+            await update.message.reply_text("❌ Data file မှားယွင်းနေပါသည်။")
+            return
 
-        if load_data():
+        replace_data(restored)
+        if await persister.flush():
             await update.message.reply_text("✅ Data ကို ပြန်လည်ရယူပြီးပါပြီ။")
         else:
-            await update.message.reply_text("❌ Data file မှားယွင်းနေပါသည်။")
+            await update.message.reply_text("❌ ပြန်လည်ရယူရာတွင် အမှားအယွင်းဖြစ်ပေါ်ခဲ့သည်။")
     except Exception as e:
         logger.exception(f"Restore error: {e}")
         await update.message.reply_text("❌ ပြန်လည်ရယူရာတွင် အမှားအယွင်းဖြစ်ပေါ်ခဲ့သည်။")
@@ -885,27 +4162,23 @@ async def delete_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     index = int(context.args[1]) - 1
 
+    deleted_text = {
+        'verse': "✅ ကျမ်းချက် ဖျက်ပြီးပါပြီ။",
+        'quiz': "✅ Quiz ဖျက်ပြီးပါပြီ။",
+        'event': "✅ အစီအစဉ် ဖျက်ပြီးပါပြီ။",
+        'contact': "✅ ဆက်သွယ်ရန် ဖျက်ပြီးပါပြီ။",
+        'birthday': "✅ မွေးနေ့ ဖျက်ပြီးပါပြီ။",
+    }
+
     try:
-        if data_type == 'verse' and 0 <= index < len(bot_data.verses):
-            bot_data.verses.pop(index)
-            save_data()
-            await update.message.reply_text(f"✅ ကျမ်းချက် ဖျက်ပြီးပါပြီ။")
-        elif data_type == 'quiz' and 0 <= index < len(bot_data.quizzes):
-            bot_data.quizzes.pop(index)
-            save_data()
-            await update.message.reply_text(f"✅ Quiz ဖျက်ပြီးပါပြီ။")
-        elif data_type == 'event' and 0 <= index < len(bot_data.events):
-            bot_data.events.pop(index)
-            save_data()
-            await update.message.reply_text(f"✅ အစီအစဉ် ဖျက်ပြီးပါပြီ။")
-        elif data_type == 'contact' and 0 <= index < len(bot_data.contacts):
-            bot_data.contacts.pop(index)
-            save_data()
-            await update.message.reply_text(f"✅ ဆက်သွယ်ရန် ဖျက်ပြီးပါပြီ။")
-        elif data_type == 'birthday' and 0 <= index < len(bot_data.birthdays):
-            bot_data.birthdays.pop(index)
-            save_data()
-            await update.message.reply_text(f"✅ မွေးနေ့ ဖျက်ပြီးပါပြီ။")
+        if data_type == 'event':
+            # numbering follows /events, which lists upcoming events only
+            archive_past_events()
+        if data_type in deleted_text and bot_data.has_item(data_type, index):
+            record('delete_item', data_type, index)
+            if data_type == 'event':
+                event_reminders.reschedule()
+            await update.message.reply_text(deleted_text[data_type])
         else:
             await update.message.reply_text("❌ မှားယွင်းသော အမျိုးအစား သို့မဟုတ် နံပါတ်။")
     except Exception as e:
@@ -913,6 +4186,57 @@ async def delete_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ ဖျက်ရာတွင် အမှားအယွင်းဖြစ်ပေါ်ခဲ့သည်။")
 
 
+DEDUPE_NAMES = {'verse': "ကျမ်းချက်", 'contact': "ဆက်သွယ်ရန်", 'quiz': "Quiz"}
+
+
+async def dedupe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /dedupe command - report duplicate entries, remove on confirmation"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("⚠️ သင်သည် Admin မဟုတ်ပါ။")
+        return
+
+    # the counts are kept up to date by the dedupe index, no scan needed
+    lines = ["♻️ **ထပ်နေသော Data**\n"]
+    for kind, name in DEDUPE_NAMES.items():
+        total = len(getattr(bot_data, BotData.DEDUPE_FIELDS[kind]))
+        lines.append(f"{name}: {bot_data.duplicates[kind]:,} / {total:,}")
+    if not any(bot_data.duplicates.values()):
+        lines.append("\n✅ ထပ်နေသော Data မရှိပါ။")
+        await update.message.reply_text('\n'.join(lines), parse_mode=ParseMode.MARKDOWN)
+        return
+
+    lines.append("\nပထမတစ်ခုကိုသာ ချန်ပြီး ကျန်သည်များကို ဖျက်မှာ သေချာပါသလား?")
+    keyboard = [
+        [
+            InlineKeyboardButton("✅ Yes, Remove", callback_data="dedupe_confirm"),
+            InlineKeyboardButton("❌ Cancel", callback_data="dedupe_cancel"),
+        ]
+    ]
+    await update.message.reply_text(
+        '\n'.join(lines), reply_markup=InlineKeyboardMarkup(keyboard), parse_mode=ParseMode.MARKDOWN
+    )
+
+
+async def dedupe_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle dedupe confirmation"""
+    query = update.callback_query
+    if not is_admin(query.from_user.id):
+        await query.answer("⚠️ သင်သည် Admin မဟုတ်ပါ။", show_alert=True)
+        return
+    await query.answer()
+
+    if query.data != "dedupe_confirm":
+        await query.edit_message_text("❌ ပယ်ဖျက်လိုက်ပါပြီ။")
+        return
+    lines = ["✅ ထပ်နေသော Data များ ဖျက်ပြီးပါပြီ။\n"]
+    for kind, name in DEDUPE_NAMES.items():
+        # counted again here: entries may have changed since the report
+        removed = record('remove_duplicates', kind) if bot_data.duplicates[kind] else 0
+        lines.append(f"{name}: {removed:,}")
+    logger.info(f"Removed duplicates: {', '.join(lines[1:])}")
+    await query.edit_message_text('\n'.join(lines))
+
+
 async def allclear(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /allclear command"""
     if not is_admin(update.effective_user.id):
@@ -942,9 +4266,10 @@ async def allclear_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
 
     if query.data == "clear_confirm":
-        global bot_data
-        bot_data = BotData()
-        save_data()
+        record('clear')
+        persister.mark_dirty()
+        quiz_scheduler.reschedule_all()
+        event_reminders.reschedule()
         await query.edit_message_text("✅ Data အားလုံးကို ဖျက်ပြီးပါပြီ။")
     else:
         await query.edit_message_text("❌ ပယ်ဖျက်လိုက်ပါပြီ။")
@@ -957,17 +4282,76 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
-def main():
-    """Main function"""
-    if not BOT_TOKEN:
-        logger.error("BOT_TOKEN is not set. Please set BOT_TOKEN in the environment or .env file.")
-        return
-
-    # Load data
-    load_data()
+async def post_init(application: Application):
+    """Start background services"""
+    await persister.start(application)
+    await broadcaster.start(application)
+    await quiz_scheduler.start(application)
+    await event_reminders.start(application)
+    schedule_birthday_announcements(application)
+    schedule_prayer_archiving(application)
+    await metrics.start(application)
+    logger.info(f"Startup finished in {time.perf_counter() - STARTED_AT:.2f}s")
+
+
+async def post_shutdown(application: Application):
+    """Stop background services and write pending data"""
+    await metrics.stop(application)
+    await broadcaster.stop(application)
+    await persister.stop(application)
+
+
+# Update types each handler class can receive
+HANDLER_UPDATE_TYPES = {
+    CommandHandler: (Update.MESSAGE,),
+    MessageHandler: (Update.MESSAGE,),
+    CallbackQueryHandler: (Update.CALLBACK_QUERY,),
+    # middleware: sees whatever the other handlers subscribe to
+    TypeHandler: (),
+}
+
+
+def iter_handlers(application: Application):
+    """Registered handlers, with conversation handlers replaced by the handlers inside them"""
+    pending = [handler for handlers in application.handlers.values() for handler in handlers]
+    while pending:
+        handler = pending.pop()
+        if isinstance(handler, ConversationHandler):
+            pending.extend(handler.entry_points)
+            pending.extend(handler.fallbacks)
+            for state_handlers in handler.states.values():
+                pending.extend(state_handlers)
+            continue
+        yield handler
+
+
+def allowed_updates(application: Application) -> List[str]:
+    """Update types used by the registered handlers, for getUpdates/setWebhook"""
+    types = set()
+    for handler in iter_handlers(application):
+        handled = HANDLER_UPDATE_TYPES.get(type(handler))
+        if handled is None:
+            # unknown handler: don't risk filtering out what it needs
+            return Update.ALL_TYPES
+        types.update(handled)
+    return sorted(types)
+
+
+def build_application(token: Optional[str] = None, request=None) -> Application:
+    """Create the application and register all handlers"""
+    builder = (
+        Application.builder()
+        .token(token or BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .concurrent_updates(update_processor)
+    )
+    if request is not None:
+        builder = builder.request(request)
+    application = builder.build()
 
-    # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    # Flood protection runs before every other handler
+    application.add_handler(TypeHandler(Update, flood_guard), group=-1)
 
     # Conversation handlers
     about_handler = ConversationHandler(
@@ -1026,6 +4410,14 @@ def main():
         fallbacks=[CommandHandler('cancel', cancel)],
     )
 
+    import_handler = ConversationHandler(
+        entry_points=[CommandHandler('import', import_data)],
+        states={
+            IMPORT_FILE: [MessageHandler(filters.Document.ALL, receive_import_file)]
+        },
+        fallbacks=[CommandHandler('cancel', cancel)],
+    )
+
     # Add handlers
     application.add_handler(CommandHandler('start', start))
     application.add_handler(CommandHandler('edit', edit_menu))
@@ -1037,31 +4429,74 @@ def main():
     application.add_handler(CommandHandler('verse', verse))
     application.add_handler(events_handler)
     application.add_handler(CommandHandler('events', events))
+    application.add_handler(CommandHandler('eventalert', event_alert))
     application.add_handler(birthday_handler)
     application.add_handler(CommandHandler('birthday', birthday))
+    application.add_handler(CommandHandler('birthdayalert', birthday_alert))
     application.add_handler(CommandHandler('pray', pray))
     application.add_handler(CommandHandler('praylist', praylist))
+    application.add_handler(CommandHandler('praystatus', pray_status))
     application.add_handler(CommandHandler('set', set_quiz_threshold))
+    application.add_handler(CommandHandler('autoquiz', autoquiz))
     application.add_handler(quiz_handler)
     application.add_handler(CommandHandler('quiz', quiz))
     application.add_handler(CallbackQueryHandler(quiz_callback, pattern='^quiz_'))
+    application.add_handler(CallbackQueryHandler(page_callback, pattern='^page_'))
+    application.add_handler(CallbackQueryHandler(prayer_query_callback, pattern='^prq_'))
     application.add_handler(CommandHandler('tops', tops))
     application.add_handler(broadcast_handler)
     application.add_handler(CommandHandler('stats', stats))
+    application.add_handler(CommandHandler('memory', memory))
+    application.add_handler(CommandHandler('profile', profile))
     application.add_handler(CommandHandler('report', report))
     application.add_handler(CommandHandler('backup', backup))
+    application.add_handler(import_handler)
     application.add_handler(CommandHandler('restore', restore))
     application.add_handler(MessageHandler(filters.Document.ALL, receive_restore_file))
     application.add_handler(CommandHandler('delete', delete_data))
+    application.add_handler(CommandHandler('dedupe', dedupe))
+    application.add_handler(CallbackQueryHandler(dedupe_callback, pattern='^dedupe_'))
     application.add_handler(CommandHandler('allclear', allclear))
     application.add_handler(CallbackQueryHandler(allclear_callback, pattern='^clear_'))
 
     # Message tracker for auto quiz (group index 1)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, track_messages), group=1)
 
+    if metrics.enabled:
+        metrics.instrument(application)
+    return application
+
+
+def main():
+    """Main function"""
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN is not set. Please set BOT_TOKEN in the environment or .env file.")
+        return
+
+    # Load data
+    load_data()
+
+    application = build_application()
+    updates = allowed_updates(application)
+
     # Start bot
-    logger.info("Bot started...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if WEBHOOK_URL:
+        # Telegram echoes the secret in a header on every webhook request;
+        # without a configured one, a fresh random secret is set per start
+        secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+        logger.info(f"Bot started (webhook {WEBHOOK_URL}/{WEBHOOK_PATH}, updates: {', '.join(updates)})...")
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+            secret_token=secret,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=updates,
+        )
+    else:
+        logger.info(f"Bot started (polling, updates: {', '.join(updates)})...")
+        application.run_polling(allowed_updates=updates)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,239 @@
+"""
+Church Community Bot - Input Parsers
+Created by: PINLON-YOUTH
+
+Parsers for the text formats admins paste into /edverse, /edcontact,
+/edevents, /edbirthday and /edquiz (and upload with /import). Patterns
+are compiled once, every text is read in a single pass over its lines,
+and each rejected line is reported as (line number, reason).
+
+Numbers (dates, months, days, times) may be written with Myanmar digits
+၀-၉; the letter ဝ, often typed for ၀, counts as zero. Verses, contacts,
+names and titles are kept exactly as written.
+"""
+
+import re
+import unicodedata
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# (line number, reason) of every rejected line
+Errors = List[Tuple[int, str]]
+
+# Longest verse or contact line: fits one Telegram message (4096) with
+# the /verse greeting around it
+MAX_ENTRY_LENGTH = 3800
+
+MYANMAR_DIGITS = str.maketrans('၀၁၂၃၄၅၆၇၈၉ဝ', '01234567890')
+_D = '[0-9၀-၉ဝ]'
+
+# 3-15 - Name, 3-15 Name, 03-15: Name
+BIRTHDAY_LINE = re.compile(rf'^({_D}{{1,2}})\s*-\s*({_D}{{1,2}})(?:\s*[-:]|\s+)\s*(.+)$')
+# 2024-03-15 [18:00] - Title
+EVENT_LINE = re.compile(
+    rf'^({_D}{{4}})[-/.]({_D}{{1,2}})[-/.]({_D}{{1,2}})(?:[ T]+({_D}{{1,2}}):({_D}{{2}}))?\s*(?:[-–—:|]\s*)?(.*)$'
+)
+# a letter A-D standing on its own: 'အဖြေ: C', 'Answer: C', 'C'
+QUIZ_ANSWER = re.compile(r'(?<![A-Za-z])([A-Da-d])(?![A-Za-z])')
+QUIZ_LETTERS = 'ABCDabcd'
+# dropped when comparing entries: Myanmar text often carries zero-width
+# spaces as word-break hints that are invisible in the chat
+ZERO_WIDTH = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u2060\ufeff'))
+
+
+def to_int(digits: str) -> int:
+    return int(digits) if digits.isascii() else int(digits.translate(MYANMAR_DIGITS))
+
+
+def normalize_text(text) -> str:
+    """Text as compared for duplicates: NFC, no zero-width characters, single spaces"""
+    text = str(text or '')
+    if not text.isascii():
+        text = unicodedata.normalize('NFC', text).translate(ZERO_WIDTH)
+    return ' '.join(text.split())
+
+
+def _lines(text) -> Iterable[str]:
+    return text.splitlines() if isinstance(text, str) else text
+
+
+def make_entry(text, what: str = "ကျမ်းချက်") -> str:
+    """A verse or contact line; ValueError with the reason otherwise"""
+    entry = str(text or '').strip()
+    if not entry:
+        raise ValueError(f"{what} မပါပါ")
+    if len(entry) > MAX_ENTRY_LENGTH:
+        raise ValueError(f"{what} ရှည်လွန်းပါသည်")
+    return entry
+
+
+def make_birthday(month, day, name) -> dict:
+    """Validated birthday entry; ValueError with the reason otherwise"""
+    month = to_int(month) if isinstance(month, str) else int(month)
+    day = to_int(day) if isinstance(day, str) else int(day)
+    name = str(name or '').strip()
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        raise ValueError("လ/ရက် မှားနေပါသည်")
+    if not name:
+        raise ValueError("အမည် မပါပါ")
+    return {'month': month, 'day': day, 'name': name}
+
+
+def make_quiz(question, choices: dict, answer) -> dict:
+    """Validated quiz entry (without id); ValueError with the reason otherwise"""
+    question = str(question or '').strip()
+    choices = {str(k).strip().upper(): str(v).strip() for k, v in choices.items() if str(v or '').strip()}
+    answer = str(answer or '').strip().upper()
+    if not question:
+        raise ValueError("မေးခွန်း မပါပါ")
+    if sorted(choices) != ['A', 'B', 'C', 'D']:
+        raise ValueError("A-D ရွေးချယ်စရာ ၄ ခု မပြည့်စုံပါ")
+    if answer not in choices:
+        raise ValueError("အဖြေ (A-D) မပါပါ")
+    return {'question': question, 'choices': choices, 'answer': answer}
+
+
+def parse_birthday_line(line: str) -> dict:
+    """'3-15 - Name' or '03-15 Name' -> birthday entry"""
+    m = BIRTHDAY_LINE.match(line)
+    if not m:
+        raise ValueError("Format: လ-ရက် - အမည်")
+    month, day, name = m.groups()
+    month, day = to_int(month), to_int(day)
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        raise ValueError("လ/ရက် မှားနေပါသည်")
+    # the pattern leaves no surrounding whitespace on a stripped line
+    return {'month': month, 'day': day, 'name': name}
+
+
+def _dated_event(match) -> Optional[dict]:
+    year, month, day, hour, minute, title = match.groups()
+    title = title.strip()
+    if not title:
+        return None
+    try:
+        when = datetime(to_int(year), to_int(month), to_int(day),
+                        to_int(hour) if hour else 0, to_int(minute) if minute else 0)
+    except ValueError:
+        return None
+    # formatted by hand: strftime costs more than the whole match
+    return {
+        'date': f"{when.year:04d}-{when.month:02d}-{when.day:02d}",
+        'time': f"{when.hour:02d}:{when.minute:02d}" if hour is not None else None,
+        'title': title,
+    }
+
+
+def parse_event(line: str) -> dict:
+    """Turn an event line ("2024-03-15 18:00 - name") into an event record.
+
+    Lines without a valid date are kept as undated events.
+    """
+    line = line.strip()
+    match = EVENT_LINE.match(line)
+    event = _dated_event(match) if match else None
+    return event or {'date': None, 'time': None, 'title': line}
+
+
+def parse_verses(text) -> Tuple[List[str], Errors]:
+    """One verse per line"""
+    return _parse_entries(text, "ကျမ်းချက်")
+
+
+def parse_contacts(text) -> Tuple[List[str], Errors]:
+    """One contact per line"""
+    return _parse_entries(text, "အချက်အလက်")
+
+
+def _parse_entries(text, what: str) -> Tuple[List[str], Errors]:
+    entries, errors = [], []
+    for number, line in enumerate(_lines(text), 1):
+        line = line.strip()
+        if len(line) > MAX_ENTRY_LENGTH:
+            errors.append((number, f"{what} ရှည်လွန်းပါသည်"))
+        elif line:
+            entries.append(line)
+    return entries, errors
+
+
+def parse_events(text) -> Tuple[List[dict], Errors]:
+    """One event per line; lines without a date become undated events,
+    lines that start with an impossible date are rejected"""
+    events, errors = [], []
+    for number, line in enumerate(_lines(text), 1):
+        line = line.strip()
+        if not line:
+            continue
+        match = EVENT_LINE.match(line)
+        if match is None:
+            events.append({'date': None, 'time': None, 'title': line})
+            continue
+        event = _dated_event(match)
+        if event is None:
+            errors.append((number, "ရက်စွဲ/အချိန် မှားနေသည် သို့မဟုတ် ခေါင်းစဉ် မပါပါ"))
+        else:
+            events.append(event)
+    return events, errors
+
+
+def parse_birthdays(text) -> Tuple[List[dict], Errors]:
+    """One 'month-day - name' per line"""
+    birthdays, errors = [], []
+    for number, line in enumerate(_lines(text), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            birthdays.append(parse_birthday_line(line))
+        except ValueError as e:
+            errors.append((number, str(e)))
+    return birthdays, errors
+
+
+def parse_quizzes(text) -> Tuple[List[dict], Errors]:
+    """Quizzes: question line(s), 'A) ...' to 'D) ...', then an answer line.
+
+    A single pass over the lines: the answer line ends a quiz, so the
+    empty line between quizzes is optional; an empty line inside a quiz
+    rejects it (reported at its first line). After an error the rest of
+    that quiz, up to the next empty line, is skipped.
+    """
+    quizzes, errors = [], []
+    start = 0
+    question: List[str] = []
+    choices: dict = {}
+    skipping = False
+    for number, line in enumerate(_lines(text), 1):
+        line = line.strip()
+        if not line:
+            if question and not skipping:
+                errors.append((start, "Quiz မပြည့်စုံပါ (A-D ရွေးချယ်စရာနှင့် အဖြေ လိုပါသည်)"))
+            question, choices, skipping = [], {}, False
+            continue
+        if skipping:
+            continue
+        if not question:
+            start = number
+        if len(line) > 2 and line[1] == ')' and line[0] in QUIZ_LETTERS:
+            letter = line[0].upper()
+            if not question or letter in choices:
+                reason = "မေးခွန်း မပါပါ" if not question else f"{letter}) နှစ်ခါ ပါနေပါသည်"
+                errors.append((number, reason))
+                skipping = True
+                continue
+            choices[letter] = line[2:].lstrip()
+        elif not choices:
+            question.append(line)
+        else:
+            answer = QUIZ_ANSWER.search(line)
+            answer = answer.group(1).upper() if answer else None
+            if len(choices) != 4:
+                errors.append((start, "A-D ရွေးချယ်စရာ ၄ ခု မပြည့်စုံပါ"))
+            elif answer is None:
+                errors.append((number, "အဖြေ (A-D) မပါပါ"))
+            else:
+                quizzes.append({'question': '\n'.join(question), 'choices': choices, 'answer': answer})
+            question, choices = [], {}
+    if question and not skipping:
+        errors.append((start, "Quiz မပြည့်စုံပါ (A-D ရွေးချယ်စရာနှင့် အဖြေ လိုပါသည်)"))
+    return quizzes, errors
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# bot.py picks its storage backend at import time
+os.environ['STORAGE_BACKEND'] = 'json'
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Run every test in its own directory, so data files never touch the repo"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
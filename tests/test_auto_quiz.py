@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import bot
+
+CHAT = -100
+
+
+def quiz(question):
+    return {'question': question, 'choices': {'A': '1', 'B': '2', 'C': '3', 'D': '4'}, 'answer': 'A'}
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class FakeJob:
+    def __init__(self, callback, when, chat_id, name):
+        self.callback = callback
+        self.when = when
+        self.chat_id = chat_id
+        self.name = name
+        self.removed = False
+
+    def schedule_removal(self):
+        self.removed = True
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.jobs = []
+
+    def run_once(self, callback, when, chat_id=None, name=None):
+        self.jobs.append(FakeJob(callback, when, chat_id, name))
+        return self.jobs[-1]
+
+    def run_repeating(self, callback, interval, first=None, chat_id=None, name=None):
+        self.jobs.append(FakeJob(callback, interval, chat_id, name))
+        return self.jobs[-1]
+
+    def active(self):
+        return [job for job in self.jobs if not job.removed]
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(bot.JournalStorage()))
+    bot.bot_data.add_quizzes([quiz(f"Q{n}?") for n in range(5)])
+    scheduler = bot.AutoQuizScheduler()
+    scheduler.bot = FakeBot()
+    scheduler.job_queue = FakeJobQueue()
+    return scheduler
+
+
+def run_job(scheduler, job):
+    asyncio.run(job.callback(SimpleNamespace(job=job, bot=scheduler.bot)))
+
+
+def test_deck_deals_every_quiz_before_repeating(scheduler):
+    first = [scheduler.draw(CHAT)['id'] for _ in range(5)]
+    second = [scheduler.draw(CHAT)['id'] for _ in range(5)]
+
+    assert sorted(first) == sorted(second) == [0, 1, 2, 3, 4]
+
+
+def test_deck_skips_deleted_quizzes(scheduler):
+    scheduler.draw(CHAT)
+    bot.bot_data.delete_item('quiz', 0)
+    bot.bot_data.delete_item('quiz', 0)
+
+    drawn = [scheduler.draw(CHAT)['id'] for _ in range(3)]
+
+    assert set(drawn) <= {2, 3, 4}
+
+
+def test_trigger_sends_and_resets_the_counter(scheduler):
+    bot.bot_data.message_count[CHAT] = 12
+
+    assert asyncio.run(scheduler.trigger(scheduler.bot, CHAT))
+
+    assert len(scheduler.bot.sent) == 1 and scheduler.bot.sent[0][0] == CHAT
+    assert bot.bot_data.message_count[CHAT] == 0 and CHAT in bot.bot_data.counts_changed
+
+
+def test_quiz_due_inside_cooldown_is_deferred_once(scheduler):
+    bot.bot_data.set_quiz_schedule(CHAT, 10, 0)
+    asyncio.run(scheduler.trigger(scheduler.bot, CHAT))
+
+    assert asyncio.run(scheduler.trigger(scheduler.bot, CHAT))
+    assert asyncio.run(scheduler.trigger(scheduler.bot, CHAT))
+
+    deferred = scheduler.job_queue.active()
+    assert len(scheduler.bot.sent) == 1 and len(deferred) == 1
+    assert 599 < deferred[0].when <= 600
+    run_job(scheduler, deferred[0])
+    assert len(scheduler.bot.sent) == 2
+
+
+def test_cooldown_without_job_queue_keeps_counting(scheduler):
+    scheduler.job_queue = None
+    bot.bot_data.set_quiz_schedule(CHAT, 10, 0)
+    asyncio.run(scheduler.trigger(scheduler.bot, CHAT))
+
+    assert not asyncio.run(scheduler.trigger(scheduler.bot, CHAT))
+
+
+def test_timed_quiz_needs_messages_since_the_last_one(scheduler):
+    bot.bot_data.set_quiz_schedule(CHAT, 0, 15)
+    scheduler.reschedule(CHAT)
+    (timer,) = scheduler.job_queue.active()
+    assert (timer.when, timer.name) == (900, f"autoquiz_{CHAT}")
+
+    run_job(scheduler, timer)
+    bot.bot_data.message_count[CHAT] = 3
+    run_job(scheduler, timer)
+    run_job(scheduler, timer)
+
+    assert len(scheduler.bot.sent) == 1
+
+
+def test_reschedule_replaces_the_timer(scheduler):
+    bot.bot_data.set_quiz_schedule(CHAT, 0, 15)
+    scheduler.reschedule(CHAT)
+    bot.bot_data.set_quiz_schedule(CHAT, 0, 0)
+    scheduler.reschedule_all()
+
+    assert scheduler.job_queue.active() == []
+
+
+def test_per_chat_threshold(scheduler, monkeypatch):
+    monkeypatch.setattr(bot, 'quiz_scheduler', scheduler)
+    bot.bot_data.set_chat_threshold(CHAT, 3)
+    update = SimpleNamespace(effective_chat=SimpleNamespace(id=CHAT))
+    context = SimpleNamespace(bot=scheduler.bot)
+
+    for _ in range(7):
+        asyncio.run(bot.track_messages(update, context))
+
+    assert len(scheduler.bot.sent) == 2
+    assert bot.bot_data.message_count[CHAT] == 1
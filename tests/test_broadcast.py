@@ -0,0 +1,117 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from telegram.error import BadRequest, ChatMigrated, NetworkError, RetryAfter
+
+import bot
+
+
+class FakeBot:
+    """Records deliveries; `errors` maps a chat id to exceptions raised on its next sends"""
+
+    def __init__(self, errors=None, hold=None):
+        self.errors = errors or {}
+        self.hold = hold
+        self.delivered = []
+        self.edits = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.hold is not None:
+            await self.hold.wait()
+        errors = self.errors.get(chat_id)
+        if errors:
+            raise errors.pop(0)
+        self.delivered.append(chat_id)
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        self.edits.append((chat_id, message_id, text))
+
+
+async def finish(engine, fake):
+    await engine.start(SimpleNamespace(bot=fake))
+    while engine.jobs:
+        await asyncio.sleep(0.01)
+    await engine.stop(None)
+
+
+def test_delivers_and_counts_failures():
+    fake = FakeBot({
+        2: [RetryAfter(0)],
+        3: [NetworkError("reset")],
+        4: [BadRequest("Chat not found")],
+        5: [ChatMigrated(-1005)],
+    })
+    engine = bot.BroadcastEngine('jobs.json', concurrency=4, rate=1000, progress_interval=60)
+
+    async def run():
+        await engine.start(SimpleNamespace(bot=fake))
+        job = bot.BroadcastJob('text', [1, 2, 3, 4, 5, 6], text="hi")
+        job.status_chat, job.status_message = 99, 1
+        await engine.submit(job)
+        while engine.jobs:
+            await asyncio.sleep(0.01)
+        await engine.stop(None)
+        return job
+
+    job = asyncio.run(run())
+
+    assert sorted(fake.delivered) == [-1005, 1, 2, 3, 6]
+    assert (job.sent, job.failed, job.remaining) == (5, 1, {})
+    assert fake.edits[-1][:2] == (99, 1) and "အောင်မြင်: 5" in fake.edits[-1][2]
+
+
+def test_network_errors_give_up_after_max_attempts():
+    fake = FakeBot({1: [NetworkError("reset")] * bot.BROADCAST_MAX_ATTEMPTS})
+    engine = bot.BroadcastEngine('jobs.json', concurrency=1, rate=1000, progress_interval=60)
+    job = bot.BroadcastJob('text', [1], text="hi")
+
+    async def run():
+        await engine.start(SimpleNamespace(bot=fake))
+        # the per-chat spacing would wait a second before each retry
+        engine._throttle = lambda chat_id: asyncio.sleep(0)
+        await engine.submit(job)
+        while engine.jobs:
+            await asyncio.sleep(0.01)
+        await engine.stop(None)
+
+    asyncio.run(run())
+
+    assert (fake.delivered, job.sent, job.failed) == ([], 0, 1)
+
+
+def test_stop_keeps_unfinished_jobs_for_the_next_start():
+    hold = asyncio.Event()
+    stuck = FakeBot(hold=hold)
+    engine = bot.BroadcastEngine('jobs.json', concurrency=2, rate=1000, progress_interval=60)
+
+    async def interrupted():
+        await engine.start(SimpleNamespace(bot=stuck))
+        await engine.submit(bot.BroadcastJob('text', [1, 2, 3], text="hi", job_id='b1'))
+        await asyncio.sleep(0.05)
+        await engine.stop(None)
+
+    asyncio.run(interrupted())
+    with open('jobs.json', encoding='utf-8') as f:
+        saved = json.load(f)['jobs']
+    assert [(job['id'], job['remaining']) for job in saved] == [('b1', [1, 2, 3])]
+
+    fake = FakeBot()
+    asyncio.run(finish(bot.BroadcastEngine('jobs.json', rate=1000, progress_interval=60), fake))
+
+    assert sorted(fake.delivered) == [1, 2, 3]
+    with open('jobs.json', encoding='utf-8') as f:
+        assert json.load(f)['jobs'] == []
+
+
+def test_resume_sends_only_to_remaining_chats():
+    saved = bot.BroadcastJob('text', [3, 4], text="hi", job_id='b2').to_dict()
+    saved.update(total=4, sent=2, status_chat=99, status_message=1)
+    with open('jobs.json', 'w', encoding='utf-8') as f:
+        json.dump({'jobs': [saved]}, f)
+    fake = FakeBot()
+
+    asyncio.run(finish(bot.BroadcastEngine('jobs.json', rate=1000, progress_interval=60), fake))
+
+    assert sorted(fake.delivered) == [3, 4]
+    assert "အောင်မြင်: 4" in fake.edits[-1][2]
@@ -0,0 +1,66 @@
+import asyncio
+
+import bot
+
+
+def quiz(question, answer='A'):
+    return {'question': question, 'choices': {'A': '1', 'B': '2', 'C': '3', 'D': '4'}, 'answer': answer}
+
+
+def assert_index_matches(data):
+    """The index and duplicate counts equal a recount of the collections"""
+    for kind, field in data.DEDUPE_FIELDS.items():
+        counts = {}
+        for entry in getattr(data, field):
+            key = bot.dedupe_key(kind, entry)
+            counts[key] = counts.get(key, 0) + 1
+        assert data.dedupe_index[kind] == counts
+        assert data.duplicates[kind] == sum(n - 1 for n in counts.values())
+
+
+def test_counts_through_add_delete_and_remove():
+    data = bot.BotData.from_dict({
+        'verses': ['Love one another', 'Love  one another ', 'ချစ်​ခြင်း', 'ချစ်ခြင်း', 'Other'],
+        'quizzes': [quiz('Q?'), quiz(' Q? ', 'B'), quiz('R?')],
+    })
+    assert data.duplicates == {'verse': 2, 'contact': 0, 'quiz': 1}
+    assert_index_matches(data)
+
+    data.add_contacts(['A - 1', 'A  - 1'])
+    data.delete_item('verse', 0)
+    data.delete_item('quiz', 2)
+    assert data.duplicates == {'verse': 1, 'contact': 1, 'quiz': 1}
+    assert_index_matches(data)
+
+    assert data.remove_duplicates('verse') == 1
+    assert data.remove_duplicates('quiz') == 1
+    assert data.remove_duplicates('contact') == 1
+    assert data.verses == ['Love  one another ', 'ချစ်​ခြင်း', 'Other']
+    assert data.duplicates == {'verse': 0, 'contact': 0, 'quiz': 0}
+    assert_index_matches(data)
+    # the quiz deck index drops the removed quiz too
+    assert data.quiz_ids == [0] and list(data.quiz_by_id) == [0]
+    assert data.remove_duplicates('verse') == 0
+
+
+def test_new_entries_skips_stored_and_repeated():
+    data = bot.BotData()
+    data.add_verses(['one'])
+    fresh, skipped = data.new_entries('verse', [' one', 'two', 'two ', 'three'])
+    assert (fresh, skipped) == (['two', 'three'], 2)
+    fresh, skipped = data.new_entries('quiz', [quiz('Q?'), quiz('Q?', 'C'), quiz('Q?!')])
+    assert skipped == 1 and [q['question'] for q in fresh] == ['Q?', 'Q?!']
+
+
+def test_replayed_journal_rebuilds_the_index(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(bot.JournalStorage()))
+    bot.record('add_verses', ['a', 'a ', 'b'])
+    bot.record('remove_duplicates', 'verse')
+    bot.record('add_verses', ['c'])
+    asyncio.run(bot.persister.flush())
+
+    data, _, replayed = bot.JournalStorage().load()
+    assert replayed == 3
+    assert data.verses == ['a', 'b', 'c']
+    assert_index_matches(data)
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import bot
+
+
+def event(title, date=None, time=None):
+    return {'date': date, 'time': time, 'title': title}
+
+
+def event_at(title, when):
+    return event(title, when.strftime('%Y-%m-%d'), when.strftime('%H:%M'))
+
+
+class FakeJob:
+    def __init__(self, callback, when):
+        self.callback = callback
+        self.when = when
+        self.removed = False
+
+    def schedule_removal(self):
+        self.removed = True
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.jobs = []
+
+    def run_once(self, callback, when, name=None):
+        self.jobs.append(FakeJob(callback, when))
+        return self.jobs[-1]
+
+    def active(self):
+        return [job for job in self.jobs if not job.removed]
+
+
+class FakeBroadcaster:
+    def __init__(self):
+        self.jobs = []
+
+    async def submit(self, job):
+        self.jobs.append(job)
+
+
+@pytest.fixture
+def reminders(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(bot.JournalStorage()))
+    monkeypatch.setattr(bot, 'broadcaster', FakeBroadcaster())
+    monkeypatch.setattr(bot, 'EVENT_REMINDER_HOURS', 24)
+    reminders = bot.EventReminders()
+    reminders.job_queue = FakeJobQueue()
+    return reminders
+
+
+def tick(reminders):
+    job = reminders._job
+    asyncio.run(job.callback(None))
+
+
+def test_events_are_kept_in_start_order():
+    data = bot.BotData()
+    data.add_events([event('undated'), event('late', '2024-03-15', '18:00'), event('all day', '2024-03-15'),
+                     event('early', '2024-01-02', '07:30')])
+    data.add_events(['2024-02-01 - from text'])
+
+    assert [e['title'] for e in data.events] == ['early', 'from text', 'all day', 'late', 'undated']
+    assert [e['title'] for e in data.events_between('2024-01-02 07:30', '2024-03-15 09:00')] == ['from text', 'all day']
+    assert data.next_event_after('2024-03-15 18:00') is None
+
+
+def test_archive_moves_only_past_events():
+    data = bot.BotData()
+    data.add_events([event('old', '2024-01-01'), event('today', '2024-02-01', '08:00'), event('undated')])
+
+    assert data.has_past_events('2024-02-01 00:00')
+    data.archive_events('2024-02-01 00:00')
+
+    assert [e['title'] for e in data.past_events] == ['old']
+    assert [e['title'] for e in data.events] == ['today', 'undated']
+    assert not data.has_past_events('2024-02-01 00:00')
+
+
+def test_reminder_for_events_inside_the_horizon(reminders):
+    now = datetime.now(bot.TIMEZONE)
+    bot.bot_data.add_events([event_at('soon', now + timedelta(hours=2)), event_at('later', now + timedelta(hours=30))])
+    bot.bot_data.set_event_group(-5, True)
+    reminders.reschedule()
+
+    tick(reminders)
+
+    (job,) = bot.broadcaster.jobs
+    assert list(job.remaining) == [-5]
+    assert "soon" in job.text and "later" not in job.text
+    # armed for the moment "later" enters the 24 hour horizon
+    assert 6 * 3600 - 120 < reminders._job.when <= 6 * 3600 + 1
+
+
+def test_each_event_is_reminded_once(reminders):
+    now = datetime.now(bot.TIMEZONE)
+    bot.bot_data.add_events([event_at('soon', now + timedelta(hours=2))])
+    bot.bot_data.set_event_group(-5, True)
+    reminders.reschedule()
+    tick(reminders)
+
+    reminders.reschedule()
+    tick(reminders)
+
+    assert len(bot.broadcaster.jobs) == 1
+    assert reminders._job is None
+
+
+def test_tick_archives_past_events(reminders):
+    yesterday = datetime.now(bot.TIMEZONE) - timedelta(days=1)
+    bot.bot_data.add_events([event_at('past', yesterday)])
+    reminders.reschedule()
+
+    tick(reminders)
+
+    assert bot.bot_data.events == [] and len(bot.bot_data.past_events) == 1
+    assert bot.broadcaster.jobs == []
+
+
+def test_reschedule_replaces_the_timer(reminders):
+    reminders.reschedule()
+    reminders.reschedule()
+
+    assert len(reminders.job_queue.active()) == 1
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import bot
+
+
+def parse(kind, filename, text, existing=()):
+    keys = {bot.dedupe_key(kind, item) for item in existing}
+    return bot.parse_import_file(kind, filename, text.encode('utf-8'), keys)
+
+
+def test_text_file_uses_the_paste_format():
+    items, duplicates, errors = parse('verse', 'verses.txt', "one\n\ntwo\n one  \nthree\n", existing=['three'])
+
+    assert (items, duplicates, errors) == (['one', 'two'], 2, [])
+
+
+def test_csv_quizzes_with_header_and_bom():
+    text = ("\ufeffquestion,A,B,C,D,answer\n"
+            "Q1?,a,b,c,d,B\n"
+            "Q2?,a,b,c\n"
+            "\n"
+            '"Q3, with comma?",a,b,c,d,d\n')
+
+    items, duplicates, errors = parse('quiz', 'bank.CSV', text)
+
+    assert [(q['question'], q['answer']) for q in items] == [('Q1?', 'B'), ('Q3, with comma?', 'D')]
+    assert items[0]['choices'] == {'A': 'a', 'B': 'b', 'C': 'c', 'D': 'd'}
+    assert [number for number, _ in errors] == [3]
+
+
+def test_csv_birthdays_report_bad_rows():
+    items, _, errors = parse('birthday', 'b.csv', "3,15,Mg Mg\n13,1,Bad\n4,2\n")
+
+    assert items == [{'month': 3, 'day': 15, 'name': 'Mg Mg'}]
+    assert [number for number, _ in errors] == [2, 3]
+
+
+def test_json_list_and_backup_file():
+    quizzes = [
+        {'question': 'Q1?', 'choices': {'A': '1', 'B': '2', 'C': '3', 'D': '4'}, 'answer': 'A'},
+        {'question': 'Q2?', 'a': '1', 'b': '2', 'c': '3', 'd': '4', 'answer': 'c'},
+        "not an object",
+    ]
+    items, _, errors = parse('quiz', 'q.json', json.dumps(quizzes))
+    assert [q['answer'] for q in items] == ['A', 'C']
+    assert [number for number, _ in errors] == [3]
+
+    backup = {'verses': ['v1'], 'birthdays': [{'month': 1, 'day': 2, 'name': 'A'}, {'month': 1, 'day': 2, 'name': 'A'}]}
+    items, duplicates, _ = parse('birthday', 'backup.json', json.dumps(backup))
+    assert (items, duplicates) == ([{'month': 1, 'day': 2, 'name': 'A'}], 1)
+
+
+@pytest.mark.parametrize('text', ['{"verses": "one"}', '[1, 2', '"text"'])
+def test_unreadable_json_raises_value_error(text):
+    with pytest.raises(ValueError):
+        parse('verse', 'v.json', text)
+
+
+class Document:
+    def __init__(self, name, data):
+        self.file_name = name
+        self.file_size = len(data)
+        self.data = data
+
+    async def get_file(self):
+        async def download_as_bytearray():
+            return bytearray(self.data)
+        return SimpleNamespace(download_as_bytearray=download_as_bytearray)
+
+
+def test_upload_is_one_journal_record(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(bot.JournalStorage()))
+    bot.record('add_verses', ['old'])
+    replies = []
+
+    async def reply_text(text, **kwargs):
+        replies.append(text)
+
+    message = SimpleNamespace(document=Document('v.txt', "\n".join(['old'] + [f"v{n}" for n in range(500)]).encode()),
+                              reply_text=reply_text)
+    context = SimpleNamespace(user_data={'import_kind': 'verse'})
+
+    asyncio.run(bot.receive_import_file(SimpleNamespace(message=message), context))
+
+    assert len(bot.bot_data.verses) == 501
+    assert bot.persister.seq == 2
+    assert "500" in replies[0] and "ထပ်နေ၍ ချန်ထားသည်: 1" in replies[0]
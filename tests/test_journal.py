@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+import bot
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """An empty bot_data journaled to bot_data.json/.journal in the test directory"""
+    storage = bot.JournalStorage()
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(storage))
+    return storage
+
+
+def test_replay_stops_at_torn_last_line(fresh):
+    bot.record('add_verses', ['one'])
+    bot.record('add_verses', ['two'])
+    asyncio.run(bot.persister.flush())
+    with open(fresh.journal_path, 'ab') as f:
+        f.write(b'{"seq": 3, "op": "add_verses", "args": [["thr')
+
+    data, seq, replayed = bot.JournalStorage().load()
+
+    assert data.verses == ['one', 'two']
+    assert (seq, replayed) == (2, 2)
+
+
+def test_replay_skips_records_already_in_snapshot(fresh):
+    bot.record('add_score', '1', 'Alice', 3)
+    bot.persister.dirty = True
+    asyncio.run(bot.persister.flush())
+    bot.record('add_score', '1', 'Alice', 2)
+    asyncio.run(bot.persister.flush())
+    # a crash between the snapshot rename and the journal truncation
+    # leaves records the snapshot already holds in the journal
+    with open(fresh.journal_path, 'rb') as f:
+        newer = f.read()
+    with open(fresh.journal_path, 'wb') as f:
+        f.write(bot.json_dumps({'seq': 1, 'op': 'add_score', 'args': ['1', 'Alice', 3]}) + b'\n' + newer)
+
+    data, seq, replayed = bot.JournalStorage().load()
+
+    assert data.quiz_scores['1']['score'] == 5
+    assert (seq, replayed) == (2, 1)
+
+
+def test_score_added_during_compaction_is_counted_once(fresh):
+    bot.record('add_score', '42', 'Alice', 10, '-5')
+    release = threading.Event()
+    compact = fresh.compact
+
+    def slow_compact(data, seq):
+        release.wait(5)
+        return compact(data, seq)
+
+    fresh.compact = slow_compact
+
+    async def run():
+        bot.persister.dirty = True
+        flush = asyncio.ensure_future(bot.persister.flush())
+        await asyncio.sleep(0.05)
+        # lands on the loop while the worker serializes the snapshot
+        bot.record('add_score', '42', 'Alice', 5, '-5')
+        bot.record('add_score', '43', 'Bob', 1, '-5')
+        release.set()
+        assert await flush
+        assert await bot.persister.flush()
+
+    asyncio.run(run())
+    data, _, _ = bot.JournalStorage().load()
+
+    assert data.quiz_scores['42']['score'] == bot.bot_data.quiz_scores['42']['score'] == 15
+    assert data.group_scores['-5'] == {'42': 15, '43': 1}
+
+
+def test_snapshot_does_not_share_score_entries():
+    data = bot.BotData()
+    data.add_score('1', 'Alice', 1, '-5')
+    snapshot = data.snapshot()
+    data.add_score('1', 'Alice', 1, '-5')
+    data.add_score('2', 'Bob', 1, '-5')
+
+    assert snapshot['quiz_scores']['1']['score'] == 1
+    assert snapshot['group_scores']['-5'] == {'1': 1}
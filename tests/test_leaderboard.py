@@ -0,0 +1,89 @@
+import random
+
+import bot
+
+
+class BruteForce:
+    """The Leaderboard contract, by sorting everything on every read"""
+
+    def __init__(self):
+        self.scores = {}
+        self.reached = {}
+        self.clock = 0
+
+    def set(self, user_id, score):
+        score = max(score, 0)
+        if self.scores.get(user_id) == score:
+            return
+        self.clock += 1
+        self.scores[user_id] = score
+        self.reached[user_id] = self.clock
+
+    def remove(self, user_id):
+        self.scores.pop(user_id, None)
+
+    def top(self, k):
+        # ties keep the order in which users reached the score
+        ordered = sorted(self.scores, key=lambda uid: (-self.scores[uid], self.reached[uid]))
+        return [(uid, self.scores[uid]) for uid in ordered[:k]]
+
+    def rank(self, user_id):
+        score = self.scores[user_id]
+        return 1 + sum(1 for other in self.scores.values() if other > score)
+
+
+def test_matches_brute_force_under_random_updates():
+    rng = random.Random(7)
+    board, expected = bot.Leaderboard(top_size=5), BruteForce()
+    for _ in range(3000):
+        user_id = str(rng.randrange(60))
+        if rng.random() < 0.05:
+            board.remove(user_id)
+            expected.remove(user_id)
+        else:
+            # scores past 64 make the Fenwick tree grow
+            score = rng.choice([rng.randrange(10), rng.randrange(500), -3])
+            board.set(user_id, score)
+            expected.set(user_id, score)
+        assert board.top(5) == expected.top(5)
+        assert len(board) == len(expected.scores)
+    for user_id in expected.scores:
+        assert board.rank(user_id) == expected.rank(user_id)
+    assert board.top(1000) == expected.top(1000)
+    assert board.rank('missing') is None
+
+
+def test_version_changes_whenever_the_top_rows_change():
+    rng = random.Random(11)
+    board = bot.Leaderboard(top_size=3)
+    for _ in range(2000):
+        before, version = board.top(3), board.version
+        user_id = str(rng.randrange(30))
+        if rng.random() < 0.05:
+            board.remove(user_id)
+        else:
+            board.set(user_id, rng.randrange(100))
+        if board.top(3) != before:
+            assert board.version != version
+
+
+def test_version_kept_for_changes_below_the_top():
+    board = bot.Leaderboard(top_size=2)
+    for user_id, score in (('a', 50), ('b', 40), ('c', 5), ('d', 1)):
+        board.set(user_id, score)
+    version = board.version
+    board.set('d', 3)
+    board.set('c', 6)
+    board.set('a', 50)
+    assert board.version == version
+    board.set('c', 45)
+    assert board.version != version
+    assert board.top(2) == [('a', 50), ('c', 45)]
+
+
+def test_ties_share_a_rank():
+    board = bot.Leaderboard()
+    for user_id, score in (('a', 3), ('b', 3), ('c', 1), ('d', 0)):
+        board.set(user_id, score)
+    assert [board.rank(uid) for uid in 'abcd'] == [1, 1, 3, 4]
+    assert board.top(2) == [('a', 3), ('b', 3)]
@@ -0,0 +1,75 @@
+import pytest
+
+import bot
+
+
+@pytest.fixture
+def contacts(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'render_cache', bot.OrderedDict())
+    return bot.bot_data.contacts
+
+
+def buttons(markup):
+    return [(b.text, b.callback_data) for b in markup.inline_keyboard[0]] if markup else []
+
+
+def test_short_page_is_one_message(contacts):
+    contacts.extend(f"contact {n}" for n in range(25))
+
+    text, markup = bot.render_page('contacts', 0)
+
+    assert "20. contact 19" in text and "21." not in text
+    assert "📄 1/2\n" in text
+    assert buttons(markup) == [("▶️", 'page_contacts_1')]
+
+
+def test_overflow_moves_to_further_parts(contacts):
+    contacts.extend(f"{n} " + "x" * 600 for n in range(25))
+
+    texts = []
+    part = 0
+    while True:
+        text, markup = bot.render_page('contacts', 0, part)
+        texts.append(text)
+        if buttons(markup)[-1][1] == 'page_contacts_1':
+            break
+        part += 1
+
+    assert all(bot._utf16_len(text) <= 4096 for text in texts)
+    assert len(texts) > 1 and f"(1/{len(texts)})" in texts[0]
+    body = ''.join(texts)
+    assert all(f"{n} " + "x" * 600 in body for n in range(20))
+    assert buttons(bot.render_page('contacts', 0, 1)[1])[0] == ("◀️", 'page_contacts_0')
+
+
+def test_back_from_next_page_opens_the_last_part(contacts):
+    contacts.extend(f"{n} " + "x" * 600 for n in range(25))
+    last, _ = bot.render_page('contacts', 0, -1)
+
+    _, markup = bot.render_page('contacts', 1)
+
+    assert buttons(markup)[0] == ("◀️", 'page_contacts_0_-1')
+    assert last == bot.render_page('contacts', 0, 99)[0]
+    assert "20. 19 x" in last
+
+
+def test_render_cache_drops_least_recently_used(contacts, monkeypatch):
+    monkeypatch.setattr(bot, 'RENDER_CACHE_SIZE', 2)
+    contacts.extend(f"contact {n}" for n in range(60))
+
+    bot.render_page('contacts', 0)
+    bot.render_page('contacts', 1)
+    bot.render_page('contacts', 0)
+    bot.render_page('contacts', 2)
+
+    assert list(bot.render_cache) == ['contacts:0', 'contacts:2']
+
+
+def test_prayer_query_callback_data_round_trips():
+    query = bot.make_prayer_query('open', '@some_user', '2024-01-01', None)
+
+    decoded, page, part = bot.decode_prayer_query(bot.encode_prayer_query(query, 3, 2))
+
+    assert (decoded['status'], decoded['user'], decoded['since'], page, part) == ('open', '@some_user', '2024-01-01', 3, 2)
+    assert bot.decode_prayer_query(bot.encode_prayer_query(query, 3))[1:] == (3, 0)
@@ -0,0 +1,93 @@
+import pytest
+
+from parsers import (MAX_ENTRY_LENGTH, make_birthday, make_quiz, normalize_text, parse_birthdays,
+                     parse_contacts, parse_event, parse_events, parse_quizzes, parse_verses, to_int)
+
+QUIZ = "Question?\nA) one\nB) two\nC) three\nD) four\nအဖြေ: {}"
+
+
+def test_verses_and_contacts():
+    text = f"  first - Ps 1:1 \n\nsecond\n{'x' * (MAX_ENTRY_LENGTH + 1)}\n"
+    assert parse_verses(text) == (['first - Ps 1:1', 'second'], [(4, 'ကျမ်းချက် ရှည်လွန်းပါသည်')])
+    assert parse_contacts("Ma Ma - 09123\n") == (['Ma Ma - 09123'], [])
+
+
+@pytest.mark.parametrize('line', ['3-15 - Name', '03-15 Name', '03-15: Name', '3 - 15 : Name', '၃-၁၅ - Name'])
+def test_birthday_formats(line):
+    assert parse_birthdays(line) == ([{'month': 3, 'day': 15, 'name': 'Name'}], [])
+
+
+def test_birthday_errors_carry_line_numbers():
+    birthdays, errors = parse_birthdays("1-2 - A\n\n13-1 - B\nnonsense\n2-30 C")
+    assert [b['name'] for b in birthdays] == ['A', 'C']
+    assert [number for number, _ in errors] == [3, 4]
+
+
+def test_myanmar_digits():
+    assert to_int('၁၂') == 12
+    # the letter ဝ is often typed for the digit ၀
+    assert to_int('၁ဝ') == 10
+    assert parse_birthdays('ဝ၃-၁ဝ - Name')[0] == [{'month': 3, 'day': 10, 'name': 'Name'}]
+
+
+def test_events():
+    events, errors = parse_events("2024-03-15 18:00 - Service\n2024/3/16 Picnic\nno date\n2024-02-30 - Bad\n2024-03-17 -")
+    assert events == [
+        {'date': '2024-03-15', 'time': '18:00', 'title': 'Service'},
+        {'date': '2024-03-16', 'time': None, 'title': 'Picnic'},
+        {'date': None, 'time': None, 'title': 'no date'},
+    ]
+    assert [number for number, _ in errors] == [4, 5]
+    # stored legacy lines are never rejected
+    assert parse_event('2024-02-30 - Bad') == {'date': None, 'time': None, 'title': '2024-02-30 - Bad'}
+
+
+@pytest.mark.parametrize('answer, expected', [('C', 'C'), ('Answer: c', 'C'), ('(D)', 'D')])
+def test_quiz_answer_letter(answer, expected):
+    quizzes, errors = parse_quizzes(QUIZ.format(answer))
+    assert errors == []
+    assert quizzes == [{'question': 'Question?',
+                        'choices': {'A': 'one', 'B': 'two', 'C': 'three', 'D': 'four'},
+                        'answer': expected}]
+
+
+def test_quizzes_need_no_blank_line_and_allow_multi_line_questions():
+    text = QUIZ.format('A') + "\nLine one\nline two\nA) 1\nB) 2\nC) 3\nD) 4\nB"
+    quizzes, errors = parse_quizzes(text)
+    assert errors == []
+    assert [q['question'] for q in quizzes] == ['Question?', 'Line one\nline two']
+
+
+def test_quiz_errors_skip_to_the_next_blank_line():
+    text = "\n\n".join([
+        "Broken?\nA) 1\nB) 2\nA) again\nC) 3\nD) 4\nA",
+        "Short?\nA) 1\nB) 2\nအဖြေ: A",
+        "No answer?\nA) 1\nB) 2\nC) 3\nD) 4\nအဖြေ: -",
+        "Gap?\nA) 1\n\nB) 2",
+        QUIZ.format('B'),
+    ])
+    quizzes, errors = parse_quizzes(text)
+    assert [q['answer'] for q in quizzes] == ['B']
+    assert errors == [
+        (4, 'A) နှစ်ခါ ပါနေပါသည်'),
+        (9, 'A-D ရွေးချယ်စရာ ၄ ခု မပြည့်စုံပါ'),
+        (19, 'အဖြေ (A-D) မပါပါ'),
+        (21, 'Quiz မပြည့်စုံပါ (A-D ရွေးချယ်စရာနှင့် အဖြေ လိုပါသည်)'),
+        (24, 'မေးခွန်း မပါပါ'),
+    ]
+
+
+def test_make_helpers_validate():
+    assert make_birthday('၁၂', 25, ' Name ') == {'month': 12, 'day': 25, 'name': 'Name'}
+    with pytest.raises(ValueError):
+        make_birthday(2, 32, 'x')
+    with pytest.raises(ValueError):
+        make_quiz('Q?', {'A': '1', 'B': '2', 'C': '3'}, 'A')
+    assert make_quiz('Q?', {'a': '1', 'b': '2', 'c': '3', 'd': '4'}, 'd')['answer'] == 'D'
+
+
+def test_normalize_text():
+    assert normalize_text('  a \t b\n') == 'a b'
+    assert normalize_text('ချစ်​ခြင်း') == normalize_text('ချစ်ခြင်း')
+    # composed and decomposed forms compare equal
+    assert normalize_text('é') == normalize_text('é')
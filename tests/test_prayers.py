@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+from datetime import datetime, timedelta
+
+import pytest
+
+import bot
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(bot.JournalStorage()))
+    monkeypatch.setattr(bot, 'prayer_archive_cache', {})
+
+
+def days_ago(days):
+    return (datetime.now(bot.TIMEZONE) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def pray(user_id, text, date, username=None):
+    bot.record('add_prayer', {'user_id': user_id, 'username': username or f"u{user_id}", 'prayer': text, 'date': date})
+
+
+def test_queries_by_date_user_and_status(fresh):
+    for n, (user_id, date) in enumerate([(1, '2024-01-05'), (2, '2024-02-10'), (1, '2024-03-01'), (2, '2024-03-20')]):
+        pray(user_id, str(n), f"{date} 10:00:00", f"U{user_id}")
+    bot.record('set_prayer_status', 2, 'answered')
+    data = bot.bot_data
+
+    def find(**kwargs):
+        return [p['prayer'] for p in data.find_prayers(bot.make_prayer_query(**kwargs))]
+
+    assert find(since='2024-02-01', until='2024-03-01') == ['1', '2']
+    assert find(user='1') == find(user='@u1') == ['0', '2']
+    assert find(status='open') == ['0', '1', '3']
+    assert find(status='answered', user='1') == ['2']
+    assert data.recent_prayer_users('2024-03-01') == [2, 1]
+
+
+def test_storage_pages_newest_first(fresh):
+    for n in range(5):
+        pray(1, str(n), f"2024-01-0{n + 1} 10:00:00")
+
+    page, total = bot.storage.find_prayers(bot.make_prayer_query(), 2, 2)
+
+    assert total == 5
+    assert [p['prayer'] for p in page] == ['2', '1']
+
+
+def test_old_prayers_move_to_the_archive(fresh):
+    pray(1, 'old', days_ago(bot.PRAYER_RETENTION_DAYS + 5))
+    pray(2, 'older user 2', days_ago(bot.PRAYER_RETENTION_DAYS + 1))
+    pray(1, 'new', days_ago(1))
+
+    asyncio.run(bot.archive_old_prayers(None))
+
+    assert [p['prayer'] for p in bot.bot_data.prayers] == ['new']
+    assert set(bot.bot_data.prayer_by_id) == {2}
+    assert 2 not in bot.bot_data.prayers_by_user
+    archived = bot.search_prayer_archive(bot.make_prayer_query())
+    assert [p['prayer'] for p in archived] == ['old', 'older user 2']
+
+    asyncio.run(bot.persister.flush())
+    data, _, _ = bot.JournalStorage().load()
+    assert [p['prayer'] for p in data.prayers] == ['new']
+
+
+def test_archive_search_skips_repeated_batches_and_reads_a_torn_file(fresh):
+    prayers = [{'id': n, 'user_id': 1, 'prayer': str(n), 'date': '2024-01-01 10:00:00', 'status': 'open'}
+               for n in range(3)]
+    bot.append_prayer_archive(prayers[:2])
+    # a crash between archiving and journaling archives a batch again
+    bot.append_prayer_archive(prayers[:2])
+    bot.append_prayer_archive(prayers[2:])
+    assert [p['id'] for p in bot.search_prayer_archive(bot.make_prayer_query())] == [0, 1, 2]
+
+    with open(bot.PRAYER_ARCHIVE_FILE, 'rb') as f:
+        data = f.read()
+    with open(bot.PRAYER_ARCHIVE_FILE, 'wb') as f:
+        f.write(data[:-10])
+
+    assert [p['id'] for p in bot.search_prayer_archive(bot.make_prayer_query())][:2] == [0, 1]
+
+
+def test_praylist_archive_view(fresh):
+    with gzip.open(bot.PRAYER_ARCHIVE_FILE, 'wt', encoding='utf-8') as f:
+        f.write('{"id": 0, "user_id": 1, "username": "a", "prayer": "kept", "date": "2020-01-01 10:00:00"}\n')
+
+    text, _ = asyncio.run(bot.render_prayer_query(bot.make_prayer_query(archive=True), 0))
+
+    assert "kept" in text and "archive (1)" in text
+    assert asyncio.run(bot.render_prayer_query(bot.make_prayer_query(status='answered', archive=True), 0)) == (None, None)
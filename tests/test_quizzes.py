@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import bot
+
+
+def quiz(question, answer='A'):
+    return {'question': question, 'choices': {'A': '1', 'B': '2', 'C': '3', 'D': '4'}, 'answer': answer}
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(bot.JournalStorage()))
+
+
+class Query:
+    def __init__(self, data, user_id=7):
+        self.data = data
+        self.from_user = SimpleNamespace(id=user_id, username='alice', first_name='Alice')
+        self.edits = []
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+    async def edit_message_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+def press(data):
+    query = Query(data)
+    update = SimpleNamespace(callback_query=query, effective_chat=SimpleNamespace(id=7, type='private'))
+    asyncio.run(bot.quiz_callback(update, None))
+    return query.edits[-1]
+
+
+def test_ids_survive_deletes():
+    data = bot.BotData()
+    data.add_quizzes([quiz('Q0?'), quiz('Q1?'), quiz('Q2?')])
+    data.delete_item('quiz', 0)
+    data.add_quizzes([quiz('Q3?')])
+
+    assert [q['id'] for q in data.quizzes] == [1, 2, 3]
+    assert sorted(data.quiz_ids) == [1, 2, 3]
+    assert {i: q['question'] for i, q in data.quiz_by_id.items()} == {1: 'Q1?', 2: 'Q2?', 3: 'Q3?'}
+
+
+def test_quizzes_saved_without_ids_get_their_position():
+    data = bot.BotData.from_dict({'quizzes': [quiz('Q0?'), quiz('Q1?')], 'next_quiz_id': 0})
+
+    assert [q['id'] for q in data.quizzes] == [0, 1]
+    assert data.next_quiz_id == 2
+
+
+def test_ids_round_trip():
+    data = bot.BotData()
+    data.add_quizzes([quiz('Q0?'), quiz('Q1?')])
+    data.delete_item('quiz', 1)
+
+    loaded = bot.BotData.from_dict(bot.json_loads(bot.json_dumps(data.to_dict())))
+    loaded.add_quizzes([quiz('Q2?')])
+
+    assert [q['id'] for q in loaded.quizzes] == [0, 2]
+
+
+def test_answer_button_survives_delete(fresh):
+    bot.record('add_quizzes', [quiz('Q0?'), quiz('Q1?'), quiz('Q2?', 'C')])
+    _, markup = bot.quiz_message(bot.bot_data.quiz_by_id[2])
+    answer_c = markup.inline_keyboard[0][2].callback_data
+    bot.record('delete_item', 'quiz', 0)
+
+    text = press(answer_c)
+
+    assert answer_c == 'quiz_2_C'
+    assert "✅" in text and "C) 3" in text
+    assert bot.bot_data.quiz_scores['7']['score'] == 1
+
+
+def test_button_of_deleted_quiz(fresh):
+    bot.record('add_quizzes', [quiz('Q0?')])
+    bot.record('delete_item', 'quiz', 0)
+
+    assert press('quiz_0_A') == "❌ Quiz မရှိတော့ပါ။"
+    assert bot.bot_data.quiz_scores == {}
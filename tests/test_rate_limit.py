@@ -0,0 +1,56 @@
+import bot
+
+
+def test_burst_then_refill():
+    limit = bot.RateLimit(3, 30)
+    assert [limit.allow('u', 0.0) for _ in range(4)] == [True, True, True, False]
+    assert limit.throttled == 1
+    # one token comes back every 10 seconds
+    assert not limit.allow('u', 9.0)
+    assert limit.allow('u', 19.5)
+    assert not limit.allow('u', 19.6)
+
+
+def test_keys_are_independent():
+    limit = bot.RateLimit(1, 60)
+    assert limit.allow('a', 0.0)
+    assert not limit.allow('a', 1.0)
+    assert limit.allow('b', 1.0)
+
+
+def test_idle_buckets_expire():
+    limit = bot.RateLimit(2, 10)
+    for key in range(100):
+        limit.allow(key, float(key) / 100)
+    assert len(limit.buckets) == 100
+    limit.allow('late', 11.0)
+    # every bucket untouched for a full period is gone, the fresh one stays
+    assert list(limit.buckets) == ['late']
+
+
+def test_expired_bucket_starts_full():
+    limit = bot.RateLimit(2, 10)
+    assert limit.allow('u', 0.0) and limit.allow('u', 0.0)
+    assert not limit.allow('u', 0.1)
+    assert limit.allow('u', 10.1) and limit.allow('u', 10.1)
+
+
+def test_recently_used_bucket_survives_expiry():
+    limit = bot.RateLimit(2, 10)
+    limit.allow('old', 0.0)
+    limit.allow('busy', 0.0)
+    limit.allow('old', 5.0)
+    limit.allow('other', 12.0)
+    assert set(limit.buckets) == {'old', 'other'}
+
+
+def test_zero_capacity_disables():
+    limit = bot.RateLimit(*bot.parse_rate('0'))
+    assert all(limit.allow('u', 0.0) for _ in range(1000))
+    assert not limit.buckets
+
+
+def test_parse_rate():
+    assert bot.parse_rate('30/60') == (30, 60.0)
+    assert bot.parse_rate('5') == (5, 60.0)
+    assert bot.parse_rate('nonsense') == (0, 60.0)
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import bot
+
+
+def test_round_trip_keeps_extra_keys():
+    raw = {'id': 3, 'user_id': 9, 'prayer': 'p', 'date': '2024-01-01', 'status': 'open', 'legacy': True}
+    prayer = bot.Prayer(dict(raw))
+
+    assert prayer.to_dict() == raw
+    assert prayer['legacy'] is True and 'legacy' in prayer
+    assert json.loads(bot.json_dumps(prayer)) == raw
+
+
+def test_missing_fields_stay_missing():
+    quiz = bot.Quiz({'question': 'Q?', 'answer': 'A'})
+
+    assert 'id' not in quiz and 'choices' not in quiz
+    assert quiz.get('choices') is None
+    assert quiz.to_dict() == {'question': 'Q?', 'answer': 'A'}
+    with pytest.raises(KeyError):
+        quiz['id']
+    assert quiz.setdefault('id', 4) == 4
+    assert quiz.to_dict() == {'id': 4, 'question': 'Q?', 'answer': 'A'}
+
+
+def test_bot_data_round_trip():
+    data = {
+        'verses': ['v'],
+        'prayers': [{'id': 0, 'user_id': 1, 'prayer': 'p', 'date': '2024-01-01 10:00:00', 'status': 'open', 'x': 1}],
+        'birthdays': [{'month': 2, 'day': 29, 'name': 'Leap', 'note': 'n'}],
+        'quizzes': [{'id': 5, 'question': 'Q?', 'choices': {'A': '1', 'B': '2', 'C': '3', 'D': '4'}, 'answer': 'B'}],
+        'quiz_scores': {'1': {'name': 'Alice', 'score': 3, 'extra': 'kept'}},
+    }
+    loaded = bot.BotData.from_dict(json.loads(json.dumps(data))).to_dict()
+
+    for key, value in data.items():
+        assert loaded[key] == value
+    assert loaded['next_quiz_id'] == 6 and loaded['next_prayer_id'] == 1
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+import bot
+
+
+@pytest.fixture
+def sqlite(monkeypatch):
+    """An empty bot_data stored in bot_data.db in the test directory"""
+    storage = bot.SqliteStorage('bot_data.db', 'bot_data.json')
+    monkeypatch.setattr(bot, 'bot_data', bot.BotData())
+    monkeypatch.setattr(bot, 'persister', bot.DataPersister(storage))
+    yield storage
+    storage.close()
+
+
+def reload():
+    storage = bot.SqliteStorage('bot_data.db', 'bot_data.json')
+    try:
+        return storage.load()[0]
+    finally:
+        storage.close()
+
+
+def plain(data):
+    return json.loads(json.dumps(data.to_dict(), default=bot.json_default, sort_keys=True))
+
+
+def test_round_trip(sqlite):
+    bot.record('add_user', 1)
+    bot.record('add_group', -5)
+    bot.record('add_verses', ['one', 'two'])
+    bot.record('add_prayer', {'user_id': 1, 'username': 'alice', 'prayer': 'p', 'date': '2024-01-01 10:00'})
+    bot.record('set_prayer_status', 0, 'answered')
+    bot.record('add_birthdays', [{'month': 3, 'day': 15, 'name': 'Mg Mg'}])
+    bot.record('add_score', '1', 'Alice', 3, '-5')
+    bot.record('add_score', '1', 'Alice', 2, '-5')
+    bot.record('set_quiz_threshold', 7)
+    assert asyncio.run(bot.persister.flush())
+
+    data = reload()
+
+    assert plain(data) == plain(bot.bot_data)
+    assert data.prayers[0]['status'] == 'answered'
+    assert data.quiz_scores['1']['score'] == 5
+
+
+def test_log_leaves_the_database_to_the_flush(sqlite):
+    bot.record('add_verses', ['one'])
+    bot.record('add_user', 1)
+
+    assert reload().users == set()
+    assert sqlite.counts()['users'] == 1
+    asyncio.run(bot.persister.flush())
+    assert reload().users == {1}
+
+
+def test_first_start_imports_json():
+    journal = bot.JournalStorage('bot_data.json', 'bot_data.journal')
+    data = bot.BotData()
+    data.add_verses(['one'])
+    data.add_birthdays([{'month': 1, 'day': 2, 'name': 'A'}])
+    journal.compact(data.snapshot(), 0)
+    journal.write([journal.log(1, 'add_score', ('1', 'Alice', 4), data)])
+
+    storage = bot.SqliteStorage('bot_data.db', 'bot_data.json')
+    imported, seq, replayed = storage.load()
+    storage.close()
+
+    assert (imported.verses, seq, replayed) == (['one'], 1, 1)
+    assert imported.quiz_scores['1']['score'] == 4
+    assert reload().birthdays[0].to_dict() == {'month': 1, 'day': 2, 'name': 'A'}
+
+
+def test_archive_prayers_drops_rows(sqlite):
+    for n in range(4):
+        bot.record('add_prayer', {'user_id': 1, 'prayer': str(n), 'date': f'2024-01-0{n + 1}'})
+    bot.record('archive_prayers', 1)
+    asyncio.run(bot.persister.flush())
+
+    data = reload()
+
+    assert [p['prayer'] for p in data.prayers] == ['2', '3']
+    assert data.next_prayer_id == 4
+
+
+def test_delete_birthday_removes_its_row(sqlite):
+    bot.record('add_birthdays', [{'month': 1, 'day': n, 'name': str(n)} for n in range(1, 4)])
+    asyncio.run(bot.persister.flush())
+    bot.record('delete_item', 'birthday', 0)
+    bot.record('add_birthdays', [{'month': 2, 'day': 1, 'name': '4'}])
+    bot.record('delete_item', 'birthday', 1)
+    asyncio.run(bot.persister.flush())
+
+    assert [b['name'] for b in reload().birthdays] == ['2', '4']
+
+
+def test_clear_empties_the_tables(sqlite):
+    bot.record('add_user', 1)
+    bot.record('add_birthdays', [{'month': 1, 'day': 2, 'name': 'A'}])
+    asyncio.run(bot.persister.flush())
+    bot.record('clear')
+    bot.record('add_verses', ['after'])
+    asyncio.run(bot.persister.flush())
+
+    data = reload()
+
+    assert (data.users, data.birthdays, data.verses) == (set(), [], ['after'])
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime
+
+from telegram import CallbackQuery, Chat, Message, Update, User
+
+import bot
+
+_ids = iter(range(1, 1000))
+
+
+def message(chat_id, user_id=1):
+    chat = Chat(chat_id, Chat.PRIVATE if chat_id > 0 else Chat.GROUP)
+    return Update(next(_ids), message=Message(next(_ids), datetime.now(), chat, from_user=User(user_id, 'u', False),
+                                              text="hi"))
+
+
+def callback(user_id, chat_id):
+    query = CallbackQuery(str(next(_ids)), User(user_id, 'u', False), 'ci', data='x',
+                          message=Message(next(_ids), datetime.now(), Chat(chat_id, Chat.GROUP)))
+    return Update(next(_ids), callback_query=query)
+
+
+class Recorder:
+    """Handler coroutines that log their start and end and track overlap"""
+
+    def __init__(self):
+        self.log = []
+        self.running = 0
+        self.max_running = 0
+
+    async def handle(self, name, delay):
+        self.log.append(('start', name))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(delay)
+        self.running -= 1
+        self.log.append(('end', name))
+
+
+def run(processor, recorder, items):
+    async def main():
+        tasks = []
+        for update, name, delay in items:
+            tasks.append(asyncio.create_task(processor.do_process_update(update, recorder.handle(name, delay))))
+            # let each task queue up in arrival order
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+
+def test_one_chat_runs_in_order():
+    processor, recorder = bot.ChatUpdateProcessor(8), Recorder()
+
+    run(processor, recorder, [(message(-1), 'a1', 0.05), (message(-1), 'a2', 0), (message(-1), 'a3', 0.01)])
+
+    assert recorder.log == [('start', 'a1'), ('end', 'a1'), ('start', 'a2'), ('end', 'a2'),
+                            ('start', 'a3'), ('end', 'a3')]
+    assert recorder.max_running == 1
+
+
+def test_chats_run_concurrently():
+    processor, recorder = bot.ChatUpdateProcessor(8), Recorder()
+
+    run(processor, recorder, [(message(-1), 'a', 0.05), (message(-2), 'b', 0.01), (message(5), 'c', 0.01)])
+
+    assert recorder.log.index(('end', 'b')) < recorder.log.index(('end', 'a'))
+    assert recorder.max_running == 3
+
+
+def test_limit_bounds_running_updates():
+    processor, recorder = bot.ChatUpdateProcessor(2), Recorder()
+
+    run(processor, recorder, [(message(-n), n, 0.01) for n in range(1, 7)])
+
+    assert recorder.max_running == 2
+    # the first two start at once, the other four wait for a slot
+    assert processor.max_queued == 4
+
+
+def test_callback_queries_are_serialized_per_user():
+    processor, recorder = bot.ChatUpdateProcessor(8), Recorder()
+
+    run(processor, recorder, [(callback(7, -1), 'q1', 0.03), (callback(7, -2), 'q2', 0), (callback(8, -1), 'r', 0)])
+
+    assert recorder.log.index(('end', 'q1')) < recorder.log.index(('start', 'q2'))
+    assert recorder.log.index(('end', 'r')) < recorder.log.index(('end', 'q1'))
+
+
+def test_counters_settle_after_processing():
+    processor, recorder = bot.ChatUpdateProcessor(2), Recorder()
+
+    run(processor, recorder, [(message(-1), n, 0) for n in range(4)] + [(message(-2), 'b', 0)])
+
+    assert (processor.processed, processor.queued, processor.running) == (5, 0, 0)
+    assert processor._chats == {}
+    assert "5 processed" in processor.stats_text()
+
+
+def test_update_cancelled_while_queued_is_closed():
+    processor, recorder = bot.ChatUpdateProcessor(8), Recorder()
+
+    async def main():
+        first = asyncio.create_task(processor.do_process_update(message(-1), recorder.handle('a', 0.05)))
+        await asyncio.sleep(0)
+        waiting = recorder.handle('b', 0)
+        second = asyncio.create_task(processor.do_process_update(message(-1), waiting))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        return waiting
+
+    waiting = asyncio.run(main())
+
+    assert waiting.cr_frame is None
+    assert ('start', 'b') not in recorder.log
+    assert (processor.queued, processor.processed, processor._chats) == (0, 1, {})